@@ -27,7 +27,17 @@ import argparse
 import logging
 import typing
 
-from pydependence._cli import pydeps
+from pydependence._cli import (
+    ResolverBudgetError,
+    UnusedRequirementsError,
+    pydeps,
+    pydeps_cycles,
+    pydeps_footprint,
+    pydeps_layers,
+    pydeps_why,
+)
+from pydependence._core.lockfile import LockfileError
+from pydependence._core.modules_resolver import ImportCyclesError, ResolveEngineEnum
 from pydependence._core.requirements_map import NoConfiguredRequirementMappingError
 
 LOGGER = logging.getLogger(__name__)
@@ -43,6 +53,14 @@ if typing.TYPE_CHECKING:
         config: str
         dry_run: bool
         exit_zero: bool
+        why: typing.Optional[typing.List[str]]
+        resolver: typing.Optional[str]
+        num_chains: int
+        cycles: bool
+        layers: bool
+        footprint: bool
+        site_path: typing.Optional[typing.List[str]]
+        engine: typing.Optional[str]
 
 
 def _parse_args() -> "PyDepsCliArgsProto":
@@ -51,6 +69,14 @@ def _parse_args() -> "PyDepsCliArgsProto":
     `config`, required
     `--dry-run`, optional
     `--exit-zero`, optional # always return success exit code even if files changed
+    `--why`, optional # explain why a requirement is output, instead of writing outputs
+    `--resolver`, optional # only explain the resolver with this output name
+    `--num-chains`, optional # the number of shortest import chains to explain
+    `--cycles`, optional # report eager import cycles within scopes, instead of writing outputs
+    `--layers`, optional # report the shared base layers & deltas of resolvers, instead of writing outputs
+    `--footprint`, optional # report the installed footprint of requirements as JSON, instead of writing outputs
+    `--site-path`, optional # the paths to read installed distributions from, used with `--footprint`
+    `--engine`, optional # override the `resolve_engine` of the config, `bfs` or `closures`
 
     Then parse the arguments and return them.
     """
@@ -72,6 +98,56 @@ def _parse_args() -> "PyDepsCliArgsProto":
         action="store_true",
         help="Always return a success exit code, even if files changed.",
     )
+    parser.add_argument(
+        "--why",
+        type=str,
+        action="append",
+        default=None,
+        metavar="REQUIREMENT",
+        help="Print the shortest chains of imports that pull in a requirement or import, instead of writing outputs. Can be given more than once.",
+    )
+    parser.add_argument(
+        "--resolver",
+        type=str,
+        default=None,
+        help="Only explain the resolver with this output name, used with `--why`.",
+    )
+    parser.add_argument(
+        "--num-chains",
+        type=int,
+        default=1,
+        help="The number of shortest import chains to print for each import, used with `--why`.",
+    )
+    parser.add_argument(
+        "--cycles",
+        action="store_true",
+        help="Print all the eager import cycles within each scope, instead of writing outputs.",
+    )
+    parser.add_argument(
+        "--layers",
+        action="store_true",
+        help="Print the shared base layer and the deltas of the resolvers of each configured layer, instead of writing outputs.",
+    )
+    parser.add_argument(
+        "--footprint",
+        action="store_true",
+        help="Print the installed size and file count of the requirements of each resolver and their dependencies as JSON, instead of writing outputs.",
+    )
+    parser.add_argument(
+        "--site-path",
+        type=str,
+        action="append",
+        default=None,
+        metavar="PATH",
+        help="A path to read installed distributions from, used with `--footprint`. Defaults to `sys.path`. Can be given more than once.",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=None,
+        choices=[e.value for e in ResolveEngineEnum],
+        help="Override the `resolve_engine` of the config when writing outputs. Each distinct start scope is resolved with a BFS by default, `closures` shares a closure table between all start scopes of a scope instead.",
+    )
     return parser.parse_args()
 
 
@@ -79,17 +155,57 @@ def _cli():
     # args
     args = _parse_args()
 
+    # reports, printed instead of writing outputs
+    report = None
+    if args.why:
+        report = pydeps_why(
+            config_path=args.config,
+            requirements=args.why,
+            resolver=args.resolver,
+            num_chains=args.num_chains,
+        )
+    elif args.cycles:
+        report = pydeps_cycles(config_path=args.config)
+    elif args.layers:
+        report = pydeps_layers(config_path=args.config)
+    elif args.footprint:
+        report = pydeps_footprint(config_path=args.config, paths=args.site_path)
+    if report is not None:
+        print(report)
+        exit(0)
+
     # run
     try:
         changed = pydeps(
             config_path=args.config,
             dry_run=args.dry_run,
+            engine=args.engine,
         )
     except NoConfiguredRequirementMappingError as e:
         LOGGER.critical(
             f"[pydependence] no configured requirement mapping found, either specify all missing version mappings or disable strict mode:\n{e}"
         )
         exit(1)
+    except ResolverBudgetError as e:
+        LOGGER.critical(
+            f"[pydependence] resolver budgets exceeded, remove the offending eager imports or increase the budget:\n{e}"
+        )
+        exit(1)
+    except UnusedRequirementsError as e:
+        LOGGER.critical(
+            f"[pydependence] unused requirements found, either remove them from `versions` and `raw`, or disable `strict_unused`:\n{e}"
+        )
+        exit(1)
+    except LockfileError as e:
+        LOGGER.critical(
+            f"[pydependence] could not pin requirements to the lock file, either update the lock file or fix the `lockfile` of the output:\n{e}"
+        )
+        exit(1)
+    except ImportCyclesError as e:
+        LOGGER.critical(
+            f"[pydependence] new import cycles found, either remove them, add them to `allowed_cycles`, or relax `cycles_mode`:\n{e}"
+        )
+        exit(1)
 
     # check if files changed
     if changed:
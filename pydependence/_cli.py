@@ -23,6 +23,8 @@
 # ============================================================================== #
 
 import contextlib
+import itertools
+import json
 import logging
 import shutil
 import tempfile
@@ -30,13 +32,49 @@ import warnings
 from collections import defaultdict
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pydantic
 from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
 from typing_extensions import Annotated
 
-from pydependence._core.module_imports_ast import ManualImportInfo
+from pydependence._core.fingerprints import (
+    FINGERPRINTS_FORMAT_VERSION,
+    FingerprintsStore,
+    ModuleHasher,
+    ResolverFingerprint,
+    get_tool_version,
+    hash_strings,
+    relative_path,
+)
+from pydependence._core.footprint import InstalledDists
+from pydependence._core.lockfile import load_lockfile
+from pydependence._core.module_imports_ast import LocImportInfo, ManualImportInfo
+from pydependence._core.module_imports_loader import DEFAULT_MODULE_IMPORTS_LOADER
+from pydependence._core.modules_resolver import (
+    CyclesModeEnum,
+    ImportCycle,
+    ImportCyclesError,
+    ResolveEngineEnum,
+    ScopeResolvedImports,
+    _get_new_import_cycles,
+    format_import_chain,
+    format_import_cycles,
+)
 from pydependence._core.modules_scope import (
     ModulesScope,
     RestrictMode,
@@ -48,11 +86,16 @@ from pydependence._core.requirements_map import (
     ImportMatcherBase,
     ImportMatcherGlobs,
     ImportMatcherScope,
+    MappedRequirements,
     NoConfiguredRequirementMappingError,
     ReqMatcher,
     RequirementsMapper,
 )
-from pydependence._core.requirements_out import OutMappedRequirements
+from pydependence._core.requirements_out import (
+    OutMappedRequirements,
+    RequirementLayers,
+    extract_base_layer,
+)
 from pydependence._core.utils import (
     apply_root_to_path_str,
     load_toml_document,
@@ -125,8 +168,8 @@ class _ResolveRules(pydantic.BaseModel, extra="forbid"):
     # TODO: we should add some sort of option to ensure that generated dependency lists
     #       exactly match some pre-defined set, while also outputting this set.
 
-    # TODO: we do not yet ensure that raw added requirements do not conflict with
-    #       generated requirements.
+    # NOTE: raw requirements with the same name as generated requirements are reported
+    #       after writing all outputs, see `PydependenceCfg.strict_unused`.
 
     @classmethod
     def make_default_base_rules(cls):
@@ -258,6 +301,28 @@ class OutputModeEnum(str, Enum):
     dependencies = "dependencies"
 
 
+class CfgBudget(pydantic.BaseModel, extra="forbid"):
+    # requirements that must never be imported eagerly
+    deny: List[str] = pydantic.Field(default_factory=list)
+    # the maximum number of requirements that are imported eagerly
+    max_requirements: Optional[int] = None
+    # the maximum number of modules in the scope that are imported eagerly
+    max_modules: Optional[int] = None
+
+    @pydantic.field_validator("deny", mode="before")
+    @classmethod
+    def _validate_deny(cls, v):
+        return [v] if isinstance(v, str) else v
+
+
+class ResolverBudgetError(ValueError):
+    pass
+
+
+class UnusedRequirementsError(ValueError):
+    pass
+
+
 class _Output(_ResolveRules, extra="forbid"):
     # resolve
     scope: Optional[str] = None
@@ -276,6 +341,10 @@ class _Output(_ResolveRules, extra="forbid"):
     # !!!NB!!! DO NOT USE DIRECTLY! INSTEAD, USE `get_output_extras_name`
     output_name: Optional[str] = None
 
+    # limits on the eager imports from the start scope, e.g. to guard cold start
+    # latency, checked even if `visit_lazy` is set.
+    budget: Optional[CfgBudget] = None
+
     def get_output_extras_name(self) -> str:
         if self.output_name is not None:
             name = self.output_name
@@ -289,6 +358,17 @@ class _Output(_ResolveRules, extra="forbid"):
             )
         return normalize_extras_name(name, strict=False)
 
+    def get_input_files(self) -> "List[str]":
+        # files other than modules & the config that the output depends on
+        return []
+
+    def get_fingerprint_config(self, root: str) -> "Dict[str, Any]":
+        # the config that is fingerprinted, with paths relative to the root
+        config = self.model_dump(mode="json")
+        if self.output_file is not None:
+            config["output_file"] = relative_path(self.output_file, root)
+        return config
+
     def get_manual_imports(self):
         if not self.raw:
             return []
@@ -320,12 +400,10 @@ class _Output(_ResolveRules, extra="forbid"):
                 raise ValueError(f"start_scope is set, but scope is not set for: {v}")
         return v
 
-    def get_resolved_imports(
+    def get_scopes(
         self,
         loaded_scopes: "LoadedScopes",
-    ):
-        if not self.scope:
-            return []
+    ) -> "Tuple[ModulesScope, Optional[ModulesScope]]":
         # * normal scope
         if self.scope not in loaded_scopes:
             raise ValueError(
@@ -342,8 +420,51 @@ class _Output(_ResolveRules, extra="forbid"):
                 )
             else:
                 start_scope = loaded_scopes[self.start_scope]
+        return scope, start_scope
+
+    def get_batch_key(self) -> "Optional[Tuple[str, bool, bool]]":
+        # resolvers with the same key can share the same traversal
+        if not self.scope:
+            return None
+        return (self.scope, self.visit_lazy, self.re_add_lazy)
+
+    def get_mapping_key(self) -> "Tuple[Any, ...]":
+        # resolvers with the same key map the same imports, but may differ in env
+        return (
+            self.get_batch_key(),
+            self.start_scope,
+            self.exclude_unvisited,
+            self.exclude_in_search_space,
+            self.exclude_builtins,
+            self.strict_requirements_map,
+            tuple(self.raw or ()),
+        )
+
+    def iter_filtered_imports(
+        self,
+        resolved: "ScopeResolvedImports",
+    ) -> "Iterator[LocImportInfo]":
+        return resolved.iter_filtered(
+            exclude_unvisited=self.exclude_unvisited,
+            exclude_in_search_space=self.exclude_in_search_space,
+            exclude_builtins=self.exclude_builtins,
+        )
+
+    def get_filtered_imports(
+        self,
+        resolved: "ScopeResolvedImports",
+    ) -> "List[LocImportInfo]":
+        return list(self.iter_filtered_imports(resolved))
+
+    def iter_resolved_imports(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> "Iterator[LocImportInfo]":
+        if not self.scope:
+            return iter(())
+        scope, start_scope = self.get_scopes(loaded_scopes)
         # * resolve imports
-        return scope.resolve_imports(
+        return scope.iter_resolved_imports(
             start_scope=start_scope,
             visit_lazy=self.visit_lazy,
             re_add_lazy=self.re_add_lazy,
@@ -352,12 +473,129 @@ class _Output(_ResolveRules, extra="forbid"):
             exclude_builtins=self.exclude_builtins,
         )
 
+    def get_resolved_imports(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> "List[LocImportInfo]":
+        return list(self.iter_resolved_imports(loaded_scopes=loaded_scopes))
+
+    def get_import_chains(
+        self,
+        loaded_scopes: "LoadedScopes",
+        requirements_mapper: RequirementsMapper,
+        requirement: str,
+        *,
+        k: int = 1,
+    ) -> "Dict[str, List[List[LocImportInfo]]]":
+        """
+        Get the shortest chains of imports from the start scope of this resolver to
+        each output import target that maps to the requirement, or that is itself the
+        requirement as an import or import root. Returns chains for each target.
+        """
+        if not self.scope:
+            return {}
+        scope, start_scope = self.get_scopes(loaded_scopes)
+        resolved = scope.get_resolved_scope_imports(
+            start_scope=start_scope,
+            visit_lazy=self.visit_lazy,
+            re_add_lazy=self.re_add_lazy,
+            aggregate=True,
+        )
+        # 1. find the matching import targets
+        name = canonicalize_name(requirement)
+        targets = set()
+        for imp in self.iter_filtered_imports(resolved):
+            if imp.target in targets:
+                continue
+            if requirement in (imp.target, imp.root_target):
+                targets.add(imp.target)
+                continue
+            mapped = requirements_mapper.map_import_to_requirement_name(
+                imp.target, requirements_env=self.env
+            )
+            if mapped == name:
+                targets.add(imp.target)
+        # 2. get chains, sharing the same BFS tree
+        # - chains only walk eager imports, a lazy import is only allowed as the last
+        #   step, which mirrors how lazy imports of visited modules are re-added. Targets
+        #   that are only reached through lazy imports in between have no chains.
+        chains = scope.get_import_chains(
+            start_scope=start_scope,
+            visit_lazy=False,
+            re_add_lazy=self.re_add_lazy or self.visit_lazy,
+        )
+        return {t: chains.get_shortest_chains(t, k=k) for t in sorted(targets)}
+
+    def check_budget(
+        self,
+        loaded_scopes: "LoadedScopes",
+        requirements_mapper: RequirementsMapper,
+    ) -> "List[str]":
+        """
+        Check the eager imports from the start scope of this resolver against its
+        budget, regardless of `visit_lazy`. Returns a message for each violation,
+        including the offending chains of imports.
+        """
+        budget = self.budget
+        if budget is None or not self.scope:
+            return []
+        scope, start_scope = self.get_scopes(loaded_scopes)
+        resolved = scope.get_resolved_scope_imports(
+            start_scope=start_scope,
+            visit_lazy=False,
+            re_add_lazy=False,
+            aggregate=True,
+        )
+        chains = scope.get_import_chains(start_scope=start_scope, visit_lazy=False)
+        # 1. group eager import targets by requirement, each target is mapped once
+        targets = sorted({imp.target for imp in self.iter_filtered_imports(resolved)})
+        req_targets = defaultdict(list)
+        for target in targets:
+            name = requirements_mapper.map_import_to_requirement_name(
+                target, requirements_env=self.env
+            )
+            req_targets[name].append(target)
+
+        def _explain(requirement: str) -> "List[str]":
+            lines = []
+            for target in req_targets[requirement]:
+                lines.append(f"  {requirement} ← {target}:")
+                lines.extend(
+                    f"    {line}"
+                    for line in format_import_chain(chains.get_shortest_chain(target))
+                )
+            return lines
+
+        # 2. check
+        name = self.get_output_extras_name()
+        violations = []
+        for requirement in sorted({canonicalize_name(r) for r in budget.deny}):
+            if requirement in req_targets:
+                msg = f"[budget] resolver {repr(name)}: eagerly imports denied requirement {repr(requirement)}:"
+                violations.append("\n".join([msg, *_explain(requirement)]))
+        if budget.max_requirements is not None:
+            if len(req_targets) > budget.max_requirements:
+                msg = f"[budget] resolver {repr(name)}: {len(req_targets)} eager requirements exceeds max_requirements={budget.max_requirements}:"
+                lines = [msg]
+                for requirement in sorted(req_targets):
+                    lines.extend(_explain(requirement))
+                violations.append("\n".join(lines))
+        if budget.max_modules is not None:
+            modules = [m for m in resolved.get_visited() if scope.has_module(m)]
+            if len(modules) > budget.max_modules:
+                violations.append(
+                    f"[budget] resolver {repr(name)}: {len(modules)} eager modules exceeds max_modules={budget.max_modules}"
+                )
+        return violations
+
     def resolve_generate_and_write_requirements(
         self,
         loaded_scopes: "LoadedScopes",
         requirements_mapper: RequirementsMapper,
         *,
         dry_run: bool = False,
+        resolved_imports: "Optional[Iterable[LocImportInfo]]" = None,
+        mapped_requirements: "Optional[MappedRequirements]" = None,
     ) -> bool:
         """
         Resolve the imports, generate the requirements, and write the requirements to the output file.
@@ -366,17 +604,49 @@ class _Output(_ResolveRules, extra="forbid"):
             loaded_scopes (LoadedScopes): The loaded scopes to use for resolving imports.
             requirements_mapper (RequirementsMapper): The requirements mapper to use for generating requirements.
             dry_run (bool): If True, then do not write the requirements, only check if they would change.
+            resolved_imports (Optional[Iterable[LocImportInfo]]): If given, then these imports were already resolved in a batch and are used instead. May be a lazy iterator, which is consumed once.
+            mapped_requirements (Optional[MappedRequirements]): If given, then the requirements were already mapped in a batch, and the imports are not resolved or mapped again.
 
         Returns:
             bool: True if the file was changed, False if it was not changed.
         """
-        # 1. resolve imports
-        resolved_imports = self.get_resolved_imports(loaded_scopes=loaded_scopes)
+        # 1. resolve imports & generate requirements
+        out_requirements = self.generate_requirements(
+            loaded_scopes=loaded_scopes,
+            requirements_mapper=requirements_mapper,
+            resolved_imports=resolved_imports,
+            mapped_requirements=mapped_requirements,
+        )
+        # 2. write requirements
+        changed = self._write_requirements(
+            mapped_requirements=out_requirements,
+            dry_run=dry_run,
+        )
+        return changed
+
+    def generate_requirements(
+        self,
+        loaded_scopes: "LoadedScopes",
+        requirements_mapper: RequirementsMapper,
+        *,
+        resolved_imports: "Optional[Iterable[LocImportInfo]]" = None,
+        mapped_requirements: "Optional[MappedRequirements]" = None,
+    ) -> OutMappedRequirements:
+        """
+        Resolve the imports and generate the requirements, without writing them.
+        See `resolve_generate_and_write_requirements` for the arguments.
+        """
+        # 0. already mapped
+        if mapped_requirements is not None:
+            return mapped_requirements.to_output_requirements()
+        # 1. resolve imports, these are streamed into the mapper
+        if resolved_imports is None:
+            resolved_imports = self.iter_resolved_imports(loaded_scopes=loaded_scopes)
         manual_imports = self.get_manual_imports()
         # 2. generate requirements
         try:
-            mapped_requirements = requirements_mapper.generate_output_requirements(
-                imports=resolved_imports + manual_imports,
+            return requirements_mapper.generate_output_requirements(
+                imports=itertools.chain(resolved_imports, manual_imports),
                 requirements_env=self.env,
                 strict=self.strict_requirements_map,
                 resolver_name=self.get_output_extras_name(),
@@ -385,12 +655,35 @@ class _Output(_ResolveRules, extra="forbid"):
             msg = f"\n  | ".join(["", *str(e).split("\n")])
             msg = f"[requirement-mapping-error] output: {self.get_output_extras_name()}{msg}"
             raise NoConfiguredRequirementMappingError(msg, e.imports) from e
-        # 3. write requirements
-        changed = self._write_requirements(
-            mapped_requirements=mapped_requirements,
-            dry_run=dry_run,
+
+    def map_columnar(
+        self,
+        requirements_mapper: RequirementsMapper,
+        resolved: "ScopeResolvedImports",
+    ) -> MappedRequirements:
+        """
+        Map the requirements using the columnar table of the resolved imports, which
+        is shared by all resolvers with the same resolved imports. Imports are filtered
+        with masks and grouped with a sort, instead of one import at a time.
+        """
+        mask = resolved.get_filter_mask(
+            exclude_unvisited=self.exclude_unvisited,
+            exclude_in_search_space=self.exclude_in_search_space,
+            exclude_builtins=self.exclude_builtins,
         )
-        return changed
+        try:
+            return requirements_mapper.generate_mapped_requirements_from_table(
+                resolved.get_table(),
+                mask,
+                imports=self.get_manual_imports(),
+                requirements_env=self.env,
+                strict=self.strict_requirements_map,
+                resolver_name=self.get_output_extras_name(),
+            )
+        except NoConfiguredRequirementMappingError as e:
+            msg = f"\n  | ".join(["", *str(e).split("\n")])
+            msg = f"[requirement-mapping-error] output: {self.get_output_extras_name()}{msg}"
+            raise NoConfiguredRequirementMappingError(msg, e.imports) from e
 
     def _write_requirements(
         self, mapped_requirements: OutMappedRequirements, *, dry_run: bool
@@ -413,6 +706,22 @@ class _Output(_ResolveRules, extra="forbid"):
 class _OutputRequirements(_Output):
     output_mode: Literal[OutputModeEnum.requirements]
 
+    # pin requirements to the versions in a pip-compile style requirements file,
+    # `uv.lock` or `poetry.lock`, optionally with hashes for `--require-hashes`
+    # NOTE: pip-compile files have no dependency edges, so all their packages are
+    #       output as the transitive dependencies, even if not needed.
+    lockfile: Optional[str] = None
+    lockfile_hashes: bool = True
+
+    def get_input_files(self) -> "List[str]":
+        return [self.lockfile] if self.lockfile else []
+
+    def get_fingerprint_config(self, root: str) -> "Dict[str, Any]":
+        config = super().get_fingerprint_config(root)
+        if self.lockfile is not None:
+            config["lockfile"] = relative_path(self.lockfile, root)
+        return config
+
     def _write_requirements(
         self,
         mapped_requirements: OutMappedRequirements,
@@ -425,6 +734,8 @@ class _OutputRequirements(_Output):
             sources_compact=False,
             sources_roots=False,
             indent_size=4,
+            lockfile=load_lockfile(self.lockfile) if self.lockfile else None,
+            hashes=self.lockfile_hashes,
         )
         LOGGER.info(f"writing requirements to: {self.output_file}")
 
@@ -499,6 +810,70 @@ CfgResolver = Annotated[
     pydantic.Field(discriminator="output_mode", union_mode="left_to_right"),
 ]
 
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
+# CONFIG - LAYERS                                                           #
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
+
+
+class CfgLayer(pydantic.BaseModel, extra="forbid"):
+    # the output names of the resolvers that share a base layer, e.g. for images
+    # that each install a different extra, but can reuse the same cached base.
+    resolvers: List[str]
+
+    # requirements needed by at least this fraction of the resolvers are in the
+    # base, lower values reuse the base more, but add requirements to resolvers
+    # that do not need them.
+    min_share: float = 1.0
+
+    # output, the base layer is named `output_name`, and the remaining requirements
+    # of each resolver are named by formatting `delta_name`. Requirements files are
+    # named by formatting `output_file` with the `{name}` of each layer.
+    output_mode: Literal[
+        OutputModeEnum.requirements, OutputModeEnum.optional_dependencies
+    ]
+    output_file: Optional[str] = None
+    output_name: str = "base"
+    delta_name: str = "{resolver}-delta"
+
+    @pydantic.field_validator("output_name", mode="before")
+    @classmethod
+    def _validate_output_name(cls, v):
+        return normalize_extras_name(v, strict=True)
+
+    @pydantic.model_validator(mode="after")
+    @classmethod
+    def _validate_model(cls, v):
+        if not v.resolvers:
+            raise ValueError(f"layer must have at least one resolver: {v}")
+        if len(set(v.resolvers)) != len(v.resolvers):
+            raise ValueError(f"layer resolvers must be unique: {v.resolvers}")
+        if not (0 < v.min_share <= 1):
+            raise ValueError(f"min_share must be in the range (0, 1]: {v}")
+        return v
+
+    def get_delta_name(self, resolver: str) -> str:
+        return normalize_extras_name(
+            self.delta_name.format(resolver=resolver), strict=False
+        )
+
+    def get_layer_names(self) -> "List[str]":
+        return [self.output_name, *map(self.get_delta_name, self.resolvers)]
+
+    def make_output(self, name: str) -> "CfgResolver":
+        if self.output_mode == OutputModeEnum.requirements:
+            return _OutputRequirements(
+                output_mode=self.output_mode,
+                output_file=self.output_file.format(name=name),
+                output_name=name,
+            )
+        else:
+            return _OutputPyprojectOptionalDeps(
+                output_mode=self.output_mode,
+                output_file=self.output_file,
+                output_name=name,
+            )
+
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
 # CONFIG - PACKAGES                                                         #
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
@@ -589,7 +964,9 @@ class CfgVersion(pydantic.BaseModel, extra="forbid", arbitrary_types_allowed=Tru
             if self.import_ is not None:
                 raise ValueError(f"cannot specify both scope and import for: {self}")
             else:
-                return ImportMatcherScope(scope=loaded_scopes[self.scope])
+                return ImportMatcherScope(
+                    scope=loaded_scopes[self.scope], name=self.scope
+                )
         else:
             if self.import_ is None:
                 raise ValueError(f"must specify either scope or import for: {self}")
@@ -632,16 +1009,26 @@ class _ScopeRules(pydantic.BaseModel, extra="forbid"):
     # the scope to be created, but this can be relaxed to `skip` or `keep` these files.
     unreachable_mode: Optional[UnreachableModeEnum] = None
 
+    # Specify how to handle cycles of eager imports within the scope that are not
+    # listed in `allowed_cycles`. Cycles make module initialization slow and fragile.
+    # By default, for `ignore`, cycles are not checked, but a warning can be given
+    # with `warn`, or an exception raised with `error`, e.g. to fail CI.
+    cycles_mode: Optional[CyclesModeEnum] = None
+
     @classmethod
     def make_default_base_rules(cls):
         return _ScopeRules(
             unreachable_mode=UnreachableModeEnum.error,
+            cycles_mode=CyclesModeEnum.ignore,
         )
 
     def set_defaults(self, defaults: "_ScopeRules"):
         assert defaults.unreachable_mode is not None
+        assert defaults.cycles_mode is not None
         if self.unreachable_mode is None:
             self.unreachable_mode = defaults.unreachable_mode
+        if self.cycles_mode is None:
+            self.cycles_mode = defaults.cycles_mode
 
 
 class CfgScope(_ScopeRules, extra="forbid"):
@@ -675,6 +1062,10 @@ class CfgScope(_ScopeRules, extra="forbid"):
     # - imports must belong to the scope
     subscopes: Dict[str, str] = pydantic.Field(default_factory=dict)
 
+    # known cycles of eager imports, each a list of modules. Only cycles that are not
+    # contained within one of these are reported by `cycles_mode`.
+    allowed_cycles: List[List[str]] = pydantic.Field(default_factory=list)
+
     @pydantic.field_validator("search_paths", mode="before")
     @classmethod
     def _validate_search_paths(cls, v):
@@ -793,6 +1184,14 @@ class LoadedScopes:
         return sorted(self._scopes.keys())
 
 
+class LoadedFingerprints(NamedTuple):
+    # None if fingerprints are not enabled
+    store: "Optional[FingerprintsStore]"
+    hasher: ModuleHasher
+    # indices of resolvers with unchanged fingerprints since the last run
+    unchanged: "Set[int]"
+
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
 # CONFIG - ROOT                                                             #
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
@@ -803,6 +1202,10 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
     # and is the folder containing the repo of the pyproject.toml file
     default_root: str = "."
 
+    # if set, then fingerprints of resolvers are stored in this file, and resolvers
+    # that are unchanged since the last run are skipped.
+    fingerprints_file: Optional[str] = None
+
     # default write modes
     default_resolve_rules: _ResolveRules = pydantic.Field(
         default_factory=_ResolveRules.make_default_base_rules
@@ -820,6 +1223,27 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
     # outputs
     resolvers: List[CfgResolver] = pydantic.Field(default_factory=list)
 
+    # shared base layers of requirements across resolvers
+    layers: List[CfgLayer] = pydantic.Field(default_factory=list)
+
+    # how the start scopes of resolvers are resolved, a BFS for each distinct start
+    # scope, or the union of a closure table shared by all start scopes of a scope.
+    resolve_engine: ResolveEngineEnum = ResolveEngineEnum.bfs
+
+    # if true, then resolved imports are held in columnar tables shared by resolvers,
+    # and each resolver filters and groups its imports with vectorized operations on
+    # the table. Resolvers that only differ in their env are still mapped together.
+    columnar: bool = False
+
+    # if lean, then the debug only fields of parsed imports are dropped to save memory,
+    # i.e. the column offsets and the stacks of ast node kinds of import statements.
+    lean: bool = False
+
+    # after writing all outputs, versions that never matched any import, and raw
+    # requirements that duplicate generated requirements are reported as warnings.
+    # If strict, then an error is raised instead.
+    strict_unused: bool = False
+
     @pydantic.field_validator("versions", mode="before")
     @classmethod
     def _validate_versions(cls, v, values):
@@ -886,6 +1310,8 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
             return apply_root_to_path_str(self.default_root, x)
 
         # apply to all paths
+        if self.fingerprints_file is not None:
+            self.fingerprints_file = _resolve_path(self.fingerprints_file)
         for scope in self.scopes:
             scope.search_paths = [_resolve_path(x) for x in scope.search_paths]
             scope.pkg_paths = [_resolve_path(x) for x in scope.pkg_paths]
@@ -904,10 +1330,30 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
                         f"output_file must be the pyproject.toml file for: {output}"
                     )
             elif isinstance(output, _OutputRequirements):
+                if output.lockfile is not None:
+                    output.lockfile = _resolve_path(output.lockfile)
                 if Path(output.output_file).suffix != ".txt":
                     raise ValueError(
                         f"output_file must be requirements*.txt for: {output}"
                     )
+        for layer in self.layers:
+            if layer.output_mode == OutputModeEnum.optional_dependencies:
+                if layer.output_file is None:
+                    layer.output_file = _resolve_path(config_path)
+                if Path(layer.output_file).name != "pyproject.toml":
+                    raise ValueError(
+                        f"output_file must be the pyproject.toml file for: {layer}"
+                    )
+            else:
+                if layer.output_file is None or "{name}" not in layer.output_file:
+                    raise ValueError(
+                        f"output_file must be a requirements*.txt file containing `{{name}}` for: {layer}"
+                    )
+                layer.output_file = _resolve_path(layer.output_file)
+                if Path(layer.output_file).suffix != ".txt":
+                    raise ValueError(
+                        f"output_file must be requirements*.txt for: {layer}"
+                    )
 
         # also apply all default write modes
         self.default_scope_rules.set_defaults(_ScopeRules.make_default_base_rules())
@@ -918,6 +1364,8 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
             output.set_defaults(self.default_resolve_rules)
 
     def load_scopes(self) -> "LoadedScopes":
+        # imports are parsed lazily by the shared loader, in the mode of the config
+        DEFAULT_MODULE_IMPORTS_LOADER.set_lean(self.lean)
         # resolve all scopes
         loaded_scopes = LoadedScopes()
         for scope_cfg in self.scopes:
@@ -932,6 +1380,133 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
         # done!
         return loaded_scopes
 
+    def get_import_cycles(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> "Dict[str, List[ImportCycle]]":
+        """
+        Get all the non-trivial cycles of eager imports within each scope.
+        """
+        return {
+            scope_cfg.name: loaded_scopes[scope_cfg.name].get_import_cycles()
+            for scope_cfg in self.scopes
+        }
+
+    def check_import_cycles(
+        self,
+        loaded_scopes: "LoadedScopes",
+        *,
+        skip: "Optional[Set[str]]" = None,
+    ) -> "Dict[str, List[ImportCycle]]":
+        """
+        Check for new cycles of eager imports within scopes, depending on the
+        `cycles_mode` of each scope. Returns the new cycles of each checked scope.
+        Scopes in `skip` are not checked, e.g. scopes from `get_unchanged_scopes`.
+
+        :raises ImportCyclesError: if a scope with `cycles_mode="error"` has new cycles.
+        """
+        new_cycles, errors = {}, []
+        for scope_cfg in self.scopes:
+            if scope_cfg.cycles_mode == CyclesModeEnum.ignore:
+                continue
+            if skip and scope_cfg.name in skip:
+                LOGGER.info(
+                    f"[FINGERPRINT] unchanged, skipping cycles: {scope_cfg.name}"
+                )
+                continue
+            cycles = loaded_scopes[scope_cfg.name].get_import_cycles()
+            cycles = _get_new_import_cycles(cycles, scope_cfg.allowed_cycles)
+            new_cycles[scope_cfg.name] = cycles
+            if not cycles:
+                continue
+            msg = format_import_cycles(scope_cfg.name, cycles)
+            if scope_cfg.cycles_mode == CyclesModeEnum.error:
+                errors.append(msg)
+            else:
+                warnings.warn(msg)
+        if errors:
+            raise ImportCyclesError("\n".join(errors))
+        return new_cycles
+
+    def get_unused_versions(
+        self,
+        requirements_mapper: RequirementsMapper,
+    ) -> "List[CfgVersion]":
+        """
+        Get the versions that never matched an import, using the hit counts of a mapper
+        made with `make_requirements_mapper` after it was used by all resolvers.
+
+        NOTE: versions that map a scope are never reported, imports of modules within
+              the search space of a resolver are filtered out before they are mapped,
+              so the scope of a package usually never matches its own imports.
+        """
+        version_hits = requirements_mapper.get_requirement_hits()
+        unused = []
+        for v in self.versions:
+            if v.scope is not None:
+                continue
+            if not version_hits.get((v.env, v.requirement)):
+                unused.append(v)
+        return unused
+
+    def check_unused(
+        self,
+        requirements_mapper: RequirementsMapper,
+        raw_duplicates: "Dict[str, List[Tuple[str, List[str]]]]",
+        *,
+        check_versions: bool = True,
+    ) -> "List[str]":
+        """
+        Report versions that never matched an import, and raw requirements that
+        duplicate generated requirements of each resolver, as warnings, or as an error
+        if `strict_unused` is set. Returns the messages.
+
+        :raises UnusedRequirementsError: if anything is unused and `strict_unused` is set.
+        """
+        msgs = []
+        if check_versions:
+            for v in self.get_unused_versions(requirements_mapper):
+                msgs.append(
+                    f"[unused] version {repr(v.requirement)} in env {repr(v.env)} never matched an import of any resolver"
+                )
+        for name, duplicates in raw_duplicates.items():
+            for requirement, modules in duplicates:
+                msgs.append(
+                    f"[unused] resolver {repr(name)}: raw requirement {repr(requirement)} duplicates a generated requirement, imported by: {modules}"
+                )
+        if msgs and self.strict_unused:
+            raise UnusedRequirementsError("\n".join(msgs))
+        for msg in msgs:
+            warnings.warn(msg)
+        return msgs
+
+    def check_budgets(
+        self,
+        loaded_scopes: "LoadedScopes",
+        *,
+        skip: "Optional[Set[int]]" = None,
+    ) -> None:
+        """
+        Check the eager imports of all resolvers against their budgets. Resolvers with
+        indices in `skip` are not checked, e.g. resolvers with unchanged fingerprints.
+
+        :raises ResolverBudgetError: if the budget of any resolver is exceeded.
+        """
+        skip = skip or set()
+        checked = [
+            output
+            for i, output in enumerate(self.resolvers)
+            if output.budget is not None and i not in skip
+        ]
+        if not checked:
+            return
+        requirements_mapper = self.make_requirements_mapper(loaded_scopes)
+        violations = []
+        for output in checked:
+            violations.extend(output.check_budget(loaded_scopes, requirements_mapper))
+        if violations:
+            raise ResolverBudgetError("\n".join(violations))
+
     def make_requirements_mapper(
         self,
         loaded_scopes: "LoadedScopes",
@@ -947,11 +1522,253 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
             env_matchers=env_matchers,
         )
 
+    def get_import_chains(
+        self,
+        loaded_scopes: "LoadedScopes",
+        requirement: str,
+        *,
+        resolver: "Optional[str]" = None,
+        k: int = 1,
+    ) -> "List[Tuple[CfgResolver, Dict[str, List[List[LocImportInfo]]]]]":
+        """
+        Get the import chains that explain why a requirement is output by each
+        resolver, optionally only for resolvers with the given output name. Resolvers
+        without a scope are skipped.
+        """
+        names = {o.get_output_extras_name() for o in self.resolvers}
+        if resolver is not None and resolver not in names:
+            raise ValueError(
+                f"resolver {repr(resolver)} does not exist, must be one of: {sorted(names)}"
+            )
+        requirements_mapper = self.make_requirements_mapper(loaded_scopes)
+        results = []
+        for output in self.resolvers:
+            if not output.scope:
+                continue
+            if resolver is not None and output.get_output_extras_name() != resolver:
+                continue
+            chains = output.get_import_chains(
+                loaded_scopes, requirements_mapper, requirement, k=k
+            )
+            results.append((output, chains))
+        return results
+
+    def resolve_all_scopes(
+        self,
+        loaded_scopes: "LoadedScopes",
+        *,
+        aggregate: bool = False,
+        skip: "Optional[Set[int]]" = None,
+    ) -> "List[Optional[ScopeResolvedImports]]":
+        """
+        Batch resolve all resolvers, returning the unfiltered results of each resolver
+        in the same order as the resolvers, or None if the resolver has no scope.
+
+        Resolvers are grouped by their (scope, visit_lazy, re_add_lazy), within each
+        group every distinct start scope is resolved once using the memoized resolves
+        of the scope, so resolvers that only differ in their env, raw requirements or
+        outputs share the same results.
+
+        If aggregate is True, then imports are aggregated per (source, target) pair,
+        which is all that is needed to generate requirements. Resolvers with indices
+        in skip are not resolved.
+        """
+        # 1. plan
+        batches = defaultdict(list)
+        for i, output in enumerate(self.resolvers):
+            if skip and i in skip:
+                continue
+            key = output.get_batch_key()
+            if key is not None:
+                batches[key].append(i)
+        # 2. resolve each batch
+        results = [None for _ in self.resolvers]
+        for (_, visit_lazy, re_add_lazy), idxs in batches.items():
+            outputs = [self.resolvers[i] for i in idxs]
+            scopes = [output.get_scopes(loaded_scopes) for output in outputs]
+            scope = scopes[0][0]
+            resolved = ScopeResolvedImports.from_scopes_memoized(
+                scope=scope,
+                start_scopes=[start_scope for _, start_scope in scopes],
+                visit_lazy=visit_lazy,
+                re_add_lazy=re_add_lazy,
+                engine=self.resolve_engine,
+                aggregate=aggregate,
+            )
+            for i, r in zip(idxs, resolved):
+                results[i] = r
+        return results
+
+    def resolve_all_imports(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> "List[List[LocImportInfo]]":
+        """
+        Batch resolve the imports of all resolvers, returning the filtered imports of
+        each resolver in the same order as the resolvers.
+        """
+        results = []
+        for output, r in zip(self.resolvers, self.resolve_all_scopes(loaded_scopes)):
+            results.append([] if r is None else output.get_filtered_imports(r))
+        return results
+
+    def map_all_envs(
+        self,
+        requirements_mapper: RequirementsMapper,
+        resolved: "List[Optional[ScopeResolvedImports]]",
+        *,
+        skip: "Optional[Set[int]]" = None,
+    ) -> "Dict[int, MappedRequirements]":
+        """
+        Map the requirements of resolvers that share the same imports, but that differ
+        in their env, in a single pass over their imports. Returns the mapped
+        requirements of each of these resolvers by index, other resolvers are not
+        included and should be mapped on their own.
+        """
+        groups = defaultdict(list)
+        for i, output in enumerate(self.resolvers):
+            if skip and i in skip:
+                continue
+            groups[output.get_mapping_key()].append(i)
+        results = {}
+        for idxs in groups.values():
+            outputs = [self.resolvers[i] for i in idxs]
+            envs = list(dict.fromkeys(output.env for output in outputs))
+            if len(envs) < 2:
+                continue
+            first, r = outputs[0], resolved[idxs[0]]
+            imports = iter(()) if r is None else first.iter_filtered_imports(r)
+            try:
+                mapped = requirements_mapper.generate_mapped_requirements_envs(
+                    itertools.chain(imports, first.get_manual_imports()),
+                    requirements_envs=envs,
+                    strict=first.strict_requirements_map,
+                )
+            except NoConfiguredRequirementMappingError as e:
+                names = ", ".join(output.get_output_extras_name() for output in outputs)
+                msg = f"\n  | ".join(["", *str(e).split("\n")])
+                msg = f"[requirement-mapping-error] outputs: {names}{msg}"
+                raise NoConfiguredRequirementMappingError(msg, e.imports) from e
+            for i, output in zip(idxs, outputs):
+                results[i] = MappedRequirements(
+                    requirements=mapped[output.env].requirements,
+                    resolver_name=output.get_output_extras_name(),
+                )
+        return results
+
+    def map_all_columnar(
+        self,
+        requirements_mapper: RequirementsMapper,
+        resolved: "List[Optional[ScopeResolvedImports]]",
+        *,
+        skip: "Optional[Set[int]]" = None,
+    ) -> "Dict[int, MappedRequirements]":
+        """
+        Map the requirements of resolvers using the columnar tables of their resolved
+        imports, if `columnar` is enabled. Returns the mapped requirements of each of
+        these resolvers by index, resolvers without a scope are not included.
+        """
+        if not self.columnar:
+            return {}
+        results = {}
+        for i, (output, r) in enumerate(zip(self.resolvers, resolved)):
+            if r is None or (skip and i in skip):
+                continue
+            results[i] = output.map_columnar(requirements_mapper, r)
+        return results
+
+    def generate_all_requirements(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> "Dict[str, OutMappedRequirements]":
+        """
+        Generate the requirements of all resolvers by output name, without writing them.
+        """
+        requirements_mapper = self.make_requirements_mapper(loaded_scopes=loaded_scopes)
+        resolved = self.resolve_all_scopes(loaded_scopes=loaded_scopes, aggregate=True)
+        premapped = self.map_all_envs(requirements_mapper, resolved)
+        premapped.update(
+            self.map_all_columnar(requirements_mapper, resolved, skip=set(premapped))
+        )
+        generated = {}
+        for i, (output, r) in enumerate(zip(self.resolvers, resolved)):
+            imports = iter(()) if r is None else output.iter_filtered_imports(r)
+            generated[output.get_output_extras_name()] = output.generate_requirements(
+                loaded_scopes=loaded_scopes,
+                requirements_mapper=requirements_mapper,
+                resolved_imports=imports,
+                mapped_requirements=premapped.get(i, None),
+            )
+        return generated
+
+    def get_footprints(
+        self,
+        loaded_scopes: "LoadedScopes",
+        *,
+        paths: "Optional[List[str]]" = None,
+    ) -> "Dict[str, Dict[str, Any]]":
+        """
+        Get the installed footprint of the generated requirements of each resolver,
+        read offline from the distributions installed in the paths, `sys.path` by
+        default. Each requirement reports its own size & file count, its transitive
+        `Requires-Dist` closure and the size of the closure, and the modules that
+        import it. Each resolver reports the totals of the union of all closures.
+        """
+        dists = InstalledDists(paths)
+        return {
+            name: dists.get_requirements_footprint(out_requirements)
+            for name, out_requirements in self.generate_all_requirements(
+                loaded_scopes
+            ).items()
+        }
+
+    def get_layers(
+        self,
+        generated: "Dict[str, OutMappedRequirements]",
+    ) -> "List[Tuple[CfgLayer, RequirementLayers]]":
+        """
+        Split the generated requirements of the resolvers of each layer, by output
+        name, into the shared base layer and the deltas of each resolver.
+        """
+        results = []
+        for layer in self.layers:
+            missing = [name for name in layer.resolvers if name not in generated]
+            if missing:
+                raise ValueError(
+                    f"layer {repr(layer.output_name)} resolvers {missing} do not exist! Are you sure they have been defined? Available resolvers: {sorted(generated)}"
+                )
+            split = extract_base_layer(
+                {name: generated[name] for name in layer.resolvers},
+                min_share=layer.min_share,
+                base_name=layer.output_name,
+            )
+            results.append((layer, split))
+        return results
+
+    def write_all_layers(
+        self,
+        generated: "Dict[str, OutMappedRequirements]",
+        *,
+        dry_run: bool = False,
+    ) -> bool:
+        changed = False
+        for layer, split in self.get_layers(generated):
+            for out_requirements in split.get_outputs(layer.get_delta_name):
+                output = layer.make_output(out_requirements.resolver_name)
+                diff = output._write_requirements(
+                    mapped_requirements=out_requirements,
+                    dry_run=dry_run,
+                )
+                if diff:
+                    changed = True
+        return changed
+
     def write_all_outputs(
         self,
         loaded_scopes: "LoadedScopes",
         *,
         dry_run: bool = False,
+        fingerprints: "Optional[LoadedFingerprints]" = None,
     ) -> bool:
         # check that scope output names are unique
         # - output names only need to be unique if they are optional-dependencies!
@@ -971,6 +1788,14 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
                         f"output name {repr(name)} is not unique across resolvers for optional dependencies!"
                     )
                 names_optional_deps.add(name)
+        for layer in self.layers:
+            if layer.output_mode == OutputModeEnum.optional_dependencies:
+                for name in layer.get_layer_names():
+                    if name in names_optional_deps:
+                        raise ValueError(
+                            f"layer output name {repr(name)} is not unique across resolvers and layers for optional dependencies!"
+                        )
+                    names_optional_deps.add(name)
 
         # check that the scopes exists
         for output in self.resolvers:
@@ -988,20 +1813,248 @@ class PydependenceCfg(pydantic.BaseModel, extra="forbid"):
 
         # make the mapper
         requirements_mapper = self.make_requirements_mapper(loaded_scopes=loaded_scopes)
+        for c in requirements_mapper.get_matcher_conflicts():
+            warnings.warn(
+                f"version {repr(c.requirement)} with {c.matcher} in env {repr(c.requirements_env)} never matches, it is shadowed by earlier versions: {list(c.shadowed_by)}"
+            )
+
+        # skip resolvers with unchanged fingerprints since the last run
+        if fingerprints is None:
+            fingerprints = self.load_fingerprints(loaded_scopes)
+        # - layers need the requirements of all their resolvers
+        layered = {name for layer in self.layers for name in layer.resolvers}
+        skipped = {
+            i
+            for i in fingerprints.unchanged
+            if self.resolvers[i].get_output_extras_name() not in layered
+        }
+
+        # resolve the scopes in batches!
+        # - mapping only needs the source, target and laziness of imports, so imports
+        #   are aggregated per (source, target) instead of per statement.
+        resolved = self.resolve_all_scopes(
+            loaded_scopes=loaded_scopes, aggregate=True, skip=skipped
+        )
 
-        # resolve the scopes!
+        # resolvers that only differ in their env are mapped together
+        premapped = self.map_all_envs(requirements_mapper, resolved, skip=skipped)
+        premapped.update(
+            self.map_all_columnar(
+                requirements_mapper, resolved, skip=skipped | set(premapped)
+            )
+        )
+
+        # generate and write the outputs
+        # - filtered imports are streamed into the mapper, one output at a time.
         changed = False
-        for output in self.resolvers:
-            diff = output.resolve_generate_and_write_requirements(
+        generated: "Dict[str, OutMappedRequirements]" = {}
+        raw_duplicates = {}
+        for i, (output, r) in enumerate(zip(self.resolvers, resolved)):
+            name = output.get_output_extras_name()
+            if i in skipped:
+                LOGGER.info(f"[FINGERPRINT] unchanged, skipping: {name}")
+                continue
+            imports = iter(()) if r is None else output.iter_filtered_imports(r)
+            out_requirements = output.generate_requirements(
                 loaded_scopes=loaded_scopes,
                 requirements_mapper=requirements_mapper,
+                resolved_imports=imports,
+                mapped_requirements=premapped.get(i, None),
+            )
+            if name in layered:
+                generated[name] = out_requirements
+            if output.raw:
+                raw_duplicates[name] = out_requirements.get_raw_duplicates()
+            diff = output._write_requirements(
+                mapped_requirements=out_requirements,
                 dry_run=dry_run,
             )
             if diff:
                 changed = True
 
+        # write the shared base layers & deltas
+        if self.write_all_layers(generated, dry_run=dry_run):
+            changed = True
+
+        # report unused versions & raw requirements
+        # - versions can only be checked if all resolvers were mapped
+        if skipped:
+            LOGGER.info("[unused] resolvers were skipped, not checking versions")
+        self.check_unused(
+            requirements_mapper, raw_duplicates, check_versions=not skipped
+        )
+
+        # store the new fingerprints
+        if not dry_run:
+            self.save_fingerprints(loaded_scopes, fingerprints, resolved, skip=skipped)
+
         return changed
 
+    # ... FINGERPRINTS ...
+
+    def _get_fingerprint_key(self, i: int) -> str:
+        return f"{i}:{self.resolvers[i].get_output_extras_name()}"
+
+    def _get_fingerprint_base(
+        self,
+        loaded_scopes: "LoadedScopes",
+        *,
+        hasher: ModuleHasher,
+    ) -> str:
+        # shared by all resolvers, the versions table and membership of all scopes,
+        # e.g. versions can match imports using scopes. Results can also change
+        # between versions of pydependence. The cycle checks of scopes are included
+        # so that unchanged scopes can skip them.
+        versions = [v.model_dump(by_alias=True) for v in self.versions]
+        cycles = [(s.name, s.cycles_mode, s.allowed_cycles) for s in self.scopes]
+        return hash_strings(
+            str(FINGERPRINTS_FORMAT_VERSION),
+            get_tool_version(),
+            json.dumps(versions, sort_keys=True),
+            json.dumps(cycles),
+            *(
+                f"{name}={hasher.get_scope_hash(loaded_scopes[name])}"
+                for name in loaded_scopes.sorted_names
+            ),
+        )
+
+    def _get_resolver_fingerprint(
+        self,
+        output: "CfgResolver",
+        *,
+        base: str,
+        scope: "Optional[ModulesScope]",
+        closure: "List[str]",
+        hasher: ModuleHasher,
+    ) -> "Optional[str]":
+        return hasher.get_resolver_hash(
+            base,
+            config=output.get_fingerprint_config(self.default_root),
+            scope=scope,
+            closure=closure,
+            input_files=output.get_input_files(),
+        )
+
+    def get_unchanged_resolvers(
+        self,
+        loaded_scopes: "LoadedScopes",
+        store: FingerprintsStore,
+        *,
+        hasher: "Optional[ModuleHasher]" = None,
+    ) -> "Set[int]":
+        """
+        Get the indices of resolvers that do not need to run again. The fingerprint of
+        each resolver combines its config, the versions table, the membership of all
+        scopes, the contents of the modules visited on the last run, any other input
+        files such as lock files, and the version of pydependence. If none of these
+        changed, and its output file was not modified since the last run, then the
+        output would be the same. Paths are relative to the default root, so stored
+        fingerprints remain valid if the repository is moved or checked out elsewhere.
+        """
+        if hasher is None:
+            hasher = ModuleHasher(root=self.default_root)
+        base = self._get_fingerprint_base(loaded_scopes, hasher=hasher)
+        unchanged = set()
+        for i, output in enumerate(self.resolvers):
+            record = store.resolvers.get(self._get_fingerprint_key(i), None)
+            if record is None:
+                continue
+            # check the output was not modified
+            output_hash = hasher.get_file_hash(output.output_file)
+            output_key = relative_path(output.output_file, self.default_root)
+            if output_hash is None or output_hash != store.outputs.get(output_key):
+                continue
+            # check the fingerprint
+            fingerprint = self._get_resolver_fingerprint(
+                output,
+                base=base,
+                scope=loaded_scopes[output.scope] if output.scope else None,
+                closure=record.closure,
+                hasher=hasher,
+            )
+            if fingerprint == record.fingerprint:
+                unchanged.add(i)
+        return unchanged
+
+    def load_fingerprints(
+        self,
+        loaded_scopes: "LoadedScopes",
+    ) -> LoadedFingerprints:
+        """
+        Load the fingerprints stored by the last run, and find the resolvers that are
+        unchanged, if `fingerprints_file` is set.
+        """
+        hasher = ModuleHasher(root=self.default_root)
+        if self.fingerprints_file is None:
+            return LoadedFingerprints(None, hasher, set())
+        store = FingerprintsStore.load(self.fingerprints_file)
+        unchanged = self.get_unchanged_resolvers(loaded_scopes, store, hasher=hasher)
+        return LoadedFingerprints(store, hasher, unchanged)
+
+    def save_fingerprints(
+        self,
+        loaded_scopes: "LoadedScopes",
+        fingerprints: LoadedFingerprints,
+        resolved: "List[Optional[ScopeResolvedImports]]",
+        *,
+        skip: "Set[int]",
+    ) -> None:
+        """
+        Store the fingerprints of the resolvers and the hashes of the outputs after
+        they were written, keeping the stored fingerprints of skipped resolvers.
+        """
+        store, hasher, _ = fingerprints
+        if store is None:
+            return
+        base = self._get_fingerprint_base(loaded_scopes, hasher=hasher)
+        resolvers = {}
+        for i, (output, r) in enumerate(zip(self.resolvers, resolved)):
+            key = self._get_fingerprint_key(i)
+            if i in skip:
+                resolvers[key] = store.resolvers[key]
+                continue
+            scope = loaded_scopes[output.scope] if output.scope else None
+            closure = []
+            if r is not None:
+                closure = sorted(filter(scope.has_module, r.get_visited()))
+            fingerprint = self._get_resolver_fingerprint(
+                output, base=base, scope=scope, closure=closure, hasher=hasher
+            )
+            if fingerprint is not None:
+                resolvers[key] = ResolverFingerprint(fingerprint, closure)
+        # outputs were written, so need to be hashed again
+        output_hasher = ModuleHasher()
+        store.resolvers = resolvers
+        store.outputs = {
+            relative_path(output.output_file, self.default_root): (
+                output_hasher.get_file_hash(output.output_file)
+            )
+            for output in self.resolvers
+        }
+        store.save(self.fingerprints_file)
+
+    def get_unchanged_scopes(
+        self,
+        loaded_scopes: "LoadedScopes",
+        fingerprints: LoadedFingerprints,
+    ) -> "Set[str]":
+        """
+        Get the names of scopes whose modules were all visited by unchanged resolvers,
+        the contents of these modules are part of the fingerprints, so the import
+        cycles of these scopes are the same as on the last run.
+        """
+        visited = defaultdict(set)
+        for i in fingerprints.unchanged:
+            output = self.resolvers[i]
+            if output.scope:
+                record = fingerprints.store.resolvers[self._get_fingerprint_key(i)]
+                visited[output.scope].update(record.closure)
+        return {
+            name
+            for name, modules in visited.items()
+            if modules.issuperset(loaded_scopes[name].iter_modules())
+        }
+
     # ... LOADING ...
 
     @classmethod
@@ -1059,11 +2112,9 @@ class _PyprojectToml(pydantic.BaseModel, extra="ignore"):
 # ========================================================================= #
 
 
-def pydeps(
-    *,
+def _load_cfg_and_scopes(
     config_path: Union[str, Path],
-    dry_run: bool = False,
-) -> bool:
+) -> "Tuple[PydependenceCfg, LoadedScopes]":
     # 1. get absolute
     config_path = Path(config_path).resolve().absolute()
     LOGGER.info(f"loading pydependence config from: {config_path}")
@@ -1071,14 +2122,132 @@ def pydeps(
     pydependence = PydependenceCfg.from_file_automatic(config_path)
     # 3. generate search spaces, recursively resolving!
     loaded_scopes = pydependence.load_scopes()
-    # 4. generate outputs
+    return pydependence, loaded_scopes
+
+
+def pydeps(
+    *,
+    config_path: Union[str, Path],
+    dry_run: bool = False,
+    engine: "Optional[Union[str, ResolveEngineEnum]]" = None,
+) -> bool:
+    pydependence, loaded_scopes = _load_cfg_and_scopes(config_path)
+    if engine is not None:
+        pydependence.resolve_engine = ResolveEngineEnum(engine)
+    # checks only need to run again for resolvers & scopes that changed
+    fingerprints = pydependence.load_fingerprints(loaded_scopes)
+    pydependence.check_import_cycles(
+        loaded_scopes,
+        skip=pydependence.get_unchanged_scopes(loaded_scopes, fingerprints),
+    )
+    pydependence.check_budgets(loaded_scopes, skip=fingerprints.unchanged)
+    # generate outputs
     has_changes = pydependence.write_all_outputs(
         loaded_scopes,
         dry_run=dry_run,
+        fingerprints=fingerprints,
     )
     return has_changes
 
 
+def _pydeps_report(
+    config_path: Union[str, Path],
+    report: "Callable[[PydependenceCfg, LoadedScopes], Iterable[str]]",
+) -> str:
+    # reports load the config & scopes, and return lines instead of writing outputs
+    pydependence, loaded_scopes = _load_cfg_and_scopes(config_path)
+    return "\n".join(report(pydependence, loaded_scopes))
+
+
+def pydeps_cycles(
+    *,
+    config_path: Union[str, Path],
+) -> str:
+    """
+    Report all the non-trivial cycles of eager imports within each scope, including
+    the size, members, and import statements that form each cycle.
+    """
+
+    def _report(pydependence: PydependenceCfg, loaded_scopes: LoadedScopes):
+        for name, cycles in pydependence.get_import_cycles(loaded_scopes).items():
+            yield format_import_cycles(name, cycles)
+
+    return _pydeps_report(config_path, _report)
+
+
+def pydeps_layers(
+    *,
+    config_path: Union[str, Path],
+) -> str:
+    """
+    Report the shared base layer and the deltas of the resolvers of each layer,
+    without writing any outputs.
+    """
+
+    def _report(pydependence: PydependenceCfg, loaded_scopes: LoadedScopes):
+        generated = pydependence.generate_all_requirements(loaded_scopes)
+        for layer, split in pydependence.get_layers(generated):
+            yield f"[layer] {repr(layer.output_name)} shared by {len(layer.resolvers)} resolvers: {', '.join(layer.resolvers)}"
+            for out_requirements in split.get_outputs(layer.get_delta_name):
+                reqs = out_requirements.requirements
+                yield f"  {out_requirements.resolver_name} ({len(reqs)}):"
+                yield from (f"    {req.requirement}" for req in reqs)
+
+    return _pydeps_report(config_path, _report)
+
+
+def pydeps_footprint(
+    *,
+    config_path: Union[str, Path],
+    paths: "Optional[List[str]]" = None,
+) -> str:
+    """
+    Report the installed footprint of the requirements of each resolver as JSON,
+    read offline from the distributions installed in the paths, `sys.path` by default.
+    """
+
+    def _report(pydependence: PydependenceCfg, loaded_scopes: LoadedScopes):
+        footprints = pydependence.get_footprints(loaded_scopes, paths=paths)
+        yield json.dumps(footprints, indent=2)
+
+    return _pydeps_report(config_path, _report)
+
+
+def pydeps_why(
+    *,
+    config_path: Union[str, Path],
+    requirements: "List[str]",
+    resolver: "Optional[str]" = None,
+    num_chains: int = 1,
+) -> str:
+    """
+    Explain why requirements are output, returning a report of the shortest chains
+    of imports from the start scope of each resolver to the requirement.
+    """
+
+    def _report(pydependence: PydependenceCfg, loaded_scopes: LoadedScopes):
+        for requirement in requirements:
+            results = pydependence.get_import_chains(
+                loaded_scopes, requirement, resolver=resolver, k=num_chains
+            )
+            for output, target_chains in results:
+                header = f"[why] {repr(requirement)} in resolver {repr(output.get_output_extras_name())}"
+                if not target_chains:
+                    yield f"{header}: not required"
+                    continue
+                yield f"{header}:"
+                for target, chains in target_chains.items():
+                    if not chains:
+                        yield f"  {target}: only reached through lazy imports"
+                    for i, chain in enumerate(chains):
+                        yield f"  {target} [{i + 1}/{len(chains)}]:"
+                        yield from (
+                            f"    {line}" for line in format_import_chain(chain)
+                        )
+
+    return _pydeps_report(config_path, _report)
+
+
 # ========================================================================= #
 # END                                                                       #
 # ========================================================================= #
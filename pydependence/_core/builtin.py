@@ -40,4 +40,18 @@ BUILTIN_MODULE_NAMES = {
 }
 
 
-__all__ = ("BUILTIN_MODULE_NAMES",)
+def is_builtin_module_name(name: str) -> bool:
+    """
+    Check if an import is a builtin module, or is a submodule of a builtin module.
+    Not all submodules are listed, e.g. `os.path` is, but private submodules or
+    those added in newer python versions may not be.
+    """
+    if name in BUILTIN_MODULE_NAMES:
+        return True
+    return name.split(".", maxsplit=1)[0] in BUILTIN_MODULE_NAMES
+
+
+__all__ = (
+    "BUILTIN_MODULE_NAMES",
+    "is_builtin_module_name",
+)
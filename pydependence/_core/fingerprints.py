@@ -0,0 +1,235 @@
+# ============================================================================== #
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2024 Nathan Juraj Michlo                                         #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+# ============================================================================== #
+
+import dataclasses
+import functools
+import hashlib
+import importlib.metadata
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+if TYPE_CHECKING:
+    from pydependence._core.modules_scope import ModulesScope
+
+
+# bump this if the fingerprinted inputs change, so that all stored fingerprints
+# are invalidated and every resolver is run again.
+FINGERPRINTS_FORMAT_VERSION = 2
+
+
+# ========================================================================= #
+# HASHING                                                                   #
+# ========================================================================= #
+
+
+def hash_strings(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def get_tool_version() -> str:
+    # the installed version of pydependence, results can change between versions
+    try:
+        return importlib.metadata.version("pydependence")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def relative_path(path: "Union[str, Path]", root: "Optional[Union[str, Path]]") -> str:
+    """
+    Get a path relative to the root, with forward slashes, so that fingerprints can
+    be shared between machines and checkouts. Absolute if there is no root, or if the
+    path cannot be made relative, e.g. on a different drive.
+    """
+    if root is None:
+        return Path(path).as_posix()
+    try:
+        return Path(os.path.relpath(path, root)).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+class ModuleHasher:
+    """
+    Merkle style fingerprints of modules and scopes. Each module file is hashed by
+    its content, and closures of modules are hashed by their sorted names and module
+    hashes. Files are only read & hashed once per instance. Paths are hashed relative
+    to the root if given.
+    """
+
+    def __init__(self, root: "Optional[Union[str, Path]]" = None):
+        self._root = root
+        self._file_hashes: "Dict[str, Optional[str]]" = {}
+
+    def get_file_hash(self, path: "Union[str, Path]") -> "Optional[str]":
+        # None if the file does not exist
+        path = str(path)
+        if path not in self._file_hashes:
+            try:
+                with open(path, "rb") as fp:
+                    digest = hashlib.sha256(fp.read()).hexdigest()
+            except FileNotFoundError:
+                digest = None
+            self._file_hashes[path] = digest
+        return self._file_hashes[path]
+
+    def get_scope_hash(self, scope: "ModulesScope") -> str:
+        """
+        Hash of the membership of a scope, i.e. the names and paths of modules, not
+        their contents. Membership affects matching and filtering of imports.
+        """
+        items = []
+        for name, data in sorted(scope.iter_module_items(), key=lambda x: x[0]):
+            path = ""
+            if data.module_info is not None:
+                path = relative_path(data.module_info.path, self._root)
+            items.append(f"{name}={path}")
+        return hash_strings(*items)
+
+    def get_closure_hash(
+        self,
+        scope: "ModulesScope",
+        modules: "Iterable[str]",
+    ) -> "Optional[str]":
+        """
+        Hash of the contents of the modules that were visited when resolving. The
+        resolved imports can only change if one of these modules changes, given that
+        the membership of the scopes stays the same. None if a module is missing.
+        """
+        items = []
+        for name in sorted(modules):
+            if not scope.has_module(name):
+                return None
+            module_info = scope.get_module_data(name).module_info
+            if module_info is None:
+                return None
+            digest = self.get_file_hash(module_info.path)
+            if digest is None:
+                return None
+            items.append(f"{name}={digest}")
+        return hash_strings(*items)
+
+    def get_resolver_hash(
+        self,
+        base: str,
+        config: "Dict[str, Any]",
+        scope: "Optional[ModulesScope]",
+        closure: "Iterable[str]",
+        input_files: "Iterable[Union[str, Path]]" = (),
+    ) -> "Optional[str]":
+        """
+        Fingerprint of a resolver, combining the shared base hash, its config, the
+        hash of the closure of modules it visited, and the contents of any other input
+        files such as lock files. None if a module of the closure is missing.
+        """
+        if scope is None:
+            closure_hash = hash_strings()
+        else:
+            closure_hash = self.get_closure_hash(scope, closure)
+            if closure_hash is None:
+                return None
+        inputs = [
+            f"{relative_path(p, self._root)}:{self.get_file_hash(p)}"
+            for p in input_files
+        ]
+        return hash_strings(
+            base, json.dumps(config, sort_keys=True), closure_hash, *inputs
+        )
+
+
+# ========================================================================= #
+# STORE                                                                     #
+# ========================================================================= #
+
+
+@dataclasses.dataclass
+class ResolverFingerprint:
+    fingerprint: str
+    # the in-scope modules visited when resolving, used to recompute the fingerprint
+    # on the next run without needing to resolve again.
+    closure: List[str]
+
+
+@dataclasses.dataclass
+class FingerprintsStore:
+    resolvers: "Dict[str, ResolverFingerprint]" = dataclasses.field(
+        default_factory=dict
+    )
+    # hashes of the output files at the end of the last run
+    outputs: "Dict[str, str]" = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: "Union[str, Path]") -> "FingerprintsStore":
+        # invalid or outdated files are ignored, everything is then resolved again
+        try:
+            with open(path) as fp:
+                data = json.load(fp)
+            if data.get("version", None) != FINGERPRINTS_FORMAT_VERSION:
+                return cls()
+            return cls(
+                resolvers={
+                    k: ResolverFingerprint(
+                        fingerprint=v["fingerprint"], closure=list(v["closure"])
+                    )
+                    for k, v in data["resolvers"].items()
+                },
+                outputs=dict(data["outputs"]),
+            )
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return cls()
+
+    def save(self, path: "Union[str, Path]") -> None:
+        data = {
+            "version": FINGERPRINTS_FORMAT_VERSION,
+            "resolvers": {
+                k: {"fingerprint": v.fingerprint, "closure": sorted(v.closure)}
+                for k, v in sorted(self.resolvers.items())
+            },
+            "outputs": dict(sorted(self.outputs.items())),
+        }
+        with open(path, "w") as fp:
+            json.dump(data, fp, indent=2)
+            fp.write("\n")
+
+
+# ========================================================================= #
+# END                                                                       #
+# ========================================================================= #
+
+
+__all__ = (
+    "FINGERPRINTS_FORMAT_VERSION",
+    "hash_strings",
+    "get_tool_version",
+    "relative_path",
+    "ModuleHasher",
+    "ResolverFingerprint",
+    "FingerprintsStore",
+)
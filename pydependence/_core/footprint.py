@@ -0,0 +1,249 @@
+# ============================================================================== #
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2024 Nathan Juraj Michlo                                         #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+# ============================================================================== #
+
+import csv
+import email.parser
+import os
+import sys
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+if TYPE_CHECKING:
+    from pydependence._core.requirements_out import OutMappedRequirements
+
+# ========================================================================= #
+# INSTALLED DISTRIBUTIONS                                                   #
+# ========================================================================= #
+
+
+class InstalledDist(NamedTuple):
+    name: str  # canonical name
+    version: str
+    size: int  # bytes on disk of all files in the RECORD
+    files: int
+    requires: "Tuple[str, ...]"  # `Requires-Dist` entries
+
+
+class RequirementFootprint(NamedTuple):
+    requirement: str
+    name: str
+    version: Optional[str]
+    size: int
+    files: int
+    # the requirement and all its transitive dependencies that are installed,
+    # dependencies that are not installed are missing.
+    closure: "Tuple[str, ...]"
+    closure_size: int
+    closure_files: int
+    missing: "Tuple[str, ...]"
+
+
+class InstalledDists:
+    """
+    The installed distributions of an environment, read offline from the
+    `.dist-info/METADATA` and `.dist-info/RECORD` files in the given paths, which
+    are `sys.path` by default. Distributions earlier in the paths take precedence,
+    and each distribution is only read once when first needed.
+    """
+
+    def __init__(self, paths: "Optional[Iterable[Union[str, Path]]]" = None):
+        if paths is None:
+            paths = sys.path
+        self._dist_infos: "Dict[str, Path]" = {}
+        for path in paths:
+            path = Path(path or ".")
+            if not path.is_dir():
+                continue
+            for entry in sorted(os.listdir(path)):
+                if not entry.endswith(".dist-info"):
+                    continue
+                name = canonicalize_name(entry[: -len(".dist-info")].split("-")[0])
+                self._dist_infos.setdefault(name, path / entry)
+        self._dists: "Dict[str, Optional[InstalledDist]]" = {}
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self._dist_infos
+
+    def get_dist(self, name: str) -> "Optional[InstalledDist]":
+        name = canonicalize_name(name)
+        if name not in self._dists:
+            dist_info = self._dist_infos.get(name, None)
+            self._dists[name] = None if dist_info is None else _load_dist(dist_info)
+        return self._dists[name]
+
+    def get_closure(
+        self,
+        requirement: str,
+    ) -> "Tuple[List[InstalledDist], List[str]]":
+        """
+        Get the installed distributions of a requirement and its transitive
+        `Requires-Dist` closure for this environment, including the dependencies of
+        requested extras, in breadth first order. Also returns the names of any
+        dependencies that are not installed.
+        """
+        req = Requirement(requirement)
+        dists, missing = [], []
+        # track the extras visited for each distribution, so that distributions are
+        # visited again only if new extras are requested.
+        visited: "Dict[str, Set[str]]" = {}
+        queue = [(canonicalize_name(req.name), set(req.extras))]
+        while queue:
+            name, extras = queue.pop(0)
+            if name in visited:
+                extras = extras - visited[name]
+                if not extras:
+                    continue
+                visited[name].update(extras)
+            else:
+                visited[name] = set(extras)
+                extras = {"", *extras}
+            dist = self.get_dist(name)
+            if dist is None:
+                if name not in missing:
+                    missing.append(name)
+                continue
+            if "" in extras:
+                dists.append(dist)
+            for dep in dist.requires:
+                try:
+                    dep = Requirement(dep)
+                except InvalidRequirement:
+                    continue
+                if dep.marker is None or any(
+                    dep.marker.evaluate({"extra": extra}) for extra in extras
+                ):
+                    queue.append((canonicalize_name(dep.name), set(dep.extras)))
+        return dists, missing
+
+    def get_footprint(self, requirement: str) -> RequirementFootprint:
+        dists, missing = self.get_closure(requirement)
+        name = canonicalize_name(Requirement(requirement).name)
+        dist = dists[0] if dists and dists[0].name == name else None
+        return RequirementFootprint(
+            requirement=requirement,
+            name=name,
+            version=None if dist is None else dist.version,
+            size=0 if dist is None else dist.size,
+            files=0 if dist is None else dist.files,
+            closure=tuple(d.name for d in dists),
+            closure_size=sum(d.size for d in dists),
+            closure_files=sum(d.files for d in dists),
+            missing=tuple(missing),
+        )
+
+    def get_requirements_footprint(
+        self,
+        requirements: "OutMappedRequirements",
+    ) -> "Dict[str, Any]":
+        """
+        Get the footprint of each of the requirements, with the modules that import
+        it, and the totals of the union of all their closures. Requirements that
+        cannot be parsed are skipped.
+        """
+        footprints, closure, missing = [], {}, set()
+        for req in requirements.requirements:
+            try:
+                fp = self.get_footprint(req.requirement)
+            except InvalidRequirement:
+                continue
+            for dep in fp.closure:
+                closure[dep] = self.get_dist(dep)
+            missing.update(fp.missing)
+            footprints.append(
+                {
+                    **fp._asdict(),
+                    "sources": [
+                        {
+                            "module": str(src.source_module),
+                            "is_lazy": src.is_lazy,
+                            "is_manual": src.is_manual,
+                        }
+                        for src in req.sources
+                    ],
+                }
+            )
+        return {
+            "size": sum(d.size for d in closure.values()),
+            "files": sum(d.files for d in closure.values()),
+            "closure": sorted(closure),
+            "missing": sorted(missing),
+            "requirements": footprints,
+        }
+
+
+def _load_dist(dist_info: Path) -> InstalledDist:
+    # metadata
+    with open(dist_info / "METADATA", encoding="utf8", errors="replace") as fp:
+        metadata = email.parser.Parser().parse(fp, headersonly=True)
+    # record, sizes of files without a size in the RECORD are read from disk
+    size, files = 0, 0
+    try:
+        with open(dist_info / "RECORD", encoding="utf8", newline="") as fp:
+            rows = list(csv.reader(fp))
+    except FileNotFoundError:
+        rows = []
+    for row in rows:
+        if not row:
+            continue
+        files += 1
+        if len(row) >= 3 and row[2]:
+            size += int(row[2])
+        else:
+            try:
+                size += (dist_info.parent / row[0]).stat().st_size
+            except OSError:
+                pass
+    return InstalledDist(
+        name=canonicalize_name(metadata["Name"]),
+        version=metadata["Version"],
+        size=size,
+        files=files,
+        requires=tuple(metadata.get_all("Requires-Dist") or ()),
+    )
+
+
+# ========================================================================= #
+# END                                                                       #
+# ========================================================================= #
+
+
+__all__ = (
+    "InstalledDist",
+    "RequirementFootprint",
+    "InstalledDists",
+)
@@ -0,0 +1,217 @@
+# ============================================================================== #
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2024 Nathan Juraj Michlo                                         #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+# ============================================================================== #
+
+import array
+import itertools
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from pydependence._core.builtin import is_builtin_module_name
+from pydependence._core.module_imports_ast import BasicImportInfo, ImportSourceEnum
+
+# ========================================================================= #
+# IMPORTS TABLE                                                             #
+# ========================================================================= #
+
+
+_SOURCE_TYPES: "List[ImportSourceEnum]" = list(ImportSourceEnum)
+_SOURCE_TYPE_IDS: "Dict[ImportSourceEnum, int]" = {
+    t: i for i, t in enumerate(_SOURCE_TYPES)
+}
+
+
+class ImportsTable:
+    """
+    A struct-of-arrays table of imports. Strings (targets, roots and sources) are
+    interned into integer ids, so that filtering becomes a lookup of per-string
+    verdicts followed by vectorized mask operations, and grouping becomes a sort,
+    instead of hashing strings for every import.
+
+    Columns are stdlib `array`s and masks are `bytearray`s. The original import
+    records are kept as rows for the per-statement detail.
+    """
+
+    def __init__(self, imports: "Iterable[BasicImportInfo]"):
+        # strings
+        self._strings: "List[str]" = []
+        self._string_ids: "Dict[str, int]" = {}
+        # columns
+        target, root, source = array.array("q"), array.array("q"), array.array("q")
+        source_type = array.array("b")
+        is_lazy, is_relative = array.array("b"), array.array("b")
+        self._rows: "List[BasicImportInfo]" = []
+        for imp in imports:
+            self._rows.append(imp)
+            target.append(self._intern(imp.target))
+            root.append(self._intern(imp.root_target))
+            source.append(self._intern(imp.source_name))
+            typ = getattr(imp, "source_type", None)
+            source_type.append(-1 if typ is None else _SOURCE_TYPE_IDS[typ])
+            is_lazy.append(imp.is_lazy)
+            is_relative.append(getattr(imp, "is_relative", False))
+        self.target = target
+        self.root = root
+        self.source = source
+        self.source_type = source_type
+        self.is_lazy = is_lazy
+        self.is_relative = is_relative
+
+    def _intern(self, string: str) -> int:
+        # NOTE: manual sources are `ManualSource` objects, which hash like strings
+        i = self._string_ids.get(string, None)
+        if i is None:
+            i = len(self._strings)
+            self._string_ids[string] = i
+            self._strings.append(string)
+        return i
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def strings(self) -> "Sequence[str]":
+        return self._strings
+
+    @property
+    def rows(self) -> "Sequence[BasicImportInfo]":
+        return self._rows
+
+    def get_source_type(self, i: int) -> "Optional[ImportSourceEnum]":
+        t = self.source_type[i]
+        return None if t < 0 else _SOURCE_TYPES[t]
+
+    # ~=~=~ MASKS ~=~=~ #
+
+    def get_lut(
+        self,
+        fn: "Callable[[str], bool]",
+        column: "Optional[Sequence[int]]" = None,
+    ) -> "Sequence[bool]":
+        """
+        Compute a verdict once for each unique string, indexed by string id. If a
+        column is given, then only the strings in that column are checked, others
+        are False. E.g. sources are not valid targets.
+        """
+        if column is None:
+            verdicts = list(map(fn, self._strings))
+        else:
+            verdicts = [False] * len(self._strings)
+            for i in self.get_unique(column):
+                verdicts[i] = fn(self._strings[i])
+        return bytearray(verdicts)
+
+    def take(self, column: "Sequence[int]", lut: "Sequence"):
+        """
+        Look up the values of a column in a table indexed by string id.
+        """
+        return lut.__class__(map(lut.__getitem__, column))
+
+    def get_unique(self, column: "Sequence[int]", mask=None) -> "List[int]":
+        if mask is not None:
+            column = itertools.compress(column, mask)
+        return sorted(set(column))
+
+    def get_filter_mask(
+        self,
+        *,
+        exclude_builtins: bool = True,
+        exclude_in_search_space: "Optional[Callable[[str], bool]]" = None,
+        exclude_unvisited: "Optional[Set[str]]" = None,
+    ):
+        """
+        Get the mask of rows that are kept.
+
+        Args:
+            exclude_builtins: If True, then rows that target builtins are removed.
+            exclude_in_search_space: If given, then rows with targets that are in the search space are removed.
+            exclude_unvisited: If given, then rows with sources that are not in this set are removed.
+        """
+
+        def _keep_target(target: str) -> bool:
+            if exclude_builtins and is_builtin_module_name(target):
+                return False
+            if exclude_in_search_space is not None and exclude_in_search_space(target):
+                return False
+            return True
+
+        keep = self.take(self.target, self.get_lut(_keep_target, self.target))
+        if exclude_unvisited is not None:
+            lut = self.get_lut(exclude_unvisited.__contains__, self.source)
+            visited = self.take(self.source, lut)
+            keep = bytearray(map(int.__and__, keep, visited))
+        return keep
+
+    def iter_masked_rows(self, mask) -> "Iterator[BasicImportInfo]":
+        return itertools.compress(self._rows, mask)
+
+    # ~=~=~ GROUPS ~=~=~ #
+
+    def get_groups(
+        self,
+        keys: "Sequence[int]",
+        mask=None,
+    ) -> "List[Tuple[int, List[Tuple[int, List[int]]]]]":
+        """
+        Group row indices by a key for each row, then by source. Groups are found by
+        a stable sort of the (key, source) columns instead of building nested dicts.
+        Rows with negative keys are skipped, as are rows that are not in the mask.
+
+        Returns:
+            list of (key, list of (source id, list of row indices))
+        """
+        # 1. sort
+        idxs = range(len(self._rows))
+        if mask is not None:
+            idxs = itertools.compress(idxs, mask)
+        source = self.source
+        order = sorted(
+            (i for i in idxs if keys[i] >= 0),
+            key=lambda i: (keys[i], source[i]),
+        )
+        # 2. split into runs
+        groups = []
+        for key, key_idxs in itertools.groupby(order, key=keys.__getitem__):
+            sources = [
+                (src, list(src_idxs))
+                for src, src_idxs in itertools.groupby(key_idxs, key=source.__getitem__)
+            ]
+            groups.append((key, sources))
+        return groups
+
+
+# ========================================================================= #
+# END                                                                       #
+# ========================================================================= #
+
+
+__all__ = ("ImportsTable",)
@@ -0,0 +1,578 @@
+# ============================================================================== #
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2024 Nathan Juraj Michlo                                         #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+# ============================================================================== #
+
+import functools
+import os
+import re
+import warnings
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import (
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from packaging.markers import InvalidMarker, Marker
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name
+
+from pydependence._core.utils import load_toml_document
+
+# ========================================================================= #
+# LOCKED PACKAGES                                                           #
+# ========================================================================= #
+
+
+class LockfileError(ValueError):
+    pass
+
+
+class LockedDependency(NamedTuple):
+    name: str  # canonical name
+    version: "Optional[str]" = None  # the exact locked version, if recorded
+    specifier: str = ""  # version constraint, used to select the locked version
+    extras: "Tuple[str, ...]" = ()
+    marker: "Optional[str]" = None
+
+
+class LockedPackage(NamedTuple):
+    name: str  # canonical name
+    version: str
+    hashes: "Tuple[str, ...]"  # `<algorithm>:<digest>`
+    dependencies: "Tuple[LockedDependency, ...]" = ()
+    # the additional dependencies of each extra, `(extra, dependencies)`
+    optional_dependencies: "Tuple[Tuple[str, Tuple[LockedDependency, ...]], ...]" = ()
+    marker: "Optional[str]" = None  # the environment marker of the locked line
+
+
+class LockedRequirement(NamedTuple):
+    requirement: str  # pinned requirement, `name[extras]==version; marker`
+    package: LockedPackage
+    # the names of the packages that depend on this one, within a locked closure
+    via: "Tuple[str, ...]" = ()
+
+
+# conditions are markers in disjunctive normal form, a set of alternative conjunctions,
+# `{frozenset()}` is always true.
+_Condition = FrozenSet[FrozenSet[str]]
+_ALWAYS: _Condition = frozenset({frozenset()})
+
+
+def _cond_and(cond: _Condition, marker: "Optional[str]") -> _Condition:
+    if not marker:
+        return cond
+    return frozenset(c | {marker} for c in cond)
+
+
+def _cond_or(a: _Condition, b: _Condition) -> _Condition:
+    merged = a | b
+    # drop conjunctions implied by weaker ones, e.g. `(x and y) or x` is `x`
+    return frozenset(c for c in merged if not any(o < c for o in merged))
+
+
+def _cond_marker(cond: _Condition) -> "Optional[str]":
+    def _conj(c: "FrozenSet[str]") -> str:
+        return (
+            next(iter(c)) if len(c) == 1 else " and ".join(f"({m})" for m in sorted(c))
+        )
+
+    if _ALWAYS <= cond:
+        return None
+    conjs = sorted(_conj(c) for c in cond)
+    return conjs[0] if len(conjs) == 1 else " or ".join(f"({c})" for c in conjs)
+
+
+class Lockfile:
+    """
+    The pinned versions and hashes of packages, parsed offline from a local lock file.
+    Supports pip-compile style requirements files, `uv.lock` and `poetry.lock`.
+    The same package may be locked multiple times, e.g. for different platforms, in
+    which case the requirement being pinned must select a single version.
+
+    If the lock file records the dependencies of each package, e.g. `uv.lock` and
+    `poetry.lock`, then these edges are followed to find the locked closure of a set
+    of requirements. Otherwise, e.g. for pip-compile files, the lock file is already
+    the full resolved set, and every package is part of the closure.
+    """
+
+    def __init__(
+        self,
+        packages: "Iterable[LockedPackage]",
+        path: "Optional[str]" = None,
+        *,
+        has_dependencies: bool = True,
+    ):
+        self.path = path
+        self.has_dependencies = has_dependencies
+        self._packages: "Dict[str, List[LockedPackage]]" = defaultdict(list)
+        for pkg in packages:
+            if pkg not in self._packages[pkg.name]:
+                self._packages[pkg.name].append(pkg)
+        self._packages = dict(self._packages)
+
+    def __len__(self):
+        return len(self._packages)
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self._packages
+
+    def get_packages(self, name: str) -> "List[LockedPackage]":
+        return list(self._packages.get(canonicalize_name(name), []))
+
+    def _get_package(self, pkgs: "List[LockedPackage]", version: str) -> LockedPackage:
+        # merge the hashes of duplicate entries of the same version
+        matches = [p for p in pkgs if p.version == version]
+        return matches[0]._replace(
+            hashes=tuple(sorted({h for p in matches for h in p.hashes}))
+        )
+
+    def _check_hashes(self, package: LockedPackage, hashes: bool):
+        if hashes and not package.hashes:
+            raise LockfileError(
+                f"locked package {package.name}=={package.version} has no hashes in: {self.path}"
+            )
+
+    def _pin(self, requirement: str) -> "Tuple[Requirement, LockedPackage]":
+        try:
+            req = Requirement(requirement)
+        except InvalidRequirement as e:
+            raise LockfileError(f"invalid requirement: {repr(requirement)}") from e
+        if req.url:
+            raise LockfileError(f"cannot pin url requirement: {repr(requirement)}")
+        pkgs = self._packages.get(canonicalize_name(req.name), None)
+        if not pkgs:
+            raise LockfileError(
+                f"requirement {repr(requirement)} is not locked in: {self.path}"
+            )
+        versions = sorted(
+            {
+                p.version
+                for p in pkgs
+                if req.specifier.contains(p.version, prereleases=True)
+            }
+        )
+        if not versions:
+            raise LockfileError(
+                f"no locked version of {repr(requirement)} satisfies the requirement, locked versions: {sorted({p.version for p in pkgs})} in: {self.path}"
+            )
+        if len(versions) > 1:
+            raise LockfileError(
+                f"multiple locked versions satisfy {repr(requirement)}: {versions}, restrict the requirement to one of these in: {self.path}"
+            )
+        return req, self._get_package(pkgs, versions[0])
+
+    def _pin_dependency(
+        self, dep: LockedDependency, parent: LockedPackage
+    ) -> LockedPackage:
+        pkgs = self._packages.get(dep.name, None)
+        if not pkgs:
+            raise LockfileError(
+                f"dependency {repr(dep.name)} of {parent.name}=={parent.version} is not locked in: {self.path}"
+            )
+        versions = {p.version for p in pkgs}
+        if dep.version is not None:
+            versions &= {dep.version}
+        elif dep.specifier:
+            # poetry constraints are not always PEP 440, e.g. `^1.2`, these are
+            # only needed if the same package is locked more than once.
+            try:
+                spec = SpecifierSet(dep.specifier)
+            except InvalidSpecifier:
+                pass
+            else:
+                versions = {v for v in versions if spec.contains(v, prereleases=True)}
+        if len(versions) != 1:
+            raise LockfileError(
+                f"dependency {repr(dep.name)} of {parent.name}=={parent.version} does not select a single locked version, selected: {sorted(versions)} in: {self.path}"
+            )
+        return self._get_package(pkgs, versions.pop())
+
+    def pin(self, requirement: str, *, hashes: bool = True) -> LockedRequirement:
+        """
+        Pin a requirement to the single locked version that satisfies it, keeping its
+        extras and markers.
+
+        :raises LockfileError: if the requirement is not locked, no locked version satisfies it, more than one locked version does, or if hashes are required but the locked package has none.
+        """
+        req, package = self._pin(requirement)
+        self._check_hashes(package, hashes)
+        return LockedRequirement(
+            requirement=_format_pinned(
+                req.name, req.extras, package.version, req.marker
+            ),
+            package=package,
+        )
+
+    def pin_closure(
+        self, requirements: "Iterable[str]", *, hashes: bool = True
+    ) -> "List[LockedRequirement]":
+        """
+        Pin requirements and all of their locked transitive dependencies, so that the
+        output can be installed with `pip install --no-deps --require-hashes`.
+
+        The pinned requirements are returned first in the same order, followed by their
+        transitive dependencies sorted by name. Markers are propagated along the
+        dependency edges, so each package is only installed where some chain of
+        requirements needs it. Extras are activated per package, regardless of the
+        markers under which they were requested.
+
+        NOTE: pip-compile files do not record dependency edges, so every package in the
+              file is output, even packages that are only needed by other requirements
+              of the file that were not requested, e.g. when one lock file is shared by
+              several extras.
+
+        :raises LockfileError: if any requirement cannot be pinned, if a dependency does not select a single locked version, or if hashes are required but a locked package has none.
+        """
+        roots: "List[Tuple[Tuple[str, str], Requirement]]" = []
+        packages: "Dict[Tuple[str, str], LockedPackage]" = {}
+        conds: "Dict[Tuple[str, str], _Condition]" = {}
+        extras: "Dict[Tuple[str, str], Set[str]]" = defaultdict(set)
+        via: "Dict[Tuple[str, str], Set[str]]" = defaultdict(set)
+        queue: "Deque[Tuple[str, str]]" = deque()
+
+        def _visit(pkg: LockedPackage, cond: _Condition, pkg_extras: "Iterable[str]"):
+            key = (pkg.name, pkg.version)
+            packages.setdefault(key, pkg)
+            old_cond, old_extras = conds.get(key, frozenset()), set(extras[key])
+            conds[key] = _cond_or(old_cond, cond)
+            extras[key].update(canonicalize_name(e) for e in pkg_extras)
+            if conds[key] != old_cond or extras[key] != old_extras:
+                queue.append(key)
+
+        # pin the requirements
+        for requirement in requirements:
+            req, pkg = self._pin(requirement)
+            roots.append(((pkg.name, pkg.version), req))
+            marker = str(req.marker) if req.marker else None
+            _visit(pkg, _cond_and(_ALWAYS, marker), req.extras)
+
+        # follow the dependency edges until the conditions & extras stop changing,
+        # conditions only ever grow, so this terminates even with cycles.
+        if self.has_dependencies:
+            while queue:
+                key = queue.popleft()
+                pkg = packages[key]
+                optional = dict(pkg.optional_dependencies)
+                deps = list(pkg.dependencies)
+                for extra in sorted(extras[key]):
+                    deps.extend(optional.get(extra, ()))
+                for dep in deps:
+                    dep_pkg = self._pin_dependency(dep, pkg)
+                    via[(dep_pkg.name, dep_pkg.version)].add(pkg.name)
+                    _visit(dep_pkg, _cond_and(conds[key], dep.marker), dep.extras)
+        else:
+            root_keys = {key for key, _ in roots}
+            for name, pkgs in self._packages.items():
+                for version in sorted({p.version for p in pkgs}):
+                    pkg = self._get_package(pkgs, version)
+                    if (name, version) not in root_keys:
+                        _visit(pkg, _cond_and(_ALWAYS, pkg.marker), ())
+
+        # format, requirements first then transitive dependencies
+        results = []
+        for key, req in roots:
+            self._check_hashes(packages[key], hashes)
+            pinned = _format_pinned(
+                req.name, req.extras, key[1], _cond_marker(conds[key])
+            )
+            results.append(
+                LockedRequirement(pinned, packages[key], tuple(sorted(via[key])))
+            )
+        root_keys = {key for key, _ in roots}
+        for key in sorted(k for k in packages if k not in root_keys):
+            self._check_hashes(packages[key], hashes)
+            pinned = _format_pinned(key[0], (), key[1], _cond_marker(conds[key]))
+            results.append(
+                LockedRequirement(pinned, packages[key], tuple(sorted(via[key])))
+            )
+        return results
+
+    # ... LOADING ... #
+
+    @classmethod
+    def from_file(cls, path: "Union[str, Path]") -> "Lockfile":
+        """
+        Load a lock file, detecting the format from the file name. Files named
+        `uv.lock` or `poetry.lock` are parsed as such, anything else is parsed as a
+        pip-compile style requirements file.
+        """
+        import tomlkit.exceptions
+
+        path = Path(path)
+        try:
+            if path.name == "uv.lock":
+                return cls.from_uv_lock(path)
+            elif path.name == "poetry.lock":
+                return cls.from_poetry_lock(path)
+            else:
+                return cls.from_requirements_txt(path)
+        except (OSError, tomlkit.exceptions.ParseError) as e:
+            raise LockfileError(f"could not read lock file: {path}, {e}") from e
+        except (KeyError, TypeError, AttributeError) as e:
+            raise LockfileError(f"malformed lock file: {path}, {e!r}") from e
+
+    @classmethod
+    def from_requirements_txt(cls, path: "Union[str, Path]") -> "Lockfile":
+        with open(path) as fp:
+            lines = _iter_requirements_txt_lines(fp.read())
+            packages = [_parse_requirements_txt_line(line, path) for line in lines]
+        # pip-compile files do not record dependency edges, but are fully resolved
+        return cls(
+            [p for p in packages if p is not None],
+            path=str(path),
+            has_dependencies=False,
+        )
+
+    @classmethod
+    def from_uv_lock(cls, path: "Union[str, Path]") -> "Lockfile":
+        doc = load_toml_document(path).unwrap()
+        packages = []
+        for pkg in doc.get("package", []):
+            # virtual or dynamic packages, e.g. the project itself, may not be versioned
+            if "version" not in pkg:
+                continue
+            files = [pkg["sdist"]] if "sdist" in pkg else []
+            files.extend(pkg.get("wheels", []))
+            packages.append(
+                LockedPackage(
+                    name=canonicalize_name(pkg["name"]),
+                    version=str(pkg["version"]),
+                    hashes=tuple(sorted({f["hash"] for f in files if "hash" in f})),
+                    dependencies=_parse_uv_dependencies(pkg.get("dependencies", [])),
+                    optional_dependencies=tuple(
+                        (canonicalize_name(extra), _parse_uv_dependencies(deps))
+                        for extra, deps in pkg.get("optional-dependencies", {}).items()
+                    ),
+                )
+            )
+        return cls(packages, path=str(path))
+
+    @classmethod
+    def from_poetry_lock(cls, path: "Union[str, Path]") -> "Lockfile":
+        doc = load_toml_document(path).unwrap()
+        # older lock files list the files of each package under `metadata.files`
+        metadata_files = doc.get("metadata", {}).get("files", {})
+        metadata_files = {canonicalize_name(k): v for k, v in metadata_files.items()}
+        packages = []
+        for pkg in doc.get("package", []):
+            name = canonicalize_name(pkg["name"])
+            files = pkg.get("files", metadata_files.get(name, []))
+            dependencies, optional_dependencies = _parse_poetry_dependencies(pkg)
+            packages.append(
+                LockedPackage(
+                    name=name,
+                    version=str(pkg["version"]),
+                    hashes=tuple(sorted({f["hash"] for f in files if "hash" in f})),
+                    dependencies=dependencies,
+                    optional_dependencies=optional_dependencies,
+                )
+            )
+        return cls(packages, path=str(path))
+
+
+def _normalize_marker(marker: "Optional[str]") -> "Optional[str]":
+    # markers are compared as strings when merging conditions
+    if not marker:
+        return None
+    try:
+        return str(Marker(marker))
+    except InvalidMarker as e:
+        raise LockfileError(f"invalid marker: {repr(marker)}") from e
+
+
+def _format_pinned(
+    name: str,
+    extras: "Iterable[str]",
+    version: str,
+    marker: "Optional[object]",
+) -> str:
+    pinned = name
+    if extras:
+        pinned += f"[{','.join(sorted(extras))}]"
+    pinned += f"=={version}"
+    if marker:
+        pinned += f"; {marker}"
+    return pinned
+
+
+# ========================================================================= #
+# UV & POETRY DEPENDENCIES                                                  #
+# ========================================================================= #
+
+
+def _parse_uv_dependencies(deps: "List[dict]") -> "Tuple[LockedDependency, ...]":
+    # e.g. `{ name = "numpy", version = "1.26.4", marker = "...", extra = ["x"] }`
+    return tuple(
+        LockedDependency(
+            name=canonicalize_name(dep["name"]),
+            version=str(dep["version"]) if "version" in dep else None,
+            extras=tuple(dep.get("extra", ())),
+            marker=_normalize_marker(dep.get("marker", None)),
+        )
+        for dep in deps
+    )
+
+
+_RE_POETRY_EXTRA_REF = re.compile(r"^\s*([A-Za-z0-9._-]+)")
+
+
+def _parse_poetry_dependencies(
+    pkg: dict,
+) -> "Tuple[Tuple[LockedDependency, ...], Tuple[Tuple[str, Tuple[LockedDependency, ...]], ...]]":
+    # e.g. `dep = ">=1"`, `dep = {version = ">=1", optional = true, markers = "..."}`
+    # or a list of these tables for different markers. Optional dependencies are only
+    # installed by the extras listing them, e.g. `extra = ["dep (>=1)"]`
+    required, optional = [], defaultdict(list)
+    for name, specs in pkg.get("dependencies", {}).items():
+        name = canonicalize_name(name)
+        for spec in specs if isinstance(specs, list) else [specs]:
+            if not isinstance(spec, dict):
+                spec = {"version": spec}
+            version = str(spec.get("version", "")).strip()
+            dep = LockedDependency(
+                name=name,
+                specifier="" if version == "*" else version,
+                extras=tuple(spec.get("extras", ())),
+                marker=_normalize_marker(spec.get("markers", None)),
+            )
+            (optional[name] if spec.get("optional", False) else required).append(dep)
+    extras = []
+    for extra, refs in pkg.get("extras", {}).items():
+        names = [_RE_POETRY_EXTRA_REF.match(r) for r in refs]
+        names = sorted({canonicalize_name(m.group(1)) for m in names if m})
+        deps = tuple(dep for n in names for dep in optional.get(n, []))
+        extras.append((canonicalize_name(extra), deps))
+    return tuple(required), tuple(extras)
+
+
+# ========================================================================= #
+# REQUIREMENTS TXT                                                          #
+# ========================================================================= #
+
+
+_RE_COMMENT = re.compile(r"(^|\s+)#.*$")
+_RE_OPTIONS = re.compile(r"\s+(?=--)")
+# direct references without a name, e.g. `git+https://...`, `https://.../x.whl` or
+# `./local/path`
+_RE_DIRECT_REFERENCE = re.compile(r"^([a-z][a-z0-9+.-]*://|\.{0,2}/)", re.IGNORECASE)
+
+
+def _iter_requirements_txt_lines(contents: str) -> "Iterable[str]":
+    # join line continuations & strip comments
+    line = ""
+    for part in contents.splitlines():
+        part = _RE_COMMENT.sub("", part)
+        if part.endswith("\\"):
+            line += part[:-1] + " "
+            continue
+        line = (line + part).strip()
+        if line:
+            yield line
+        line = ""
+    line = line.strip()
+    if line:
+        yield line
+
+
+def _parse_requirements_txt_line(
+    line: str,
+    path: "Union[str, Path]",
+) -> "Optional[LockedPackage]":
+    # global options, editables & other files cannot be pinned, e.g. `--index-url`
+    if line.startswith("-"):
+        return None
+    requirement, *options = _RE_OPTIONS.split(line)
+    hashes = []
+    for option in options:
+        if option.startswith("--hash"):
+            hashes.append(option[len("--hash") :].lstrip("= ").strip())
+    # url, vcs & path requirements have no version to pin, so are skipped, this only
+    # fails later if one of these is actually required.
+    req = None
+    if not _RE_DIRECT_REFERENCE.match(requirement):
+        try:
+            req = Requirement(requirement)
+        except InvalidRequirement as e:
+            raise LockfileError(f"invalid requirement: {repr(line)} in: {path}") from e
+    if req is None or req.url:
+        warnings.warn(
+            f"skipping direct reference that cannot be pinned: {repr(line)} in: {path}"
+        )
+        return None
+    pins = [s.version for s in req.specifier if s.operator in ("==", "===")]
+    if len(pins) != 1 or "*" in pins[0]:
+        raise LockfileError(f"requirement is not pinned: {repr(line)} in: {path}")
+    return LockedPackage(
+        name=canonicalize_name(req.name),
+        version=pins[0],
+        hashes=tuple(sorted(set(hashes))),
+        marker=str(req.marker) if req.marker else None,
+    )
+
+
+# ========================================================================= #
+# CACHE                                                                     #
+# ========================================================================= #
+
+
+@functools.lru_cache(maxsize=8)
+def _load_lockfile_cached(path: str, mtime_ns: int, size: int) -> Lockfile:
+    return Lockfile.from_file(path)
+
+
+def load_lockfile(path: "Union[str, Path]") -> Lockfile:
+    """
+    Load a lock file, lock files are usually shared by many resolvers, so are only
+    parsed again if the file changed.
+    """
+    path = str(path)
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise LockfileError(f"could not read lock file: {path}, {e}") from e
+    return _load_lockfile_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+# ========================================================================= #
+# END                                                                       #
+# ========================================================================= #
+
+
+__all__ = (
+    "LockfileError",
+    "LockedDependency",
+    "LockedPackage",
+    "LockedRequirement",
+    "Lockfile",
+    "load_lockfile",
+)
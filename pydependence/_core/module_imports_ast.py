@@ -29,7 +29,17 @@ import sys
 import warnings
 from collections import Counter, defaultdict
 from enum import Enum
-from typing import DefaultDict, Dict, List, Literal, NamedTuple, Optional, Tuple
+from typing import (
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from pydependence._core.module_data import ModuleMetadata
 from pydependence._core.utils import assert_valid_import_name, assert_valid_module_path
@@ -157,8 +167,16 @@ class ImportSourceEnum(str, Enum):
     # type_check = 'type_check'  # TODO
 
 
+# NOTE: import records are created for every import statement, and are shared by
+#       reference between the graph, the index and resolved imports. Slots avoid a
+#       per-instance `__dict__`. Slotted dataclasses cannot have default values, so
+#       subclasses with defaults set them in `__init__` instead.
+
+
 @dataclasses.dataclass
 class BasicImportInfo:
+    __slots__ = ("target", "source_name", "is_lazy")
+
     # target
     target: str
     source_name: str
@@ -198,10 +216,22 @@ class ManualSource:
         return hash(str(self))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(init=False)
 class ManualImportInfo(BasicImportInfo):
+    __slots__ = ()
+
     source_name: ManualSource
-    is_lazy: Literal[False] = False
+    is_lazy: Literal[False]
+
+    def __init__(
+        self,
+        target: str,
+        source_name: ManualSource,
+        is_lazy: "Literal[False]" = False,
+    ):
+        self.target = target
+        self.source_name = source_name
+        self.is_lazy = is_lazy
 
     @classmethod
     def from_target(cls, target: str) -> "ManualImportInfo":
@@ -210,11 +240,20 @@ class ManualImportInfo(BasicImportInfo):
 
 @dataclasses.dataclass
 class LocImportInfo(BasicImportInfo):
+    __slots__ = (
+        "source_module_info",
+        "source_type",
+        "lineno",
+        "col_offset",
+        "stack_type_names",
+        "is_relative",
+    )
+
     # source, e.g. import statement or type check or lazy plugin
     source_name: str
     source_module_info: ModuleMetadata
     source_type: ImportSourceEnum
-    # debug
+    # debug, in lean mode col_offset is -1 and stack_type_names is empty
     lineno: int
     col_offset: int
     stack_type_names: Tuple[str, ...]
@@ -230,10 +269,105 @@ class LocImportInfo(BasicImportInfo):
         return f"{self.source_module_info.tagged_name}:{self.target}"
 
 
+# the maximum number of locations kept by aggregated imports, the full per-statement
+# detail can always be loaded again on demand.
+AGG_IMPORT_MAX_LOCATIONS = 4
+
+
+@dataclasses.dataclass
+class AggImportInfo(BasicImportInfo):
+    """
+    All the imports of a single target from a single source module, aggregated into
+    one record. E.g. a module that imports `numpy` in 40 different functions produces
+    one aggregated import instead of 40.
+
+    The aggregated import is only lazy if all the imports are lazy.
+    """
+
+    __slots__ = ("source_module_info", "num_eager", "num_lazy", "locations")
+
+    source_name: str
+    source_module_info: ModuleMetadata
+    # counts
+    num_eager: int
+    num_lazy: int
+    # debug, capped, sorted by line number
+    locations: Tuple[LocImportInfo, ...]
+
+    @property
+    def count(self) -> int:
+        return self.num_eager + self.num_lazy
+
+    @property
+    def any_eager(self) -> bool:
+        return self.num_eager > 0
+
+    @classmethod
+    def from_imports(
+        cls,
+        imports: "Sequence[LocImportInfo]",
+        max_locations: int = AGG_IMPORT_MAX_LOCATIONS,
+    ) -> "AggImportInfo":
+        if not imports:
+            raise ValueError("Cannot aggregate an empty list of imports!")
+        first = imports[0]
+        num_eager = 0
+        for imp in imports:
+            if (imp.source_name, imp.target) != (first.source_name, first.target):
+                raise ValueError(
+                    f"Cannot aggregate imports with different sources or targets: {repr(first.tagged_name_and_target)} != {repr(imp.tagged_name_and_target)}"
+                )
+            if not imp.is_lazy:
+                num_eager += 1
+        locations = sorted(imports, key=lambda x: (x.lineno, x.col_offset))
+        return cls(
+            target=first.target,
+            source_name=first.source_name,
+            source_module_info=first.source_module_info,
+            is_lazy=num_eager == 0,
+            num_eager=num_eager,
+            num_lazy=len(imports) - num_eager,
+            locations=tuple(locations[:max_locations]),
+        )
+
+    def iter_imports(self) -> "Iterator[LocImportInfo]":
+        """
+        Get the full per-statement detail of the aggregated imports, loaded from the
+        cached module imports. Lazy imports are skipped if none were aggregated.
+        """
+        from pydependence._core.module_imports_loader import (
+            DEFAULT_MODULE_IMPORTS_LOADER,
+        )
+
+        module_imports = DEFAULT_MODULE_IMPORTS_LOADER.load_module_imports(
+            self.source_module_info
+        )
+        for imp in module_imports.module_imports.get(self.target, []):
+            if self.num_lazy or not imp.is_lazy:
+                yield imp
+
+
+# stacks of ast node kinds are mostly the same across imports & modules, e.g.
+# ("Module", "Import") so equal stacks share the same tuple instead of each import
+# storing its own copy. The table is owned by the caller, e.g. the imports loader,
+# so it lives as long as the imports that reference it.
+
+
 class _AstImportsCollector(ast.NodeVisitor):
 
-    def __init__(self, module_info: ModuleMetadata):
+    def __init__(
+        self,
+        module_info: ModuleMetadata,
+        *,
+        lean: bool = False,
+        stack_type_names_table: "Optional[Dict[Tuple[str, ...], Tuple[str, ...]]]" = None,
+    ):
         self._module_info: ModuleMetadata = module_info
+        self._lean = lean
+        # by default equal stacks are only shared within the module
+        if stack_type_names_table is None:
+            stack_type_names_table = {}
+        self._stack_type_names_table = stack_type_names_table
         self._imports: "DefaultDict[str, List[LocImportInfo]]" = defaultdict(list)
         self._stack_is_lazy: "List[bool]" = [False]
         self._stack_ast_kind: "List[str]" = []
@@ -259,15 +393,22 @@ class _AstImportsCollector(ast.NodeVisitor):
         is_lazy: "Optional[bool]" = None,
         is_relative: bool = False,
     ):
+        # debug only fields are dropped in lean mode
+        if self._lean:
+            col_offset, stack_type_names = -1, ()
+        else:
+            col_offset = node.col_offset
+            stack = tuple(self._stack_ast_kind)
+            stack_type_names = self._stack_type_names_table.setdefault(stack, stack)
         import_ = LocImportInfo(
             source_name=self._module_info.name,
             source_module_info=self._module_info,
             target=target,
             is_lazy=self._stack_is_lazy[-1] if (is_lazy is None) else is_lazy,
             lineno=node.lineno,
-            col_offset=node.col_offset,
+            col_offset=col_offset,
             source_type=source_type,
-            stack_type_names=tuple(self._stack_ast_kind),
+            stack_type_names=stack_type_names,
             is_relative=is_relative,
         )
         self._imports[target].append(import_)
@@ -439,7 +580,12 @@ class _AstImportsCollector(ast.NodeVisitor):
 
     @classmethod
     def load_imports_from_module_info(
-        cls, module_info: ModuleMetadata, *, debug: bool = False
+        cls,
+        module_info: ModuleMetadata,
+        *,
+        debug: bool = False,
+        lean: bool = False,
+        stack_type_names_table: "Optional[Dict[Tuple[str, ...], Tuple[str, ...]]]" = None,
     ) -> "Dict[str, List[LocImportInfo]]":
         # load the file & parse
         path = assert_valid_module_path(module_info.path)
@@ -448,7 +594,11 @@ class _AstImportsCollector(ast.NodeVisitor):
             _dat = fp.read()
             _ast = ast.parse(_dat)
         # collect imports
-        _parser = _AstImportsCollector(module_info=module_info)
+        _parser = _AstImportsCollector(
+            module_info=module_info,
+            lean=lean,
+            stack_type_names_table=stack_type_names_table,
+        )
         _parser.visit(_ast)
         # debug
         if debug:
@@ -463,8 +613,13 @@ class _AstImportsCollector(ast.NodeVisitor):
 
 def load_imports_from_module_info(
     module_info: ModuleMetadata,
+    *,
+    lean: bool = False,
+    stack_type_names_table: "Optional[Dict[Tuple[str, ...], Tuple[str, ...]]]" = None,
 ) -> "Dict[str, List[LocImportInfo]]":
-    return _AstImportsCollector.load_imports_from_module_info(module_info)
+    return _AstImportsCollector.load_imports_from_module_info(
+        module_info, lean=lean, stack_type_names_table=stack_type_names_table
+    )
 
 
 # ========================================================================= #
@@ -475,6 +630,7 @@ def load_imports_from_module_info(
 __all__ = (
     "load_imports_from_module_info",
     "LocImportInfo",
+    "AggImportInfo",
     "ImportSourceEnum",
 )
 
@@ -24,7 +24,7 @@
 
 
 import dataclasses
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pydependence._core.module_data import ModuleMetadata
 from pydependence._core.module_imports_ast import (
@@ -43,8 +43,18 @@ class ModuleImports:
     module_imports: "Dict[str, List[LocImportInfo]]"
 
     @classmethod
-    def from_module_info_and_parsed_file(cls, module_info: ModuleMetadata):
-        module_imports = load_imports_from_module_info(module_info=module_info)
+    def from_module_info_and_parsed_file(
+        cls,
+        module_info: ModuleMetadata,
+        *,
+        lean: bool = False,
+        stack_type_names_table: "Optional[Dict[Tuple[str, ...], Tuple[str, ...]]]" = None,
+    ):
+        module_imports = load_imports_from_module_info(
+            module_info=module_info,
+            lean=lean,
+            stack_type_names_table=stack_type_names_table,
+        )
         return ModuleImports(
             module_info=module_info,
             module_imports=dict(module_imports),
@@ -58,7 +68,11 @@ class ModuleImports:
 
 class _ModuleImportsLoader:
 
-    def __init__(self):
+    def __init__(self, *, lean: bool = False):
+        # lean mode drops debug only fields from parsed imports
+        self._lean = lean
+        # equal stacks of ast node kinds are shared across all imports of this loader
+        self._stack_type_names_table: "Dict[Tuple[str, ...], Tuple[str, ...]]" = {}
         # TODO: tag could severally hurt performance? maybe should change data structure slightly?
         #       problem is tag is nested and applied to imports too. HOWEVER, Usually tag is
         #       automatically generated from the package name, so might not matter too much in practice.
@@ -68,7 +82,11 @@ class _ModuleImportsLoader:
         k = (module_info.name, module_info.tag)
         v = self._modules_imports.get(k, None)
         if v is None:
-            v = ModuleImports.from_module_info_and_parsed_file(module_info)
+            v = ModuleImports.from_module_info_and_parsed_file(
+                module_info,
+                lean=self._lean,
+                stack_type_names_table=self._stack_type_names_table,
+            )
             self._modules_imports[k] = v
         else:
             if v.module_info != module_info:
@@ -77,6 +95,21 @@ class _ModuleImportsLoader:
                 )
         return v
 
+    @property
+    def lean(self) -> bool:
+        return self._lean
+
+    def set_lean(self, lean: bool) -> None:
+        # cached imports were parsed in the old mode, so need to be parsed again
+        if lean != self._lean:
+            self._lean = lean
+            self._modules_imports.clear()
+            self._stack_type_names_table.clear()
+
+    def unload_module_imports(self, module_info: ModuleMetadata) -> None:
+        # e.g. if the file was modified, then it needs to be parsed again
+        self._modules_imports.pop((module_info.name, module_info.tag), None)
+
 
 # GLOBAL INSTANCE
 # TODO: can replace with disk cache
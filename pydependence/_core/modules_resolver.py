@@ -22,20 +22,38 @@
 # SOFTWARE.                                                                      #
 # ============================================================================== #
 
+import itertools
 import warnings
 from collections import defaultdict
-from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from enum import Enum
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import networkx as nx
 
-from pydependence._core.builtin import BUILTIN_MODULE_NAMES
+from pydependence._core.builtin import is_builtin_module_name
+from pydependence._core.imports_table import ImportsTable
 from pydependence._core.module_data import ModuleMetadata
-from pydependence._core.module_imports_ast import LocImportInfo
+from pydependence._core.module_imports_ast import AggImportInfo, LocImportInfo
 from pydependence._core.module_imports_loader import (
     DEFAULT_MODULE_IMPORTS_LOADER,
     ModuleImports,
 )
-from pydependence._core.modules_scope import NODE_KEY_MODULE_INFO, ModulesScope
+from pydependence._core.modules_scope import (
+    NODE_KEY_MODULE_INFO,
+    ModulesScope,
+    _ModuleGraphNodeData,
+)
 
 # ========================================================================= #
 # IMPORT GRAPH                                                              #
@@ -43,7 +61,8 @@ from pydependence._core.modules_scope import NODE_KEY_MODULE_INFO, ModulesScope
 
 
 NODE_KEY_MODULE_IMPORTS = "module_imports"
-EDGE_KEY_IMPORTS = "imports"
+EDGE_KEY_IMPORTS_EAGER = "imports_eager"
+EDGE_KEY_IMPORTS_LAZY = "imports_lazy"
 
 
 class _ImportsGraphNodeData(NamedTuple):
@@ -59,59 +78,488 @@ class _ImportsGraphNodeData(NamedTuple):
 
 
 class _ImportsGraphEdgeData(NamedTuple):
-    imports: "List[LocImportInfo]"
+    imports_eager: "List[LocImportInfo]"
+    imports_lazy: "List[LocImportInfo]"
 
     @classmethod
     def from_graph_edge(
         cls, graph: "nx.DiGraph", src: str, dst: str
     ) -> "_ImportsGraphEdgeData":
         edge_data = graph.edges[src, dst]
-        imports = edge_data.get(EDGE_KEY_IMPORTS, [])
-        return cls(imports=imports)
+        return cls(
+            imports_eager=edge_data.get(EDGE_KEY_IMPORTS_EAGER, []),
+            imports_lazy=edge_data.get(EDGE_KEY_IMPORTS_LAZY, []),
+        )
+
+    @property
+    def imports(self) -> "List[LocImportInfo]":
+        return [*self.imports_eager, *self.imports_lazy]
 
     @property
     def all_lazy(self) -> bool:
-        return all(imp.is_lazy for imp in self.imports)
+        return not self.imports_eager
+
+    def get_imports(self, visit_lazy: bool) -> "List[LocImportInfo]":
+        if visit_lazy:
+            return self.imports
+        return self.imports_eager
 
 
 def _construct_module_import_graph(
     scope: "ModulesScope",
-    *,
-    visit_lazy: bool,
 ) -> "nx.DiGraph":
     """
     Supports same interface as `find_modules` but edges are instead constructed
     from the module imports.
 
     This is the direct graph where nodes are modules, and edges represent their imports.
+    Each edge stores both its eager and lazy imports, so that lazy edges are flagged
+    rather than filtered out. Use `_get_import_graph_view` to traverse eager edges only.
     """
     g = nx.DiGraph()
     for node, node_data in scope.iter_module_items():
-        if node_data.module_info is None:
-            warnings.warn(f"Module info not found for: {repr(node)}, skipping...")
-            continue
-        # get module info
-        node_imports: ModuleImports = DEFAULT_MODULE_IMPORTS_LOADER.load_module_imports(
-            module_info=node_data.module_info
+        _add_module_import_edges(g, node=node, node_data=node_data)
+    return g
+
+
+def _add_module_import_edges(
+    import_graph: "nx.DiGraph",
+    *,
+    node: str,
+    node_data: "_ModuleGraphNodeData",
+) -> None:
+    if node_data.module_info is None:
+        warnings.warn(f"Module info not found for: {repr(node)}, skipping...")
+        return
+    # get module info
+    node_imports: ModuleImports = DEFAULT_MODULE_IMPORTS_LOADER.load_module_imports(
+        module_info=node_data.module_info
+    )
+    # construct nodes & edges between nodes based on imports
+    # - edges don't always exist, so can't just rely on them to add all nodes.
+    import_graph.add_node(
+        node,
+        **{NODE_KEY_MODULE_INFO: node_data, NODE_KEY_MODULE_IMPORTS: node_imports},
+    )
+    for imp, imports in node_imports.module_imports.items():
+        # split into eager & lazy, edges are only added if imports exist
+        imports_eager = [x for x in imports if not x.is_lazy]
+        imports_lazy = [x for x in imports if x.is_lazy]
+        if imports:
+            import_graph.add_edge(
+                node,
+                imp,
+                **{
+                    EDGE_KEY_IMPORTS_EAGER: imports_eager,
+                    EDGE_KEY_IMPORTS_LAZY: imports_lazy,
+                },
+            )
+
+
+def _remove_module_import_edges(
+    import_graph: "nx.DiGraph",
+    *,
+    node: str,
+) -> "List[str]":
+    """
+    Remove the module data and outgoing imports of a node from the import graph.
+    The node is kept as a plain import target if other modules still import it.
+    Returns the old import targets of the node.
+    """
+    if node not in import_graph:
+        return []
+    targets = list(import_graph.successors(node))
+    import_graph.remove_edges_from([(node, dst) for dst in targets])
+    import_graph.nodes[node].pop(NODE_KEY_MODULE_INFO, None)
+    import_graph.nodes[node].pop(NODE_KEY_MODULE_IMPORTS, None)
+    # remove plain import targets that are no longer imported by any module
+    for n in [node, *targets]:
+        if n in import_graph and not import_graph.in_degree(n):
+            if NODE_KEY_MODULE_INFO not in import_graph.nodes[n]:
+                import_graph.remove_node(n)
+    return targets
+
+
+def _get_import_graph_view(
+    import_graph: "nx.DiGraph",
+    *,
+    visit_lazy: bool,
+) -> "nx.DiGraph":
+    """
+    Get a read-only view of the import graph that should be traversed. If lazy imports
+    are not visited, then edges that only consist of lazy imports are hidden.
+    """
+    if visit_lazy:
+        return import_graph
+
+    def _has_eager(src: str, dst: str) -> bool:
+        return bool(import_graph.edges[src, dst][EDGE_KEY_IMPORTS_EAGER])
+
+    return nx.subgraph_view(import_graph, filter_edge=_has_eager)
+
+
+# ========================================================================= #
+# IMPORT GRAPH INDEX                                                        #
+# ========================================================================= #
+
+
+class _ImportGraphIndex:
+    """
+    Integer indexed adjacency lists of an import graph.
+
+    The outgoing imports of a node are fixed, so instead of walking every edge and
+    collecting imports edge by edge, the imports along all the out edges of each node
+    are aggregated once into a per-node bundle of eager and lazy imports. Resolving is
+    then node reachability over integer ids, followed by concatenating the bundles of
+    the visited nodes.
+
+    Each node also has bundles of aggregated imports, with one record per
+    (source, target) edge instead of one per import statement.
+    """
+
+    def __init__(self, import_graph: "nx.DiGraph"):
+        # nodes are assigned ids in graph order, so results are deterministic
+        self._nodes: "List[Optional[str]]" = []
+        self._node_ids: "Dict[str, int]" = {}
+        # adjacency & bundles
+        self._succ_eager: "List[Tuple[int, ...]]" = []
+        self._succ_all: "List[Tuple[int, ...]]" = []
+        self._imports_eager: "List[List[LocImportInfo]]" = []
+        self._imports_lazy: "List[List[LocImportInfo]]" = []
+        self._aggs_eager: "List[List[AggImportInfo]]" = []
+        self._aggs_all: "List[List[AggImportInfo]]" = []
+        for node in import_graph.nodes:
+            self._add_node(node)
+        for i, node in enumerate(self._nodes):
+            self._set_node(import_graph, i, node)
+
+    def _add_node(self, node: str) -> int:
+        i = self._node_ids.get(node, None)
+        if i is None:
+            i = len(self._nodes)
+            self._node_ids[node] = i
+            self._nodes.append(node)
+            self._succ_eager.append(())
+            self._succ_all.append(())
+            self._imports_eager.append([])
+            self._imports_lazy.append([])
+            self._aggs_eager.append([])
+            self._aggs_all.append([])
+        return i
+
+    def _set_node(self, import_graph: "nx.DiGraph", i: int, node: str):
+        succ_eager, succ_all, imports_eager, imports_lazy = [], [], [], []
+        aggs_eager, aggs_all = [], []
+        for src, dst in import_graph.out_edges(node):
+            edge_data = _ImportsGraphEdgeData.from_graph_edge(import_graph, src, dst)
+            dst_id = self._node_ids[dst]
+            succ_all.append(dst_id)
+            imports_eager.extend(edge_data.imports_eager)
+            imports_lazy.extend(edge_data.imports_lazy)
+            # aggregate, sharing the record if the edge has no lazy imports
+            agg_all = AggImportInfo.from_imports(edge_data.imports)
+            aggs_all.append(agg_all)
+            if edge_data.imports_eager:
+                succ_eager.append(dst_id)
+                if edge_data.imports_lazy:
+                    aggs_eager.append(
+                        AggImportInfo.from_imports(edge_data.imports_eager)
+                    )
+                else:
+                    aggs_eager.append(agg_all)
+        self._succ_eager[i] = tuple(succ_eager)
+        self._succ_all[i] = tuple(succ_all)
+        self._imports_eager[i] = imports_eager
+        self._imports_lazy[i] = imports_lazy
+        self._aggs_eager[i] = aggs_eager
+        self._aggs_all[i] = aggs_all
+
+    def update_nodes(self, import_graph: "nx.DiGraph", nodes: "Iterable[str]"):
+        """
+        Patch the index in place after the out edges of the given nodes changed in
+        the import graph. New nodes are assigned new ids, while nodes that were removed
+        from the graph keep their ids as empty tombstones so existing ids remain valid.
+        """
+        nodes = list(dict.fromkeys(nodes))
+        # 1. assign ids to new nodes, including new import targets
+        for node in nodes:
+            if node in import_graph:
+                self._add_node(node)
+                for dst in import_graph.successors(node):
+                    self._add_node(dst)
+        # 2. recompute adjacency & bundles, or remove
+        for node in nodes:
+            i = self._node_ids.get(node, None)
+            if i is None:
+                continue
+            if node in import_graph:
+                self._set_node(import_graph, i, node)
+            else:
+                del self._node_ids[node]
+                self._nodes[i] = None
+                self._succ_eager[i] = ()
+                self._succ_all[i] = ()
+                self._imports_eager[i] = []
+                self._imports_lazy[i] = []
+                self._aggs_eager[i] = []
+                self._aggs_all[i] = []
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def get_node_ids(self, modules: "Iterable[str]") -> "List[int]":
+        # skip modules that are not in the graph
+        node_ids = self._node_ids
+        return [node_ids[m] for m in modules if m in node_ids]
+
+    def get_modules(self, node_ids: "Iterable[int]") -> "List[str]":
+        return [self._nodes[i] for i in node_ids]
+
+    def get_succ(self, node_id: int, *, visit_lazy: bool) -> "Tuple[int, ...]":
+        return (self._succ_all if visit_lazy else self._succ_eager)[node_id]
+
+    def bfs(self, start_ids: "Iterable[int]", *, visit_lazy: bool) -> "List[int]":
+        """
+        Get the ids of all nodes reachable from the start ids, in BFS order,
+        including the start ids themselves.
+        """
+        succ = self._succ_all if visit_lazy else self._succ_eager
+        seen = bytearray(len(self._nodes))
+        order = []
+        for i in start_ids:
+            if not seen[i]:
+                seen[i] = 1
+                order.append(i)
+        # the order list doubles as the queue
+        k = 0
+        while k < len(order):
+            for j in succ[order[k]]:
+                if not seen[j]:
+                    seen[j] = 1
+                    order.append(j)
+            k += 1
+        return order
+
+    def bfs_tree(
+        self, start_ids: "Iterable[int]", *, visit_lazy: bool
+    ) -> "Dict[int, int]":
+        """
+        Get the BFS tree of all nodes reachable from the start ids, as a mapping from
+        each visited id to the id of its parent, with start ids mapping to -1. The
+        mapping is in BFS order, and following the parents gives a shortest path.
+        """
+        succ = self._succ_all if visit_lazy else self._succ_eager
+        parents = {}
+        for i in start_ids:
+            parents.setdefault(i, -1)
+        # the order list doubles as the queue
+        order = list(parents)
+        k = 0
+        while k < len(order):
+            i = order[k]
+            for j in succ[i]:
+                if j not in parents:
+                    parents[j] = i
+                    order.append(j)
+            k += 1
+        return parents
+
+    def get_import_bundles(
+        self,
+        node_ids: "Iterable[int]",
+        *,
+        visit_lazy: bool,
+        re_add_lazy: bool,
+        aggregate: bool = False,
+    ) -> "Union[List[List[LocImportInfo]], List[List[AggImportInfo]]]":
+        """
+        Get the import bundles of the visited nodes, without concatenating them. When
+        visit_lazy is False, all lazy imports are skipped during the traversal, this
+        means that we may need to re-add them from the visited nodes, without
+        traversing them.
+
+        If aggregate is True, then the bundles contain one aggregated import for each
+        (source, target) pair instead of one import for each statement.
+
+        Bundles are never mutated in place, only replaced when the index is updated,
+        so the returned bundles remain a valid snapshot of the resolved imports.
+        """
+        add_lazy = visit_lazy or re_add_lazy
+        if aggregate:
+            aggs = self._aggs_all if add_lazy else self._aggs_eager
+            return [aggs[i] for i in node_ids if aggs[i]]
+        bundles = []
+        for i in node_ids:
+            if self._imports_eager[i]:
+                bundles.append(self._imports_eager[i])
+            if add_lazy and self._imports_lazy[i]:
+                bundles.append(self._imports_lazy[i])
+        return bundles
+
+    def iter_imports(
+        self,
+        node_ids: "Iterable[int]",
+        *,
+        visit_lazy: bool,
+        re_add_lazy: bool,
+    ) -> "Iterator[LocImportInfo]":
+        bundles = self.get_import_bundles(
+            node_ids, visit_lazy=visit_lazy, re_add_lazy=re_add_lazy
         )
-        # construct nodes & edges between nodes based on imports
-        # - edges don't always exist, so can't just rely on them to add all nodes.
-        g.add_node(
-            node,
-            **{NODE_KEY_MODULE_INFO: node_data, NODE_KEY_MODULE_IMPORTS: node_imports},
+        return itertools.chain.from_iterable(bundles)
+
+    def collect_imports(
+        self,
+        node_ids: "Iterable[int]",
+        *,
+        visit_lazy: bool,
+        re_add_lazy: bool,
+    ) -> "List[LocImportInfo]":
+        return list(
+            self.iter_imports(node_ids, visit_lazy=visit_lazy, re_add_lazy=re_add_lazy)
         )
-        for imp, imports in node_imports.module_imports.items():
-            # filter out lazy, or skip
-            if not visit_lazy:
-                imports = [imp for imp in imports if not imp.is_lazy]
-            # add edge
-            if imports:
-                g.add_edge(
-                    node,
-                    imp,
-                    **{EDGE_KEY_IMPORTS: imports},
-                )
-    return g
+
+
+# ========================================================================= #
+# IMPORT GRAPH CLOSURES                                                     #
+# ========================================================================= #
+
+
+def _bits_to_ids(bits: int) -> "List[int]":
+    # scan the binary string from the least significant bit, this is much faster
+    # than repeatedly isolating the lowest set bit for large bitsets.
+    return [i for i, c in enumerate(reversed(bin(bits)[2:])) if c == "1"]
+
+
+class _ImportGraphClosures:
+    """
+    Memoized reachability table over an import graph.
+
+    Import graphs of real code bases contain large cycles, so the strongly connected
+    components of the traversed graph are condensed into a DAG. The closure of each
+    component is then computed once, bottom-up, as a bitset over node ids. Closures of
+    components downstream are shared, and any query from a set of start modules is the
+    union of their precomputed closures instead of a fresh traversal.
+    """
+
+    def __init__(self, import_graph: "nx.DiGraph", *, visit_lazy: bool):
+        graph = _get_import_graph_view(import_graph, visit_lazy=visit_lazy)
+        self._visit_lazy = visit_lazy
+        # nodes are assigned ids in graph order, so results are deterministic
+        self._nodes: "List[Optional[str]]" = list(graph.nodes)
+        self._node_ids: "Dict[str, int]" = {n: i for i, n in enumerate(self._nodes)}
+        self._node_components: "Dict[str, int]" = {}
+        self._components: "List[List[str]]" = []
+        self._closures: "List[int]" = []
+        self._num_components = 0
+        self._add_closures(graph, graph)
+
+    def _add_closures(self, graph: "nx.DiGraph", subgraph: "nx.DiGraph"):
+        # condense the cycles of the subgraph & compute closures in reverse topological
+        # order, so that all successors are computed before their predecessors.
+        # Successors outside the subgraph must already have closures.
+        condensed = nx.condensation(subgraph)
+        offset = len(self._closures)
+        for c in condensed.nodes:
+            for node in condensed.nodes[c]["members"]:
+                self._node_components[node] = offset + c
+        self._components.extend(
+            sorted(condensed.nodes[c]["members"]) for c in condensed.nodes
+        )
+        self._closures.extend([0] * len(condensed))
+        for c in reversed(list(nx.topological_sort(condensed))):
+            bits = 0
+            for node in condensed.nodes[c]["members"]:
+                bits |= 1 << self._node_ids[node]
+                if subgraph is not graph:
+                    for dst in graph.successors(node):
+                        if dst not in subgraph:
+                            bits |= self._closures[self._node_components[dst]]
+            for succ in condensed.successors(c):
+                bits |= self._closures[offset + succ]
+            self._closures[offset + c] = bits
+        # stats
+        self._num_components += len(condensed)
+
+    def _remove_component(self, c: int):
+        # components keep their ids as empty tombstones so existing ids remain valid
+        if self._components[c]:
+            self._components[c] = []
+            self._closures[c] = 0
+            self._num_components -= 1
+
+    def update_nodes(self, import_graph: "nx.DiGraph", nodes: "Iterable[str]"):
+        """
+        Patch the table in place after the out edges of the given nodes changed in
+        the import graph, which must include all added and removed nodes.
+
+        Only the closures of nodes that can reach a changed node can change. Whole
+        components are either affected or not, since if any member can reach a changed
+        node then so can all other members. These components are condensed and their
+        closures recomputed, while all other closures are shared. Removed nodes and
+        replaced components keep their ids as empty tombstones.
+        """
+        graph = _get_import_graph_view(import_graph, visit_lazy=self._visit_lazy)
+        nodes = list(dict.fromkeys(nodes))
+        # 1. remove nodes that are no longer in the graph
+        for node in nodes:
+            if node not in graph and node in self._node_ids:
+                self._remove_component(self._node_components.pop(node))
+                self._nodes[self._node_ids.pop(node)] = None
+        # 2. find all the nodes that can reach a changed node
+        affected = set()
+        stack = [node for node in nodes if node in graph]
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(graph.predecessors(node))
+        for node in affected:
+            c = self._node_components.pop(node, None)
+            if c is not None:
+                self._remove_component(c)
+        # 3. assign ids to new nodes, these are always changed nodes
+        for node in nodes:
+            if node in affected and node not in self._node_ids:
+                self._node_ids[node] = len(self._nodes)
+                self._nodes.append(node)
+        # 4. recompute the closures of the affected components
+        if affected:
+            self._add_closures(graph, graph.subgraph(affected))
+
+    @property
+    def visit_lazy(self) -> bool:
+        return self._visit_lazy
+
+    @property
+    def num_components(self) -> int:
+        return self._num_components
+
+    def get_components(self) -> "List[List[str]]":
+        # the sorted members of each strongly connected component
+        return [members for members in self._components if members]
+
+    def get_closure_bits(self, modules: "Iterable[str]") -> int:
+        bits = 0
+        for module in modules:
+            c = self._node_components.get(module, None)
+            # skip modules that are not in the graph
+            if c is not None:
+                bits |= self._closures[c]
+        return bits
+
+    def bits_to_modules(self, bits: int) -> "List[str]":
+        return [self._nodes[i] for i in _bits_to_ids(bits)]
+
+    def get_closure(self, modules: "Iterable[str]") -> "List[str]":
+        """
+        Get all the modules (and import targets) reachable from the given modules,
+        including the modules themselves if they are in the graph.
+        """
+        return self.bits_to_modules(self.get_closure_bits(modules))
+
+    def get_module_closure(self, module: str) -> "List[str]":
+        return self.get_closure([module])
 
 
 # ========================================================================= #
@@ -123,73 +571,99 @@ class ScopeNotASubsetError(ValueError):
     pass
 
 
+class ResolveEngineEnum(str, Enum):
+    # BFS over integer node ids, cheapest for resolving a single start scope.
+    bfs = "bfs"
+    # union of memoized SCC closures, the table costs O(components * nodes) to build,
+    # so this is only amortized across very many start scopes over the same scope.
+    closures = "closures"
+
+
 def _resolve_scope_imports(
     scope: "ModulesScope",
     start_scope: "Optional[ModulesScope]",
     visit_lazy: bool,
     re_add_lazy: bool,
-) -> "Tuple[List[LocImportInfo], Set[str]]":
+    engine: ResolveEngineEnum = ResolveEngineEnum.bfs,
+    aggregate: bool = False,
+) -> "Tuple[List[List[LocImportInfo]], Set[str]]":
     if start_scope is None:
         start_scope = scope
     if not scope.is_scope_subset(start_scope):
         raise ScopeNotASubsetError("Start scope must be a subset of the parent scope!")
 
     # 1. construct
+    # - the import graph index is cached on the scope, and shared between all resolvers.
     # - if all imports are lazy, then we don't need to traverse them! (depending on mode)
-    # - we have to filter BEFORE the bfs otherwise we will traverse wrong nodes.
-    import_graph = _construct_module_import_graph(scope=scope, visit_lazy=visit_lazy)
-
-    # 2. now resolve imports from the starting point!
-    # - dfs along edges to get all imports MUST do ALL edges
-    # - this is why we don't use `dfs_edges` which visits nodes, and may skip edges.
-    # - each edge contains all imports along that edge, these should
-    #   be added to the set of imports so that we can track all imports
-    visited = set()
-    imports = []
-    for src, dst in nx.edge_dfs(import_graph, source=start_scope.iter_modules()):
-        edge_data = _ImportsGraphEdgeData.from_graph_edge(import_graph, src, dst)
-        imports.extend(edge_data.imports)
-        visited.update([src, dst])
-    # - dfs may not add all nodes, but these should be visited too
-    for node in start_scope.iter_modules():
-        if import_graph.has_node(node):
-            visited.add(node)
-
-    # 3. re_add lazy imports
-    #    - when visit_lazy is False, all lazy imports are filtered out before BFS, this
-    #      means that we need to re-add them from the visited nodes.
-    if re_add_lazy and not visit_lazy:
-        import_graph = _construct_module_import_graph(scope=scope, visit_lazy=True)
-        for node in visited:
-            # get edges directed out of the node
-            for src, dst in import_graph.out_edges(node):
-                edge_data = _ImportsGraphEdgeData.from_graph_edge(
-                    import_graph, src, dst
-                )
-                # only add lazy imports, because these would have been filtered out
-                for imp in edge_data.imports:
-                    if imp.is_lazy:
-                        imports.append(imp)
+    index = scope.get_import_graph_index()
+
+    # 2. now resolve visited modules from the starting point!
+    # - if a start module is not in the import graph then it is skipped.
+    # - all the imports of a node are fixed, so we only need node reachability
+    #   instead of visiting every edge.
+    if engine == ResolveEngineEnum.bfs:
+        start_ids = index.get_node_ids(start_scope.iter_modules())
+        visited_ids = index.bfs(start_ids, visit_lazy=visit_lazy)
+    elif engine == ResolveEngineEnum.closures:
+        closures = scope.get_import_graph_closures(visit_lazy=visit_lazy)
+        visited = closures.get_closure(start_scope.iter_modules())
+        visited_ids = index.get_node_ids(visited)
+    else:
+        raise ValueError(f"Invalid resolve engine: {repr(engine)}")
+
+    return _get_visited_imports(
+        index,
+        visited_ids,
+        visit_lazy=visit_lazy,
+        re_add_lazy=re_add_lazy,
+        aggregate=aggregate,
+    )
+
+
+def _get_visited_imports(
+    index: "_ImportGraphIndex",
+    visited_ids: "List[int]",
+    *,
+    visit_lazy: bool,
+    re_add_lazy: bool,
+    aggregate: bool,
+) -> "Tuple[List[List[LocImportInfo]], Set[str]]":
+    # 3. reference the per-node bundles, these are only concatenated when iterated
+    bundles = index.get_import_bundles(
+        visited_ids,
+        visit_lazy=visit_lazy,
+        re_add_lazy=re_add_lazy,
+        aggregate=aggregate,
+    )
 
     # 4. convert to datatype
     # NOTE: ideally later on we would group these imports by `dst` or `target`. It is
     #       just easier to work with them this way for now.
-    return imports, visited
+    return bundles, set(index.get_modules(visited_ids))
 
 
 class ScopeResolvedImports:
+    """
+    The imports resolved from a start scope. Imports are stored as a list of bundles
+    that are only concatenated when iterated, so that results can be streamed through
+    filtering and mapping without materializing intermediate lists.
+
+    If resolved with aggregate=True, then the imports are `AggImportInfo` records, one
+    for each (source, target) pair, instead of `LocImportInfo` for each statement.
+    """
 
     def __init__(
         self,
         scope: "ModulesScope",
         start_scope: "ModulesScope",
-        imports: "List[LocImportInfo]",
+        imports: "Sequence[Sequence[LocImportInfo]]",
         visited: "Set[str]",
     ):
         self._scope = scope
         self._start_scope = start_scope
-        self._imports = imports
+        self._imports = imports  # bundles of imports
         self._visited = visited  # visited modules
+        self._table: "Optional[ImportsTable]" = None
 
     @classmethod
     def from_scope(
@@ -198,6 +672,8 @@ class ScopeResolvedImports:
         start_scope: "Optional[ModulesScope]" = None,
         visit_lazy: bool = True,
         re_add_lazy: bool = False,
+        engine: ResolveEngineEnum = ResolveEngineEnum.bfs,
+        aggregate: bool = False,
     ):
         if start_scope is None:
             start_scope = scope
@@ -207,6 +683,8 @@ class ScopeResolvedImports:
             start_scope=start_scope,
             visit_lazy=visit_lazy,
             re_add_lazy=re_add_lazy,
+            engine=engine,
+            aggregate=aggregate,
         )
 
         return cls(
@@ -216,38 +694,138 @@ class ScopeResolvedImports:
             visited=visited,
         )
 
-    def get_filtered(
+    @classmethod
+    def from_scopes_memoized(
+        cls,
+        scope: "ModulesScope",
+        start_scopes: "Sequence[Optional[ModulesScope]]",
+        visit_lazy: bool = True,
+        re_add_lazy: bool = False,
+        engine: ResolveEngineEnum = ResolveEngineEnum.bfs,
+        aggregate: bool = False,
+    ) -> "List[ScopeResolvedImports]":
+        """
+        Resolve multiple start scopes over the same scope and traversal mode, fanning
+        out to the memoized resolve of each start scope on the scope. This is not a
+        single shared traversal, each distinct start scope is still traversed on its
+        own, but identical start scopes are only resolved once, and results are shared
+        between calls. By default each traversal is a BFS, the closure table costs far
+        more to build and only pays off for very many distinct start scopes, so is
+        opt-in.
+        """
+        # resolve, identical start scopes are shared by the memoized resolves
+        return [
+            scope.get_resolved_scope_imports(
+                start_scope=start_scope,
+                visit_lazy=visit_lazy,
+                re_add_lazy=re_add_lazy,
+                aggregate=aggregate,
+                engine=engine,
+            )
+            for start_scope in start_scopes
+        ]
+
+    def get_table(self) -> ImportsTable:
+        """
+        Get the resolved imports as a columnar table, constructed once and then shared
+        between all filters, e.g. when the same results are shared by resolvers.
+        """
+        if self._table is None:
+            self._table = ImportsTable(self.iter_imports())
+        return self._table
+
+    def get_filter_mask(
         self,
         exclude_unvisited: bool = True,
         exclude_in_search_space: bool = True,
         exclude_builtins: bool = True,
-    ) -> "ScopeResolvedImports":
+    ):
+        """
+        Get the mask of kept rows of the columnar table.
+        """
+        return self.get_table().get_filter_mask(
+            exclude_builtins=exclude_builtins,
+            exclude_in_search_space=(
+                self._scope.has_module if exclude_in_search_space else None
+            ),
+            exclude_unvisited=self._visited if exclude_unvisited else None,
+        )
 
-        def _keep(imp: LocImportInfo) -> bool:
-            if exclude_builtins and imp.target in BUILTIN_MODULE_NAMES:
-                return False
-            if exclude_in_search_space and self._scope.has_module(imp.target):
+    def iter_filtered(
+        self,
+        exclude_unvisited: bool = True,
+        exclude_in_search_space: bool = True,
+        exclude_builtins: bool = True,
+        columnar: bool = False,
+    ) -> "Iterator[LocImportInfo]":
+        # vectorized, verdicts are computed once per unique string
+        if columnar:
+            mask = self.get_filter_mask(
+                exclude_unvisited=exclude_unvisited,
+                exclude_in_search_space=exclude_in_search_space,
+                exclude_builtins=exclude_builtins,
+            )
+            return self.get_table().iter_masked_rows(mask)
+
+        # verdicts only depend on the target, so they are computed once for each
+        # unique target, instead of several lookups for every import statement.
+        has_module = self._scope.has_module
+        verdicts: "Dict[str, bool]" = {}
+
+        def _keep_target(target: str) -> bool:
+            if exclude_builtins and is_builtin_module_name(target):
                 return False
-            if exclude_unvisited and imp.source_name not in self._visited:
+            if exclude_in_search_space and has_module(target):
                 return False
             return True
 
+        visited = self._visited
+
+        def _keep(imp: LocImportInfo) -> bool:
+            keep = verdicts.get(imp.target, None)
+            if keep is None:
+                keep = verdicts[imp.target] = _keep_target(imp.target)
+            if keep and exclude_unvisited:
+                return imp.source_name in visited
+            return keep
+
+        return filter(_keep, self.iter_imports())
+
+    def get_filtered(
+        self,
+        exclude_unvisited: bool = True,
+        exclude_in_search_space: bool = True,
+        exclude_builtins: bool = True,
+        columnar: bool = False,
+    ) -> "ScopeResolvedImports":
+        imports = self.iter_filtered(
+            exclude_unvisited=exclude_unvisited,
+            exclude_in_search_space=exclude_in_search_space,
+            exclude_builtins=exclude_builtins,
+            columnar=columnar,
+        )
         return self.__class__(
             scope=self._scope,
             start_scope=self._start_scope,
-            imports=[imp for imp in self._imports if _keep(imp)],
-            visited=set(self._visited),
+            imports=[list(imports)],
+            visited=self._visited,  # never modified, can be shared
         )
 
+    def iter_imports(self) -> "Iterator[LocImportInfo]":
+        return itertools.chain.from_iterable(self._imports)
+
+    def get_visited(self) -> "Set[str]":
+        return set(self._visited)
+
     def get_imports(self) -> "List[LocImportInfo]":
-        return list(self._imports)
+        return list(self.iter_imports())
 
     # ~=~=~ debug ~=~=~ #
 
     def _get_targets_sources_counts(self) -> "Dict[str, Dict[str, int]]":
         # used for debugging / testing
         trg_src_imps = defaultdict(lambda: defaultdict(list))
-        for imp in self._imports:
+        for imp in self.iter_imports():
             trg_src_imps[imp.target][imp.source_name].append(imp)
         return {
             trg: {src: len(imps) for src, imps in src_imps.items()}
@@ -255,6 +833,218 @@ class ScopeResolvedImports:
         }
 
 
+# ========================================================================= #
+# IMPORT CYCLES                                                             #
+# ========================================================================= #
+
+
+class CyclesModeEnum(str, Enum):
+    ignore = "ignore"
+    warn = "warn"
+    error = "error"
+
+
+class ImportCyclesError(ValueError):
+    pass
+
+
+class ImportCycle(NamedTuple):
+    # sorted members of the strongly connected component
+    modules: "Tuple[str, ...]"
+    # the import statements between members that form the cycle
+    imports: "Tuple[LocImportInfo, ...]"
+
+    @property
+    def size(self) -> int:
+        return len(self.modules)
+
+
+def _find_import_cycles(
+    scope: "ModulesScope",
+    *,
+    visit_lazy: bool = False,
+) -> "List[ImportCycle]":
+    """
+    Find all non-trivial cycles in the import graph, i.e. strongly connected
+    components with more than one module, or modules that import themselves. The
+    components are shared with the memoized closure table of the scope. Largest
+    cycles are returned first.
+    """
+    import_graph = scope.get_import_graph()
+    closures = scope.get_import_graph_closures(visit_lazy=visit_lazy)
+    cycles = []
+    for members in closures.get_components():
+        if len(members) == 1 and not import_graph.has_edge(members[0], members[0]):
+            continue
+        member_set = set(members)
+        imports = []
+        for src in members:
+            for dst in import_graph.successors(src):
+                if dst in member_set:
+                    edge_data = _ImportsGraphEdgeData.from_graph_edge(
+                        import_graph, src, dst
+                    )
+                    imports.extend(edge_data.get_imports(visit_lazy=visit_lazy))
+        imports.sort(key=lambda imp: (imp.source_name, imp.lineno, imp.target))
+        cycles.append(ImportCycle(modules=tuple(members), imports=tuple(imports)))
+    cycles.sort(key=lambda c: (-c.size, c.modules))
+    return cycles
+
+
+def _get_new_import_cycles(
+    cycles: "Iterable[ImportCycle]",
+    allowed: "Iterable[Iterable[str]]",
+) -> "List[ImportCycle]":
+    # cycles that are not contained within any of the allowed cycles, e.g. cycles
+    # that shrink are allowed, but cycles that grow or merge are new.
+    allowed = [frozenset(a) for a in allowed]
+    return [c for c in cycles if not any(a.issuperset(c.modules) for a in allowed)]
+
+
+# ========================================================================= #
+# IMPORT CHAINS                                                             #
+# ========================================================================= #
+
+
+class ImportChains:
+    """
+    Answer why an import target is reached from a start scope, as chains of imports
+    from a module in the start scope to the target. Each step of a chain is the first
+    import statement along that edge of the import graph, giving the file and line.
+
+    A single BFS tree is computed once for the start scope, and then shared by all
+    queries, so querying every target at once only walks the parents of each target.
+    If re_add_lazy is True, then the last step of a chain may be a lazy import from a
+    visited module, matching how resolved imports are re-added.
+    """
+
+    def __init__(
+        self,
+        scope: "ModulesScope",
+        start_scope: "Optional[ModulesScope]" = None,
+        *,
+        visit_lazy: bool = False,
+        re_add_lazy: bool = False,
+    ):
+        if start_scope is None:
+            start_scope = scope
+        if not scope.is_scope_subset(start_scope):
+            raise ScopeNotASubsetError(
+                "Start scope must be a subset of the parent scope!"
+            )
+        self._graph = scope.get_import_graph()
+        self._index = scope.get_import_graph_index()
+        self._visit_lazy = visit_lazy
+        self._re_add_lazy = re_add_lazy and not visit_lazy
+        self._start_ids = self._index.get_node_ids(start_scope.iter_modules())
+        self._parents = self._index.bfs_tree(self._start_ids, visit_lazy=visit_lazy)
+        # position of visited ids in BFS order, i.e. sorted by depth
+        self._order = {i: k for k, i in enumerate(self._parents)}
+        self._paths_graph: "Optional[nx.DiGraph]" = None
+
+    def _get_edge_import(self, src: str, dst: str) -> "LocImportInfo":
+        edge_data = _ImportsGraphEdgeData.from_graph_edge(self._graph, src, dst)
+        imports = edge_data.imports_eager or edge_data.imports_lazy
+        return min(imports, key=lambda imp: imp.lineno)
+
+    def _ids_to_chain(self, ids: "Sequence[int]") -> "List[LocImportInfo]":
+        nodes = self._index.get_modules(ids)
+        return [self._get_edge_import(a, b) for a, b in zip(nodes[:-1], nodes[1:])]
+
+    def _get_target_id(self, target: str) -> "Optional[int]":
+        ids = self._index.get_node_ids([target])
+        return ids[0] if ids else None
+
+    def _get_lazy_parent(self, target: str) -> int:
+        # the shallowest visited module that lazily imports the target
+        best = -1
+        if self._re_add_lazy and target in self._graph:
+            ids = self._index.get_node_ids(self._graph.predecessors(target))
+            ids = [i for i in ids if i in self._order]
+            if ids:
+                best = min(ids, key=self._order.__getitem__)
+        return best
+
+    def has_chain(self, target: str) -> bool:
+        i = self._get_target_id(target)
+        if i is None:
+            return False
+        return i in self._parents or self._get_lazy_parent(target) >= 0
+
+    def get_shortest_chain(self, target: str) -> "Optional[List[LocImportInfo]]":
+        """
+        Get the shortest chain of imports to the target, None if the target is not
+        reached. The chain is empty if the target is itself in the start scope.
+        """
+        i = self._get_target_id(target)
+        if i is None:
+            return None
+        ids = [i]
+        if i not in self._parents:
+            parent = self._get_lazy_parent(target)
+            if parent < 0:
+                return None
+            ids.append(parent)
+        while self._parents[ids[-1]] >= 0:
+            ids.append(self._parents[ids[-1]])
+        return self._ids_to_chain(ids[::-1])
+
+    def _get_paths_graph(self) -> "nx.DiGraph":
+        # the traversed subgraph, with a virtual root (-1) linked to all start ids.
+        if self._paths_graph is None:
+            index = self._index
+            g = nx.DiGraph()
+            g.add_edges_from((-1, i) for i in self._start_ids)
+            for i in self._parents:
+                g.add_edges_from(
+                    (i, j) for j in index.get_succ(i, visit_lazy=self._visit_lazy)
+                )
+                # lazy imports are only re-added as the last step of a chain
+                if self._re_add_lazy:
+                    g.add_edges_from(
+                        (i, j)
+                        for j in index.get_succ(i, visit_lazy=True)
+                        if j not in self._parents
+                    )
+            self._paths_graph = g
+        return self._paths_graph
+
+    def get_shortest_chains(
+        self, target: str, k: int = 1
+    ) -> "List[List[LocImportInfo]]":
+        """
+        Get the k shortest chains of imports to the target, shortest first. Chains
+        are simple, i.e. they never visit the same module twice.
+        """
+        if k <= 1:
+            chain = self.get_shortest_chain(target)
+            return [] if (chain is None or k < 1) else [chain]
+        if not self.has_chain(target):
+            return []
+        g = self._get_paths_graph()
+        paths = nx.shortest_simple_paths(g, -1, self._get_target_id(target))
+        return [self._ids_to_chain(path[1:]) for path in itertools.islice(paths, k)]
+
+
+def format_import_chain(chain: "Sequence[LocImportInfo]") -> "List[str]":
+    # one line per import statement, with the file and line of each import
+    lines = []
+    for imp in chain:
+        lazy = " [L]" if imp.is_lazy else ""
+        lines.append(
+            f"{imp.source_name} → {imp.target}{lazy}  ({imp.source_module_info.path}:{imp.lineno})"
+        )
+    return lines
+
+
+def format_import_cycles(scope_name: str, cycles: "List[ImportCycle]") -> str:
+    lines = [f"[cycles] scope {repr(scope_name)}: {len(cycles)} import cycle(s)"]
+    for i, cycle in enumerate(cycles):
+        lines.append(f"  [{i + 1}] size {cycle.size}: {', '.join(cycle.modules)}")
+        lines.extend(f"    {line}" for line in format_import_chain(cycle.imports))
+    return "\n".join(lines)
+
+
 # ========================================================================= #
 # END                                                                       #
 # ========================================================================= #
@@ -41,8 +41,20 @@ from typing import (
 import networkx as nx
 
 from pydependence._core.module_data import ModuleMetadata
+from pydependence._core.module_imports_loader import DEFAULT_MODULE_IMPORTS_LOADER
 from pydependence._core.utils import assert_valid_import_name
 
+if TYPE_CHECKING:
+    from pydependence._core.module_imports_ast import LocImportInfo
+    from pydependence._core.modules_resolver import (
+        ImportChains,
+        ImportCycle,
+        ResolveEngineEnum,
+        ScopeResolvedImports,
+        _ImportGraphClosures,
+        _ImportGraphIndex,
+    )
+
 # ========================================================================= #
 # MODULE GRAPH                                                              #
 # ========================================================================= #
@@ -207,8 +219,23 @@ class ModulesScope:
 
     def __init__(self):
         self._module_graph = nx.DiGraph()
-        self.__import_graph_strict = None
-        self.__import_graph_lazy = None
+        self.__import_graph = None
+        self.__import_graph_index = None
+        self.__import_graph_closures = {}
+        # memoized resolves, and the number of times this scope was modified so that
+        # memoized resolves can check if their start scope was modified.
+        self.__resolved = {}
+        self.__import_chains = {}
+        self.__version = 0
+
+    def _invalidate_caches(self):
+        # must be called whenever the module graph is modified!
+        self.__import_graph = None
+        self.__import_graph_index = None
+        self.__import_graph_closures = {}
+        self.__resolved = {}
+        self.__import_chains = {}
+        self.__version += 1
 
     # ~=~=~ ADD MODULES ~=~=~ #
 
@@ -223,8 +250,7 @@ class ModulesScope:
             )
         # 2. add all nodes from the other search space
         self._module_graph = nx.compose(self._module_graph, graph)
-        self.__import_graph_strict = None
-        self.__import_graph_lazy = None
+        self._invalidate_caches()
         return self
 
     def add_modules_from_scope(self, search_space: "ModulesScope") -> "ModulesScope":
@@ -276,6 +302,91 @@ class ModulesScope:
         )
         return self._merge_module_graph(graph=graph)
 
+    # ~=~=~ PATCH MODULES ~=~=~ #
+
+    def patch_modules(
+        self,
+        *,
+        added: "Iterable[ModuleMetadata]" = (),
+        removed: "Iterable[str]" = (),
+        modified: "Iterable[str]" = (),
+    ) -> "Set[str]":
+        """
+        Incrementally update the scope in place when files are added, removed or
+        modified. The module graph, and if cached the import graph, its index and its
+        closure tables, are patched instead of rebuilt, and only added or modified
+        files are parsed again.
+
+        NOTE: unlike when loading modules, unreachable modules are not checked.
+
+        Returns the names of all modules and import targets whose import graph nodes
+        were changed, including the added, removed and modified modules.
+        """
+        added = list(added)
+        removed = list(removed)
+        modified = list(modified)
+        # 1. check the changes
+        for name in (*removed, *modified):
+            if name not in self._module_graph:
+                raise ValueError(f"Module does not exist in scope: {repr(name)}")
+        existing = set(self._module_graph.nodes) - set(removed)
+        added_graph = nx.DiGraph()
+        for m in added:
+            if m.name in existing or m.name in added_graph:
+                raise DuplicateModuleNamesError(
+                    f"Duplicate module name: {repr(m.name)}, tried to add: {m.path}"
+                )
+            added_graph.add_node(m.name, **{NODE_KEY_MODULE_INFO: m})
+        _assert_no_duplicate_paths(self._module_graph.subgraph(existing), added_graph)
+
+        # 2. unload the imports of removed & modified modules, these are stale
+        for name in (*removed, *modified):
+            module_info = self.get_module_data(name).module_info
+            if module_info is not None:
+                DEFAULT_MODULE_IMPORTS_LOADER.unload_module_imports(module_info)
+
+        # 3. patch the module graph, including connections to parent packages
+        self._module_graph.remove_nodes_from(removed)
+        self._module_graph.add_nodes_from(added_graph.nodes(data=True))
+        if added:
+            # group all children by their parent once, instead of for each module
+            children = defaultdict(list)
+            for node in self._module_graph.nodes:
+                parent = node.rsplit(".", maxsplit=1)[0]
+                if parent != node:
+                    children[parent].append(node)
+            for m in added:
+                parent = m.name.rsplit(".", maxsplit=1)[0]
+                if parent != m.name and parent in self._module_graph:
+                    self._module_graph.add_edge(parent, m.name)
+                for node in children.get(m.name, ()):
+                    self._module_graph.add_edge(m.name, node)
+
+        # 4. patch the import graph & index, only if they have been constructed
+        changed = {*removed, *modified, *added_graph.nodes}
+        import_graph = self.__import_graph
+        if import_graph is not None:
+            from pydependence._core.modules_resolver import (
+                _add_module_import_edges,
+                _remove_module_import_edges,
+            )
+
+            for name in (*removed, *modified):
+                changed.update(_remove_module_import_edges(import_graph, node=name))
+            for name in (*modified, *added_graph.nodes):
+                _add_module_import_edges(
+                    import_graph, node=name, node_data=self.get_module_data(name)
+                )
+                changed.update(import_graph.successors(name))
+            if self.__import_graph_index is not None:
+                self.__import_graph_index.update_nodes(import_graph, changed)
+            for closures in self.__import_graph_closures.values():
+                closures.update_nodes(import_graph, changed)
+        self.__resolved = {}
+        self.__import_chains = {}
+        self.__version += 1
+        return changed
+
     # ~=~=~ MODULE INFO ~=~=~ #
 
     def iter_modules(self) -> "Iterator[str]":
@@ -291,6 +402,48 @@ class ModulesScope:
     def get_module_data(self, module_name: str) -> _ModuleGraphNodeData:
         return _ModuleGraphNodeData.from_graph_node(self._module_graph, module_name)
 
+    # ~=~=~ IMPORT GRAPH ~=~=~ #
+
+    def get_import_graph(self) -> "nx.DiGraph":
+        """
+        Get the import graph of this scope, this is only constructed once and then
+        cached until the scope is modified. Edges store both the eager and lazy
+        imports, strict (eager only) traversals are views over this same graph.
+        """
+        if self.__import_graph is None:
+            from pydependence._core.modules_resolver import (
+                _construct_module_import_graph,
+            )
+
+            self.__import_graph = _construct_module_import_graph(scope=self)
+        return self.__import_graph
+
+    def get_import_graph_index(self) -> "_ImportGraphIndex":
+        """
+        Get the integer indexed import graph with per-node import bundles, this is
+        only constructed once and then cached until the scope is modified.
+        """
+        if self.__import_graph_index is None:
+            from pydependence._core.modules_resolver import _ImportGraphIndex
+
+            self.__import_graph_index = _ImportGraphIndex(self.get_import_graph())
+        return self.__import_graph_index
+
+    def get_import_graph_closures(self, visit_lazy: bool) -> "_ImportGraphClosures":
+        """
+        Get the memoized closure table of the import graph, this is only computed
+        once for each traversal mode and then cached until the scope is modified.
+        """
+        closures = self.__import_graph_closures.get(visit_lazy, None)
+        if closures is None:
+            from pydependence._core.modules_resolver import _ImportGraphClosures
+
+            closures = _ImportGraphClosures(
+                self.get_import_graph(), visit_lazy=visit_lazy
+            )
+            self.__import_graph_closures[visit_lazy] = closures
+        return closures
+
     # ~=~=~ SCOPE OPS ~=~=~ #
 
     def is_scope_parent_set(self, other: "ModulesScope") -> bool:
@@ -360,30 +513,126 @@ class ModulesScope:
 
     # ~=~=~ RESOLVE ~=~=~ #
 
-    def resolve_imports(
+    def get_resolved_scope_imports(
         self,
         start_scope: "Optional[ModulesScope]" = None,
         *,
         visit_lazy: bool = True,
         re_add_lazy: bool = False,
-        exclude_unvisited: bool = True,
-        exclude_in_search_space: bool = True,
-        exclude_builtins: bool = True,
-    ):
-        from pydependence._core.modules_resolver import ScopeResolvedImports
+        aggregate: bool = False,
+        engine: "Optional[ResolveEngineEnum]" = None,
+    ) -> "ScopeResolvedImports":
+        """
+        Resolve the imports from the start scope, memoized per (start scope identity,
+        visit_lazy, re_add_lazy, aggregate) until either scope is modified. Resolvers
+        that only differ in their filters, env or outputs then share the same results.
+        The engine does not affect results, so is not part of the key.
+        """
+        from pydependence._core.modules_resolver import (
+            ResolveEngineEnum,
+            ScopeResolvedImports,
+        )
 
+        start = self if start_scope is None else start_scope
+        key = (id(start), visit_lazy, re_add_lazy, aggregate)
+        # check the start scope is the same object and has not been modified, the
+        # id of a garbage collected scope could be reused.
+        hit = self.__resolved.get(key, None)
+        if hit is not None:
+            hit_start, hit_version, resolved = hit
+            if hit_start is start and hit_version == start.__version:
+                return resolved
+        # resolve
         resolved = ScopeResolvedImports.from_scope(
             scope=self,
+            start_scope=start,
+            visit_lazy=visit_lazy,
+            re_add_lazy=re_add_lazy,
+            engine=ResolveEngineEnum.bfs if engine is None else engine,
+            aggregate=aggregate,
+        )
+        self.__resolved[key] = (start, start.__version, resolved)
+        return resolved
+
+    def get_import_cycles(self, *, visit_lazy: bool = False) -> "List[ImportCycle]":
+        """
+        Get all the non-trivial import cycles within this scope, by default only
+        cycles formed by eager imports, largest first.
+        """
+        from pydependence._core.modules_resolver import _find_import_cycles
+
+        return _find_import_cycles(self, visit_lazy=visit_lazy)
+
+    def get_import_chains(
+        self,
+        start_scope: "Optional[ModulesScope]" = None,
+        *,
+        visit_lazy: bool = False,
+        re_add_lazy: bool = False,
+    ) -> "ImportChains":
+        """
+        Get the chains of imports from the start scope, memoized in the same way as
+        resolved imports so that all queries share one BFS tree per start scope.
+        """
+        from pydependence._core.modules_resolver import ImportChains
+
+        start = self if start_scope is None else start_scope
+        key = (id(start), visit_lazy, re_add_lazy)
+        hit = self.__import_chains.get(key, None)
+        if hit is not None:
+            hit_start, hit_version, chains = hit
+            if hit_start is start and hit_version == start.__version:
+                return chains
+        chains = ImportChains(
+            scope=self,
+            start_scope=start,
+            visit_lazy=visit_lazy,
+            re_add_lazy=re_add_lazy,
+        )
+        self.__import_chains[key] = (start, start.__version, chains)
+        return chains
+
+    def iter_resolved_imports(
+        self,
+        start_scope: "Optional[ModulesScope]" = None,
+        *,
+        visit_lazy: bool = True,
+        re_add_lazy: bool = False,
+        exclude_unvisited: bool = True,
+        exclude_in_search_space: bool = True,
+        exclude_builtins: bool = True,
+    ) -> "Iterator[LocImportInfo]":
+        resolved = self.get_resolved_scope_imports(
             start_scope=start_scope,
             visit_lazy=visit_lazy,
             re_add_lazy=re_add_lazy,
         )
-        resolved = resolved.get_filtered(
+        return resolved.iter_filtered(
             exclude_unvisited=exclude_unvisited,  # not sure that this actually works?
             exclude_in_search_space=exclude_in_search_space,
             exclude_builtins=exclude_builtins,
         )
-        return resolved.get_imports()
+
+    def resolve_imports(
+        self,
+        start_scope: "Optional[ModulesScope]" = None,
+        *,
+        visit_lazy: bool = True,
+        re_add_lazy: bool = False,
+        exclude_unvisited: bool = True,
+        exclude_in_search_space: bool = True,
+        exclude_builtins: bool = True,
+    ) -> "List[LocImportInfo]":
+        return list(
+            self.iter_resolved_imports(
+                start_scope=start_scope,
+                visit_lazy=visit_lazy,
+                re_add_lazy=re_add_lazy,
+                exclude_unvisited=exclude_unvisited,
+                exclude_in_search_space=exclude_in_search_space,
+                exclude_builtins=exclude_builtins,
+            )
+        )
 
 
 # ========================================================================= #
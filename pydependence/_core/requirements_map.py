@@ -23,9 +23,26 @@
 # ============================================================================== #
 import abc
 import dataclasses
-import functools
+import hashlib
 import warnings
-from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Union
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
 
 from pydependence._core.builtin import BUILTIN_MODULE_NAMES
 from pydependence._core.module_imports_ast import (
@@ -40,6 +57,7 @@ from pydependence._core.requirements_out import (
 )
 
 if TYPE_CHECKING:
+    from pydependence._core.imports_table import ImportsTable
     from pydependence._core.modules_scope import ModulesScope
 
 
@@ -64,15 +82,38 @@ class ImportMatcherBase(abc.ABC):
 
 
 class ImportMatcherScope(ImportMatcherBase):
+    """
+    Match the modules of a scope. The module names are snapshotted when the matcher
+    is created, so matching is a frozenset lookup instead of a membership test on the
+    live module graph, and later changes to the scope do not affect the matcher.
+
+    The original scope is still available as `scope`, but is not used for matching.
+    """
 
-    def __init__(self, scope: "ModulesScope"):
+    def __init__(self, scope: "ModulesScope", *, name: "Optional[str]" = None):
         self.scope = scope
+        self._modules: "FrozenSet[str]" = frozenset(scope.iter_modules())
+        self._name = name
+        self._cfg_str: "Optional[str]" = None
+
+    @property
+    def modules(self) -> "FrozenSet[str]":
+        return self._modules
 
     def match(self, import_: str) -> bool:
-        return self.scope.has_module(import_)
+        return import_ in self._modules
 
     def cfg_str(self) -> str:
-        return f"scope={repr(self.scope)}"
+        # stable across runs, either the name of the scope, or a digest of its modules
+        if self._cfg_str is None:
+            if self._name is not None:
+                self._cfg_str = f"scope={repr(self._name)}"
+            else:
+                digest = hashlib.sha256("\n".join(sorted(self._modules)).encode())
+                self._cfg_str = (
+                    f"scope=<{len(self._modules)} modules: {digest.hexdigest()[:12]}>"
+                )
+        return self._cfg_str
 
 
 class ImportMatcherGlob(ImportMatcherBase):
@@ -97,24 +138,126 @@ class ImportMatcherGlob(ImportMatcherBase):
                 )
         # create glob
         if last == "*":
-            self._parts = parts
+            self._parts = tuple(parts)
             self._wildcard = True
         else:
             self._parts = (*parts, last)
             self._wildcard = False
         self._base = ".".join(self._parts)
+        self._prefix = self._base + "."
+
+    @property
+    def parts(self) -> "Tuple[str, ...]":
+        return self._parts
+
+    @property
+    def wildcard(self) -> bool:
+        return self._wildcard
 
     def match(self, import_: str) -> bool:
-        if not self._wildcard:
-            return import_ == self._base
-        else:
-            parts = import_.split(".")
-            return self._parts == parts[: len(self._parts)]
+        # wildcards match the base and all of its children
+        if import_ == self._base:
+            return True
+        return self._wildcard and import_.startswith(self._prefix)
 
     def cfg_str(self) -> str:
         return f"import={repr(self._orig)}"
 
 
+class _GlobTrieNode:
+    __slots__ = ("children", "exact", "wildcard")
+
+    def __init__(self):
+        self.children: "Dict[str, _GlobTrieNode]" = {}
+        # terminals, (priority, value) pairs
+        self.exact: "Optional[Tuple[int, Any]]" = None
+        self.wildcard: "Optional[Tuple[int, Any]]" = None
+
+
+class _GlobTrie:
+    """
+    Import globs compiled into a trie over the dotted parts of names. Each node has
+    an exact terminal, matching only the name of the node, and a wildcard terminal,
+    matching the name and all of its children. A lookup walks the parts of an import
+    once, so costs O(depth of the import) regardless of the number of globs.
+
+    Each terminal stores a (priority, value) pair. If multiple globs match, the one
+    with the lowest priority wins, and for the same glob the first added wins.
+    """
+
+    def __init__(self):
+        self._root = _GlobTrieNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(
+        self,
+        parts: "Sequence[str]",
+        wildcard: bool,
+        priority: int,
+        value: "Any",
+    ) -> "Optional[Tuple[int, Any]]":
+        """
+        Add a glob, returning the terminal that takes precedence if the exact same
+        glob was already added with a lower or equal priority, otherwise None.
+        """
+        node = self._root
+        for part in parts:
+            child = node.children.get(part, None)
+            if child is None:
+                child = node.children[part] = _GlobTrieNode()
+            node = child
+        key = "wildcard" if wildcard else "exact"
+        prev = getattr(node, key)
+        if prev is not None and prev[0] <= priority:
+            return prev
+        if prev is None:
+            self._size += 1
+        setattr(node, key, (priority, value))
+        return None
+
+    def add_glob(
+        self, glob: ImportMatcherGlob, priority: int, value: "Any"
+    ) -> "Optional[Tuple[int, Any]]":
+        return self.add(glob.parts, glob.wildcard, priority, value)
+
+    def get_wildcard(self, parts: "Sequence[str]") -> "Optional[Tuple[int, Any]]":
+        """
+        Get the (priority, value) of the best wildcard glob that matches the parts and
+        all of their children, or None.
+        """
+        best = None
+        node = self._root
+        for part in parts:
+            node = node.children.get(part, None)
+            if node is None:
+                return best
+            w = node.wildcard
+            if w is not None and (best is None or w[0] < best[0]):
+                best = w
+        return best
+
+    def get(self, import_: str) -> "Optional[Tuple[int, Any]]":
+        """
+        Get the (priority, value) of the best matching glob, or None.
+        """
+        best = None
+        node = self._root
+        for part in import_.split("."):
+            node = node.children.get(part, None)
+            if node is None:
+                return best
+            w = node.wildcard
+            if w is not None and (best is None or w[0] < best[0]):
+                best = w
+        e = node.exact
+        if e is not None and (best is None or e[0] < best[0]):
+            best = e
+        return best
+
+
 class ImportMatcherGlobs(ImportMatcherBase):
 
     def __init__(self, import_globs: "Union[str, List[str]]"):
@@ -129,13 +272,17 @@ class ImportMatcherGlobs(ImportMatcherBase):
             if x not in _added:
                 self._matchers.append(ImportMatcherGlob(x))
                 _added.add(x)
+        # compile, matching is then a single walk of the trie
+        self._trie = _GlobTrie()
+        for matcher in self._matchers:
+            self._trie.add_glob(matcher, 0, True)
+
+    @property
+    def matchers(self) -> "List[ImportMatcherGlob]":
+        return list(self._matchers)
 
     def match(self, import_: str) -> bool:
-        # linear search... inefficient...
-        for matcher in self._matchers:
-            if matcher.match(import_):
-                return True
-        return False
+        return self._trie.get(import_) is not None
 
     def cfg_str(self) -> str:
         return f"import={repr(self._orig)}"
@@ -160,6 +307,8 @@ class MappedRequirementInfo(NamedTuple):
 
 @dataclasses.dataclass
 class MappedRequirementSource:
+    __slots__ = ("source_module", "source_module_imports")
+
     source_module: str
     source_module_imports: List[BasicImportInfo]
 
@@ -175,6 +324,8 @@ class MappedRequirementSource:
 
 @dataclasses.dataclass
 class MappedRequirement:
+    __slots__ = ("requirement", "sources")
+
     requirement: str  # mapped name
     sources: Dict[str, MappedRequirementSource]  # k == v.source_module
 
@@ -234,18 +385,133 @@ class ReqMatcher:
         return f"{{requirement={repr(self.requirement)}, {self.matcher.cfg_str()}}}"
 
 
+class MatcherConflict(NamedTuple):
+    requirements_env: str
+    # the matcher, or part of a matcher, that can never match
+    requirement: str
+    matcher: str
+    # the requirements of the earlier matchers that take precedence
+    shadowed_by: "Tuple[str, ...]"
+
+
+class _CompiledReqMatchers:
+    """
+    An ordered list of requirement matchers compiled into a single lookup, where
+    the first matcher that matches an import wins. Globs are compiled into one trie
+    and scopes into a dict from module names, each storing the position of their
+    matcher as the priority. Any other matchers are checked in order, but only if
+    they come before the best match so far.
+
+    Matchers that can never match because earlier matchers always take precedence
+    are recorded as conflicts while compiling.
+    """
+
+    def __init__(self, matchers: "Sequence[ReqMatcher]"):
+        self._matchers = list(matchers)
+        self._trie = _GlobTrie()
+        self._names: "Dict[str, int]" = {}
+        self._others: "List[Tuple[int, ImportMatcherBase]]" = []
+        self._conflicts: "List[Tuple[int, str, Tuple[int, ...]]]" = []
+        for i, rm in enumerate(self._matchers):
+            self._add(i, rm.matcher)
+
+    def _get_name_priority(self, name: str) -> "Optional[int]":
+        best = self._trie.get(name)
+        best = None if best is None else best[0]
+        i = self._names.get(name, None)
+        if i is not None and (best is None or i < best):
+            best = i
+        return best
+
+    def _add_glob(self, i: int, glob: ImportMatcherGlob):
+        # check if shadowed by earlier matchers
+        if glob.wildcard:
+            prev = self._trie.get_wildcard(glob.parts)
+            prev = None if prev is None else prev[0]
+        else:
+            prev = self._get_name_priority(".".join(glob.parts))
+        if prev is not None and prev != i:
+            self._conflicts.append((i, glob.cfg_str(), (prev,)))
+        # add
+        self._trie.add_glob(glob, i, None)
+
+    def _add(self, i: int, matcher: ImportMatcherBase):
+        if isinstance(matcher, ImportMatcherGlobs):
+            for glob in matcher.matchers:
+                self._add_glob(i, glob)
+        elif isinstance(matcher, ImportMatcherGlob):
+            self._add_glob(i, matcher)
+        elif isinstance(matcher, ImportMatcherScope):
+            names = matcher.modules
+            prevs = [self._get_name_priority(name) for name in names]
+            if names and all(p is not None and p != i for p in prevs):
+                prevs = tuple(sorted(set(prevs)))
+                self._conflicts.append((i, matcher.cfg_str(), prevs))
+            for name in names:
+                self._names.setdefault(name, i)
+        else:
+            self._others.append((i, matcher))
+
+    def match(self, import_: str) -> "Optional[ReqMatcher]":
+        best = self._get_name_priority(import_)
+        for i, matcher in self._others:
+            if best is not None and i >= best:
+                break
+            if matcher.match(import_):
+                best = i
+                break
+        return None if best is None else self._matchers[best]
+
+    def get_conflicts(self, requirements_env: str) -> "List[MatcherConflict]":
+        return [
+            MatcherConflict(
+                requirements_env=requirements_env,
+                requirement=self._matchers[i].requirement,
+                matcher=cfg_str,
+                shadowed_by=tuple(self._matchers[j].requirement for j in prevs),
+            )
+            for i, cfg_str, prevs in self._conflicts
+        ]
+
+
+class MapperMemoStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: "Optional[int]"
+
+
 class RequirementsMapper:
 
     def __init__(
         self,
         *,
         env_matchers: "Optional[Union[Dict[str, List[ReqMatcher]], List[ReqMatcher]]]",
+        memo_size: "Optional[int]" = None,
     ):
         # env -> [(requirement, import matcher), ...]
         # * we use a list to maintain order, and then linear search. This is because
         #   we could have multiple imports that match to the same requirement.
         #   we could potentially be stricter about this in future...
         self._env_matchers = self._validate_env_matchers(env_matchers)
+        # each env is compiled into a single lookup on first use, merged with the
+        # default env as the fallback.
+        self._env_compiled: "Dict[str, _CompiledReqMatchers]" = {}
+        # each env is also compiled on its own, without the default env, so that
+        # several envs can share the mapping of the default env.
+        self._env_own_compiled: "Dict[str, _CompiledReqMatchers]" = {}
+        # memo of (env, import) -> matched requirement, or None if no matcher matched,
+        # owned by this mapper. Caching misses is safe because the matchers are never
+        # modified after they are compiled, and unmatched imports still warn or raise
+        # on every call, since this happens after the lookup.
+        # if memo_size is set, then the oldest entries are evicted first.
+        self._memo: "Dict[Tuple[str, str], Optional[ReqMatcher]]" = {}
+        self._memo_size = memo_size
+        self._memo_hits = 0
+        self._memo_misses = 0
+        # number of times each matcher was used to map an import, by id, including
+        # memoized results, e.g. to find matchers that are never used.
+        self._matcher_hits: "Dict[int, int]" = {}
 
     @classmethod
     def _validate_env_matchers(cls, env_matchers) -> "Dict[str, List[ReqMatcher]]":
@@ -302,7 +568,90 @@ class RequirementsMapper:
         )
         return req_info.requirement
 
-    @functools.lru_cache(maxsize=256)
+    def map_import_to_requirement_name(
+        self,
+        import_: str,
+        *,
+        requirements_env: "Optional[str]" = None,
+    ) -> str:
+        """
+        Get the canonical name of the requirement that an import maps to, without
+        warning about imports that are not mapped.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            mapped = self.map_import_to_requirement(
+                import_, requirements_env=requirements_env
+            )
+        try:
+            mapped = Requirement(mapped).name
+        except InvalidRequirement:
+            pass
+        return canonicalize_name(mapped)
+
+    def _match_requirement(
+        self,
+        import_: str,
+        requirements_env: "Optional[str]" = None,
+    ) -> "Optional[str]":
+        if requirements_env is None:
+            requirements_env = DEFAULT_REQUIREMENTS_ENV
+        key = (requirements_env, import_)
+        try:
+            rm = self._memo[key]
+        except KeyError:
+            # take the specific env, then the default env
+            self._memo_misses += 1
+            rm = self._get_compiled_matchers(requirements_env).match(import_)
+            if self._memo_size is None or self._memo_size > 0:
+                if self._memo_size is not None and len(self._memo) >= self._memo_size:
+                    del self._memo[next(iter(self._memo))]
+                self._memo[key] = rm
+        else:
+            self._memo_hits += 1
+        if rm is None:
+            return None
+        self._add_matcher_hit(rm)
+        return rm.requirement
+
+    def _add_matcher_hit(self, rm: ReqMatcher) -> None:
+        self._matcher_hits[id(rm)] = self._matcher_hits.get(id(rm), 0) + 1
+
+    def get_matcher_hits(self) -> "List[Tuple[str, ReqMatcher, int]]":
+        """
+        Get the number of imports that each matcher has mapped since this mapper was
+        created, as (env, matcher, hits) in the order of the configured matchers.
+        Each unique target is usually only mapped once per generated output.
+        """
+        return [
+            (env, rm, self._matcher_hits.get(id(rm), 0))
+            for env, matchers in self._env_matchers.items()
+            for rm in matchers
+        ]
+
+    def get_requirement_hits(self) -> "Dict[Tuple[str, str], int]":
+        """
+        Get the summed hits of the matchers of each (env, requirement) pair, e.g.
+        versions made of several matchers are only unused if none of them were hit.
+        """
+        hits = defaultdict(int)
+        for env, rm, n in self.get_matcher_hits():
+            hits[(env, rm.requirement)] += n
+        return dict(hits)
+
+    def get_memo_stats(self) -> "MapperMemoStats":
+        return MapperMemoStats(
+            hits=self._memo_hits,
+            misses=self._memo_misses,
+            size=len(self._memo),
+            maxsize=self._memo_size,
+        )
+
+    def clear_memo(self) -> None:
+        self._memo.clear()
+        self._memo_hits = 0
+        self._memo_misses = 0
+
     def map_import_to_requirement_info(
         self,
         import_: str,
@@ -313,30 +662,15 @@ class RequirementsMapper:
         """
         :raises NoConfiguredRequirementMappingError: if no requirement is found for an import and if strict mode is enabled.
         """
-        if requirements_env is None:
-            requirements_env = DEFAULT_REQUIREMENTS_ENV
-        # 1. take the specific env
-        if requirements_env != DEFAULT_REQUIREMENTS_ENV:
-            if requirements_env not in self._env_matchers:
-                raise ValueError(
-                    f"env: {repr(requirements_env)} has not been defined for a requirement."
-                )
-            for rm in self._env_matchers[requirements_env]:
-                if rm.matcher.match(import_):
-                    return MappedRequirementInfo(
-                        rm.requirement,
-                        is_mapped=True,
-                        original_name=import_,
-                    )
-        # 2. take the default env
-        for rm in self._env_matchers.get(DEFAULT_REQUIREMENTS_ENV, []):
-            if rm.matcher.match(import_):
-                return MappedRequirementInfo(
-                    rm.requirement,
-                    is_mapped=True,
-                    original_name=import_,
-                )
-        # 3. return the root
+        # 1. take the specific env, then the default env
+        requirement = self._match_requirement(import_, requirements_env)
+        if requirement is not None:
+            return MappedRequirementInfo(
+                requirement,
+                is_mapped=True,
+                original_name=import_,
+            )
+        # 2. return the root
         if strict:
             raise NoConfiguredRequirementMappingError(
                 msg=f"could not find import to requirement mappings: {repr(import_)},\ndefine a scope or glob matcher for this import, or set disable strict mode!",
@@ -353,6 +687,79 @@ class RequirementsMapper:
                 original_name=import_,  # TODO: or should this be root?
             )
 
+    def map_imports(
+        self,
+        targets: "Iterable[str]",
+        requirements_env: "Optional[str]" = None,
+        *,
+        strict: bool = False,
+    ) -> "Dict[str, MappedRequirementInfo]":
+        """
+        Map a batch of import targets to requirements, each unique target is only
+        mapped once. Returns the requirement info for each unique target.
+
+        :raises NoConfiguredRequirementMappingError: if no requirement is found for any of the imports and if strict mode is enabled, after all imports have been mapped.
+        """
+        results = {}
+        errors = []
+        for target in dict.fromkeys(targets):
+            try:
+                results[target] = self.map_import_to_requirement_info(
+                    target,
+                    requirements_env=requirements_env,
+                    strict=strict,
+                )
+            except NoConfiguredRequirementMappingError as e:
+                errors.append(e)
+        if errors:
+            self._raise_mapping_errors(errors, requirements_env=requirements_env)
+        return results
+
+    def _get_compiled_matchers(
+        self,
+        requirements_env: "Optional[str]" = None,
+    ) -> "_CompiledReqMatchers":
+        if requirements_env is None:
+            requirements_env = DEFAULT_REQUIREMENTS_ENV
+        compiled = self._env_compiled.get(requirements_env, None)
+        if compiled is None:
+            matchers = self._env_matchers.get(DEFAULT_REQUIREMENTS_ENV, [])
+            if requirements_env != DEFAULT_REQUIREMENTS_ENV:
+                if requirements_env not in self._env_matchers:
+                    raise ValueError(
+                        f"env: {repr(requirements_env)} has not been defined for a requirement."
+                    )
+                # specific env takes priority over the default env
+                matchers = self._env_matchers[requirements_env] + matchers
+            compiled = _CompiledReqMatchers(matchers)
+            self._env_compiled[requirements_env] = compiled
+        return compiled
+
+    def _get_own_compiled_matchers(
+        self,
+        requirements_env: str,
+    ) -> "_CompiledReqMatchers":
+        compiled = self._env_own_compiled.get(requirements_env, None)
+        if compiled is None:
+            if requirements_env not in self._env_matchers:
+                raise ValueError(
+                    f"env: {repr(requirements_env)} has not been defined for a requirement."
+                )
+            compiled = _CompiledReqMatchers(self._env_matchers[requirements_env])
+            self._env_own_compiled[requirements_env] = compiled
+        return compiled
+
+    def get_matcher_conflicts(self) -> "List[MatcherConflict]":
+        """
+        Get the matchers within each env that can never match because earlier
+        matchers in the same env always take precedence. Matchers of a specific env
+        that override the default env are intentional, so are not conflicts.
+        """
+        conflicts = []
+        for env, matchers in self._env_matchers.items():
+            conflicts.extend(_CompiledReqMatchers(matchers).get_conflicts(env))
+        return conflicts
+
     def _get_joined_matchers(
         self,
         requirements_env: "Optional[str]" = None,
@@ -374,7 +781,7 @@ class RequirementsMapper:
 
     def generate_mapped_requirements(
         self,
-        imports: "List[BasicImportInfo]",
+        imports: "Iterable[BasicImportInfo]",
         *,
         requirements_env: "Optional[str]" = None,
         strict: bool = False,
@@ -383,6 +790,7 @@ class RequirementsMapper:
     ) -> "MappedRequirements":
         """
         Map imports to requirements, returning the imports grouped by the requirement.
+        The imports are consumed once, so they can be streamed from a lazy iterator.
 
         :raises NoConfiguredRequirementMappingError: if no requirement is found for an import, but only if strict mode is enabled, and after all imports have been processed so that pretty error messages can be generated.
         """
@@ -395,32 +803,126 @@ class RequirementsMapper:
             resolver_name=resolver_name,
         )
         errors = []
+        # there are usually far more imports than unique targets, so each target is
+        # mapped once, including builtins, with None for targets that failed.
+        target_reqs: "Dict[str, Optional[str]]" = {}
+        req_sources: "Dict[Tuple[str, Any], MappedRequirementSource]" = {}
         for imp in imports:
             # 1. map requirements
-            if imp.target in BUILTIN_MODULE_NAMES:  # TODO: needed?
-                req_info = MappedRequirementInfo(
-                    imp.target,
-                    is_mapped=False,
-                    original_name=imp.target,
-                )
-            elif imp.root_target in BUILTIN_MODULE_NAMES:
-                req_info = MappedRequirementInfo(
-                    imp.root_target,
-                    is_mapped=False,
-                    original_name=imp.target,  # TODO: or should this be root?
-                )
-            else:
+            target = imp.target
+            try:
+                requirement = target_reqs[target]
+            except KeyError:
                 try:
-                    req_info = self.map_import_to_requirement_info(
-                        imp.target,
+                    requirement = self._map_target_to_requirement_info(
+                        target,
                         requirements_env=requirements_env,
                         strict=strict,
-                    )
+                    ).requirement
                 except NoConfiguredRequirementMappingError as e:
                     errors.append(e)
-                    continue
+                    requirement = None
+                target_reqs[target] = requirement
+            if requirement is None:
+                continue
+
+            # 2. get or create requirement source
+            req_group_source = req_sources.get((requirement, imp.source_name), None)
+            if req_group_source is None:
+                # - get or create requirement
+                req_group = r.requirements.get(requirement, None)
+                if req_group is None:
+                    req_group = MappedRequirement(
+                        requirement=requirement,
+                        sources={},
+                    )
+                    r.requirements[requirement] = req_group
+                req_group_source = MappedRequirementSource(
+                    source_module=imp.source_name,
+                    source_module_imports=[],
+                )
+                req_group.sources[imp.source_name] = req_group_source
+                req_sources[(requirement, imp.source_name)] = req_group_source
+
+            # - append import to source & update
+            req_group_source.source_module_imports.append(imp)
+
+        if errors:
+            self._raise_mapping_errors(errors, requirements_env=requirements_env)
+
+        # done!
+        return r
+
+    def generate_mapped_requirements_from_table(
+        self,
+        table: "ImportsTable",
+        mask=None,
+        *,
+        imports: "Iterable[BasicImportInfo]" = (),
+        requirements_env: "Optional[str]" = None,
+        strict: bool = False,
+        resolver_name: Optional[str] = None,
+    ) -> "MappedRequirements":
+        """
+        Like `generate_mapped_requirements`, but for the rows of a columnar table that
+        are kept by the mask. Each unique target is mapped once, and the rows are then
+        grouped by requirement and source with a sort instead of nested dicts. Extra
+        imports that are not part of the table, e.g. manual imports, are appended.
+
+        :raises NoConfiguredRequirementMappingError: if no requirement is found for an import, but only if strict mode is enabled.
+        """
+        strings, rows = table.strings, table.rows
+        # 1. map each unique target once
+        reqs: "List[str]" = []
+        req_ids: "Dict[str, int]" = {}
+        target_keys = [-1] * len(strings)
+        errors = []
+        for t in table.get_unique(table.target, mask):
+            try:
+                req_info = self._map_target_to_requirement_info(
+                    strings[t],
+                    requirements_env=requirements_env,
+                    strict=strict,
+                )
+            except NoConfiguredRequirementMappingError as e:
+                errors.append(e)
+                continue
+            k = req_ids.get(req_info.requirement, None)
+            if k is None:
+                k = req_ids[req_info.requirement] = len(reqs)
+                reqs.append(req_info.requirement)
+            target_keys[t] = k
+
+        # 2. group rows by requirement & source
+        r = MappedRequirements(
+            requirements={},
+            resolver_name=resolver_name,
+        )
+        # - rows of targets that failed to map have negative keys, so are skipped
+        keys = table.take(table.target, target_keys)
+        for k, sources in table.get_groups(keys, mask):
+            r.requirements[reqs[k]] = MappedRequirement(
+                requirement=reqs[k],
+                sources={
+                    strings[src]: MappedRequirementSource(
+                        source_module=strings[src],
+                        source_module_imports=[rows[i] for i in idxs],
+                    )
+                    for src, idxs in sources
+                },
+            )
 
-            # 2. get or create requirement sources
+        # 3. append extra imports
+        for imp in imports:
+            try:
+                req_info = self._map_target_to_requirement_info(
+                    imp.target,
+                    requirements_env=requirements_env,
+                    strict=strict,
+                )
+            except NoConfiguredRequirementMappingError as e:
+                errors.append(e)
+                continue
             req_group = r.requirements.get(req_info.requirement, None)
             if req_group is None:
                 req_group = MappedRequirement(
@@ -428,8 +930,6 @@ class RequirementsMapper:
                     sources={},
                 )
                 r.requirements[req_info.requirement] = req_group
-
-            # - get or create requirement source import
             req_group_source = req_group.sources.get(imp.source_name, None)
             if req_group_source is None:
                 req_group_source = MappedRequirementSource(
@@ -437,31 +937,209 @@ class RequirementsMapper:
                     source_module_imports=[],
                 )
                 req_group.sources[imp.source_name] = req_group_source
-
-            # - append import to source & update
             req_group_source.source_module_imports.append(imp)
 
         if errors:
-            err_imports = {imp for e in errors for imp in e.imports}
-            err_roots = {imp.split(".")[0] for imp in err_imports}
-            raise NoConfiguredRequirementMappingError(
-                msg=(
-                    f"could not find import to requirement mappings for roots:"
-                    f"\n  * {', '.join(map(repr, map(str, sorted(set(err_roots)))))},"
-                    f"\nor full imports:"
-                    f"\n  * {', '.join(map(repr, map(str, sorted(set(err_imports)))))},"
-                    f"\navailable matchers: {self._get_matcher_cfg_sting(requirements_env=requirements_env) or '<NONE>'},"
-                    f"\notherwise if running from a config file, set strict_requirements_map=False to disable strict mode and use the root module name instead."
-                ),
-                imports=err_imports,
-            )
+            self._raise_mapping_errors(errors, requirements_env=requirements_env)
 
         # done!
         return r
 
+    def generate_mapped_requirements_envs(
+        self,
+        imports: "Iterable[BasicImportInfo]",
+        *,
+        requirements_envs: "Sequence[Optional[str]]",
+        strict: bool = False,
+        resolver_name: Optional[str] = None,
+    ) -> "Dict[str, MappedRequirements]":
+        """
+        Like `generate_mapped_requirements`, but map the same imports for several
+        requirement envs in a single pass, returning the mapped requirements of each
+        env. The imports are consumed once and grouped by target, each unique target
+        is then only checked against the matchers specific to each env, and targets
+        that are not overridden by an env share the mapping of the default env.
+
+        Requirements that are not affected by the overrides of an env are shared with
+        the results of other envs, so should not be modified.
+
+        :raises NoConfiguredRequirementMappingError: if no requirement is found for an import, but only if strict mode is enabled, for the first env with errors after all imports have been processed.
+        """
+        envs = list(
+            dict.fromkeys(
+                DEFAULT_REQUIREMENTS_ENV if env is None else env
+                for env in requirements_envs
+            )
+        )
+        own_compiled = {
+            env: self._get_own_compiled_matchers(env)
+            for env in envs
+            if env != DEFAULT_REQUIREMENTS_ENV
+        }
+
+        # 1. group imports by target & source
+        buckets: "Dict[str, Dict[str, List[BasicImportInfo]]]" = {}
+        for imp in imports:
+            sources = buckets.get(imp.target, None)
+            if sources is None:
+                sources = buckets[imp.target] = {}
+            source_imports = sources.get(imp.source_name, None)
+            if source_imports is None:
+                source_imports = sources[imp.source_name] = []
+            source_imports.append(imp)
+
+        # 2. map each unique target, first with the matchers specific to each env,
+        #    and then with the default env only if some env does not override it.
+        #    builtins are never matched, so are never overridden.
+        env_overrides: "Dict[str, Dict[str, str]]" = {env: {} for env in envs}
+        default_reqs: "Dict[str, Optional[str]]" = {}
+        default_errors: "Dict[str, NoConfiguredRequirementMappingError]" = {}
+        for target in buckets:
+            needs_default = DEFAULT_REQUIREMENTS_ENV in env_overrides
+            if not (
+                target in BUILTIN_MODULE_NAMES
+                or target.split(".")[0] in BUILTIN_MODULE_NAMES
+            ):
+                for env, compiled in own_compiled.items():
+                    rm = compiled.match(target)
+                    if rm is None:
+                        needs_default = True
+                    else:
+                        self._add_matcher_hit(rm)
+                        env_overrides[env][target] = rm.requirement
+            else:
+                needs_default = True
+            if needs_default:
+                try:
+                    default_reqs[target] = self._map_target_to_requirement_info(
+                        target,
+                        requirements_env=DEFAULT_REQUIREMENTS_ENV,
+                        strict=strict,
+                    ).requirement
+                except NoConfiguredRequirementMappingError as e:
+                    default_errors[target] = e
+                    default_reqs[target] = None
+        # - overrides that map to the same requirement as the default are not needed
+        for overrides in env_overrides.values():
+            for target, requirement in list(overrides.items()):
+                if default_reqs.get(target, None) == requirement:
+                    del overrides[target]
+
+        # 3. check for errors, targets that failed with the default env are only
+        #    errors for envs that do not override them.
+        if default_errors:
+            for env, overrides in env_overrides.items():
+                errors = [e for t, e in default_errors.items() if t not in overrides]
+                if errors:
+                    self._raise_mapping_errors(errors, requirements_env=env)
+
+        # 4. group targets by requirement, envs only regroup the requirements that
+        #    are affected by their overrides, and share the rest.
+        default_targets: "Dict[str, List[str]]" = defaultdict(list)
+        for target, requirement in default_reqs.items():
+            if requirement is not None:
+                default_targets[requirement].append(target)
+        default_groups: "Dict[str, MappedRequirement]" = {}
+
+        def _group(requirement: str, targets: "Iterable[str]") -> MappedRequirement:
+            sources: "Dict[str, MappedRequirementSource]" = {}
+            for target in targets:
+                for source_name, source_imports in buckets[target].items():
+                    source = sources.get(source_name, None)
+                    if source is None:
+                        source = sources[source_name] = MappedRequirementSource(
+                            source_module=source_name,
+                            source_module_imports=[],
+                        )
+                    source.source_module_imports.extend(source_imports)
+            return MappedRequirement(requirement=requirement, sources=sources)
+
+        def _get_default_group(requirement: str) -> MappedRequirement:
+            group = default_groups.get(requirement, None)
+            if group is None:
+                group = _group(requirement, default_targets[requirement])
+                default_groups[requirement] = group
+            return group
+
+        results = {}
+        for env, overrides in env_overrides.items():
+            affected = set(overrides.values())
+            affected.update(default_reqs.get(t, None) for t in overrides)
+            requirements = {}
+            for requirement, targets in default_targets.items():
+                if requirement in affected:
+                    targets = [t for t in targets if t not in overrides]
+                    if targets:
+                        requirements[requirement] = targets
+                else:
+                    requirements[requirement] = None
+            for target, requirement in overrides.items():
+                if requirements.get(requirement, None) is None:
+                    requirements[requirement] = []
+                requirements[requirement].append(target)
+            results[env] = MappedRequirements(
+                requirements={
+                    requirement: (
+                        _get_default_group(requirement)
+                        if targets is None
+                        else _group(requirement, targets)
+                    )
+                    for requirement, targets in requirements.items()
+                },
+                resolver_name=resolver_name,
+            )
+        return results
+
+    def _map_target_to_requirement_info(
+        self,
+        target: str,
+        *,
+        requirements_env: "Optional[str]" = None,
+        strict: bool = False,
+    ) -> "MappedRequirementInfo":
+        root_target = target.split(".")[0]
+        if target in BUILTIN_MODULE_NAMES:  # TODO: needed?
+            return MappedRequirementInfo(
+                target,
+                is_mapped=False,
+                original_name=target,
+            )
+        elif root_target in BUILTIN_MODULE_NAMES:
+            return MappedRequirementInfo(
+                root_target,
+                is_mapped=False,
+                original_name=target,  # TODO: or should this be root?
+            )
+        else:
+            return self.map_import_to_requirement_info(
+                target,
+                requirements_env=requirements_env,
+                strict=strict,
+            )
+
+    def _raise_mapping_errors(
+        self,
+        errors: "List[NoConfiguredRequirementMappingError]",
+        *,
+        requirements_env: "Optional[str]" = None,
+    ):
+        err_imports = {imp for e in errors for imp in e.imports}
+        err_roots = {imp.split(".")[0] for imp in err_imports}
+        raise NoConfiguredRequirementMappingError(
+            msg=(
+                f"could not find import to requirement mappings for roots:"
+                f"\n  * {', '.join(map(repr, map(str, sorted(set(err_roots)))))},"
+                f"\nor full imports:"
+                f"\n  * {', '.join(map(repr, map(str, sorted(set(err_imports)))))},"
+                f"\navailable matchers: {self._get_matcher_cfg_sting(requirements_env=requirements_env) or '<NONE>'},"
+                f"\notherwise if running from a config file, set strict_requirements_map=False to disable strict mode and use the root module name instead."
+            ),
+            imports=err_imports,
+        )
+
     def generate_output_requirements(
         self,
-        imports: "List[BasicImportInfo]",
+        imports: "Iterable[BasicImportInfo]",
         *,
         requirements_env: "Optional[str]" = None,
         strict: bool = False,
@@ -25,7 +25,22 @@
 
 import dataclasses
 from collections import defaultdict
-from typing import List, NamedTuple, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+if TYPE_CHECKING:
+    from pydependence._core.lockfile import LockedRequirement, Lockfile
 
 # ========================================================================= #
 # REQUIREMENTS MAPPER                                                       #
@@ -34,6 +49,8 @@ from typing import List, NamedTuple, Optional, Tuple
 
 @dataclasses.dataclass
 class OutMappedRequirementSource:
+    __slots__ = ("source_module", "is_lazy", "is_manual")
+
     source_module: str
     is_lazy: bool
     is_manual: bool
@@ -57,6 +74,8 @@ class SrcInfo(NamedTuple):
 
 @dataclasses.dataclass
 class OutMappedRequirement:
+    __slots__ = ("requirement", "sources")
+
     requirement: str
     sources: List[OutMappedRequirementSource]
 
@@ -140,6 +159,25 @@ class OutMappedRequirements:
                 resolver_name=repr(self.resolver_name)
             )
 
+    def get_raw_duplicates(self) -> "List[Tuple[str, List[str]]]":
+        """
+        Get the raw requirements with the same name as a requirement generated from
+        imports, with the modules that import the generated requirement.
+        """
+        generated = defaultdict(set)
+        for req in self.requirements:
+            for src in req.sources:
+                if not src.is_manual:
+                    generated[_get_requirement_key(req.requirement)].add(
+                        src.source_module
+                    )
+        duplicates = []
+        for req in self.requirements:
+            key = _get_requirement_key(req.requirement)
+            if req.any_manual and key in generated:
+                duplicates.append((req.requirement, sorted(generated[key])))
+        return duplicates
+
     def _get_debug_struct(self) -> "List[Tuple[str, List[str]]]":
         return [
             (req.requirement, [src.source_module for src in req.sources])
@@ -154,13 +192,37 @@ class OutMappedRequirements:
         sources_roots: bool = False,
         sources_annotations: bool = True,
         indent_size: int = 4,
+        lockfile: "Optional[Lockfile]" = None,
+        hashes: bool = True,
     ) -> str:
+        """
+        If a lockfile is given, then each requirement is pinned to its locked version,
+        followed by `--hash` lines if hashes is True. The locked transitive dependencies
+        of the requirements are appended, so that the output is installable with
+        `pip install --no-deps --require-hashes`.
+        """
+        locked = None
+        if lockfile is not None:
+            locked = lockfile.pin_closure(
+                [req.requirement for req in self.requirements], hashes=hashes
+            )
+
+        def _add_locked(locked_req: "LockedRequirement"):
+            lines.append(f"{locked_req.requirement}")
+            if hashes:
+                for h in locked_req.package.hashes:
+                    lines[-1] += " \\"
+                    lines.append(f"{' '*indent_size*1}--hash={h}")
+
         lines = []
         if notice:
             lines.append(f"# {self.autogen_notice}")
-        for req in self.requirements:
+        for i, req in enumerate(self.requirements):
             # add requirement
-            lines.append(f"{req.requirement}")
+            if locked is None:
+                lines.append(f"{req.requirement}")
+            else:
+                _add_locked(locked[i])
             # add annotations
             lines[
                 -1
@@ -172,6 +234,17 @@ class OutMappedRequirements:
                 else:
                     for src_info in req.get_source_info(roots=sources_roots):
                         lines.append(f"{' '*indent_size*1}# {src_info.anno_str}")
+        # add locked transitive dependencies
+        if locked is not None and len(locked) > len(self.requirements):
+            lines.append("# locked transitive dependencies")
+            for locked_req in locked[len(self.requirements) :]:
+                _add_locked(locked_req)
+                if sources and locked_req.via:
+                    via = ", ".join(locked_req.via)
+                    if sources_compact:
+                        lines[-1] += f" # via {via}"
+                    else:
+                        lines.append(f"{' '*indent_size*1}# via {via}")
         if self.requirements or notice:
             lines.append("")
         return "\n".join(lines)
@@ -237,6 +310,111 @@ class OutMappedRequirements:
         return array
 
 
+# ========================================================================= #
+# LAYERS                                                                    #
+# ========================================================================= #
+
+
+class RequirementLayers(NamedTuple):
+    base: OutMappedRequirements
+    deltas: "Dict[str, OutMappedRequirements]"
+
+    def get_outputs(
+        self,
+        get_delta_name: "Callable[[str], str]",
+    ) -> "List[OutMappedRequirements]":
+        """
+        Get the base followed by the deltas, each named after the output that it is
+        written to, with the deltas renamed from the resolver names.
+        """
+        outputs = [self.base]
+        for resolver, delta in self.deltas.items():
+            outputs.append(
+                OutMappedRequirements(
+                    requirements=delta.requirements,
+                    resolver_name=get_delta_name(resolver),
+                )
+            )
+        return outputs
+
+
+def _get_requirement_key(requirement: str) -> str:
+    try:
+        return canonicalize_name(Requirement(requirement).name)
+    except InvalidRequirement:
+        return requirement
+
+
+def extract_base_layer(
+    requirements: "Dict[str, OutMappedRequirements]",
+    *,
+    min_share: float = 1.0,
+    base_name: "Optional[str]" = None,
+) -> RequirementLayers:
+    """
+    Split the requirements of several resolvers into a shared base layer, and the
+    remaining requirements of each resolver as deltas on top of the base.
+
+    A requirement is in the base if it is needed by at least `min_share` of the
+    resolvers. With the default of 1.0, the base is the largest set that does not
+    add requirements to any resolver. Lower values grow the base so that it is
+    reused more, at the cost of adding requirements to resolvers that do not need
+    them. Packages that are required with different specifiers by different
+    resolvers are never in the base, since the base must suit all resolvers.
+    """
+    if not (0 < min_share <= 1):
+        raise ValueError(f"min_share must be in the range (0, 1], got: {min_share}")
+    # count the resolvers that need each requirement
+    owners: "Dict[str, List[OutMappedRequirement]]" = defaultdict(list)
+    variants: "Dict[str, Set[str]]" = defaultdict(set)
+    for reqs in requirements.values():
+        for req in reqs.requirements:
+            owners[req.requirement].append(req)
+            variants[_get_requirement_key(req.requirement)].add(req.requirement)
+    # choose the base
+    base = []
+    for requirement in sorted(owners):
+        if len(owners[requirement]) < min_share * len(requirements) - 1e-9:
+            continue
+        if len(variants[_get_requirement_key(requirement)]) > 1:
+            continue
+        # merge sources, lazy only if lazy for all resolvers
+        sources: "Dict[str, OutMappedRequirementSource]" = {}
+        for req in owners[requirement]:
+            for src in req.sources:
+                prev = sources.get(src.source_module, None)
+                if prev is None:
+                    sources[src.source_module] = OutMappedRequirementSource(
+                        source_module=src.source_module,
+                        is_lazy=src.is_lazy,
+                        is_manual=src.is_manual,
+                    )
+                else:
+                    prev.is_lazy &= src.is_lazy
+                    prev.is_manual |= src.is_manual
+        base.append(
+            OutMappedRequirement(
+                requirement=requirement,
+                sources=[sources[k] for k in sorted(sources)],
+            )
+        )
+    # deltas
+    base_reqs = {req.requirement for req in base}
+    deltas = {
+        name: OutMappedRequirements(
+            requirements=[
+                req for req in reqs.requirements if req.requirement not in base_reqs
+            ],
+            resolver_name=reqs.resolver_name,
+        )
+        for name, reqs in requirements.items()
+    }
+    return RequirementLayers(
+        base=OutMappedRequirements(requirements=base, resolver_name=base_name),
+        deltas=deltas,
+    )
+
+
 # ========================================================================= #
 # END                                                                       #
 # ========================================================================= #
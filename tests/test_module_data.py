@@ -22,26 +22,50 @@
 # SOFTWARE.                                                                      #
 # ============================================================================== #
 
+import itertools
+import json
 import sys
+import warnings
 from pathlib import Path
 
 import pytest
 
-from pydependence._cli import pydeps
+from pydependence._cli import (
+    CfgBudget,
+    CfgVersion,
+    PydependenceCfg,
+    ResolverBudgetError,
+    UnusedRequirementsError,
+    pydeps,
+    pydeps_layers,
+    pydeps_why,
+)
+from pydependence._core.builtin import is_builtin_module_name
+from pydependence._core.footprint import InstalledDists
+from pydependence._core.lockfile import Lockfile, LockfileError, load_lockfile
 from pydependence._core.module_data import ModuleMetadata
 from pydependence._core.module_imports_ast import (
+    AggImportInfo,
     ImportSourceEnum,
     LocImportInfo,
     ManualImportInfo,
+    ManualSource,
     load_imports_from_module_info,
 )
 from pydependence._core.module_imports_loader import (
     DEFAULT_MODULE_IMPORTS_LOADER,
     ModuleImports,
+    _ModuleImportsLoader,
 )
 from pydependence._core.modules_resolver import (
+    CyclesModeEnum,
+    ImportCyclesError,
+    ResolveEngineEnum,
     ScopeNotASubsetError,
     ScopeResolvedImports,
+    _get_import_graph_view,
+    _ImportGraphClosures,
+    _ImportsGraphEdgeData,
 )
 from pydependence._core.modules_scope import (
     DuplicateModuleNamesError,
@@ -56,11 +80,19 @@ from pydependence._core.requirements_map import (
     DEFAULT_REQUIREMENTS_ENV,
     ImportMatcherBase,
     ImportMatcherGlob,
+    ImportMatcherGlobs,
     ImportMatcherScope,
+    MatcherConflict,
     NoConfiguredRequirementMappingError,
     ReqMatcher,
     RequirementsMapper,
 )
+from pydependence._core.requirements_out import (
+    OutMappedRequirement,
+    OutMappedRequirements,
+    OutMappedRequirementSource,
+    extract_base_layer,
+)
 from pydependence._core.utils import load_toml_document, toml_file_replace_array
 
 # ========================================================================= #
@@ -226,6 +258,90 @@ def test_get_module_imports(module_info):
     assert results_2 is results_3
 
 
+def test_get_module_imports_lean(module_info):
+    full = load_imports_from_module_info(module_info)
+    lean = load_imports_from_module_info(module_info, lean=True)
+    assert full.keys() == lean.keys()
+    for target in full:
+        for f, l in zip(full[target], lean[target]):
+            assert (f.target, f.source_name, f.is_lazy, f.lineno) == (
+                l.target,
+                l.source_name,
+                l.is_lazy,
+                l.lineno,
+            )
+            assert (l.col_offset, l.stack_type_names) == (-1, ())
+
+    # equal stacks are shared by imports using the same table, e.g. of a loader
+    table = {}
+    first = load_imports_from_module_info(module_info, stack_type_names_table=table)
+    again = load_imports_from_module_info(module_info, stack_type_names_table=table)
+    assert again["os"][0].stack_type_names is first["os"][0].stack_type_names
+    assert table
+    again = load_imports_from_module_info(module_info)
+    assert again["os"][0].stack_type_names is not first["os"][0].stack_type_names
+
+    # loader mode
+    loader = _ModuleImportsLoader(lean=True)
+    assert loader.load_module_imports(module_info).module_imports == lean
+    assert not loader._stack_type_names_table
+    loader.set_lean(False)
+    assert loader.load_module_imports(module_info).module_imports == full
+    assert loader._stack_type_names_table
+
+    # config mode, applied to the shared loader
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    assert cfg.lean is False
+    cfg.lean = True
+    try:
+        cfg.load_scopes()
+        assert DEFAULT_MODULE_IMPORTS_LOADER.lean
+    finally:
+        DEFAULT_MODULE_IMPORTS_LOADER.set_lean(False)
+
+
+def test_import_info_memory(module_info):
+    import dataclasses
+    import tracemalloc
+
+    # the previous layout of `LocImportInfo`, with a per-instance `__dict__`
+    @dataclasses.dataclass
+    class DictLocImportInfo:
+        target: str
+        source_name: str
+        is_lazy: bool
+        source_module_info: ModuleMetadata
+        source_type: ImportSourceEnum
+        lineno: int
+        col_offset: int
+        stack_type_names: tuple
+        is_relative: bool
+
+    [imp] = load_imports_from_module_info(module_info)["os"]
+    assert not hasattr(imp, "__dict__")
+    kwargs = {f.name: getattr(imp, f.name) for f in dataclasses.fields(imp)}
+
+    def _measure(cls, n=10000):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            items = [cls(**kwargs) for _ in range(n)]
+            return tracemalloc.get_traced_memory()[0] - before, items
+        finally:
+            tracemalloc.stop()
+
+    mem_dict, _ = _measure(DictLocImportInfo)
+    mem_slots, _ = _measure(LocImportInfo)
+    # e.g. python 3.11: ~112 vs ~160 bytes per import, older versions save more
+    assert mem_slots < 0.8 * mem_dict
+
+    # manual imports are also slotted, with defaults
+    manual = ManualImportInfo.from_target("numpy")
+    assert not hasattr(manual, "__dict__")
+    assert manual.is_lazy is False
+    assert manual == ManualImportInfo("numpy", ManualSource("numpy"))
+
+
 # ========================================================================= #
 # TESTS - FIND MODULES                                                      #
 # ========================================================================= #
@@ -545,6 +661,86 @@ def test_resolve_scope():
     }
 
 
+def test_import_graph_cached():
+    scope = ModulesScope()
+    scope.add_modules_from_package_path(PKG_B)
+    scope.add_modules_from_package_path(PKG_C)
+
+    # constructed once
+    graph = scope.get_import_graph()
+    assert scope.get_import_graph() is graph
+    scope.resolve_imports(visit_lazy=False, re_add_lazy=True)
+    scope.resolve_imports(visit_lazy=True)
+    assert scope.get_import_graph() is graph
+
+    # lazy edges are flagged, not filtered
+    edge = _ImportsGraphEdgeData.from_graph_edge(graph, "B.b1", "B.b2")
+    assert edge.all_lazy
+    assert [imp.lineno for imp in edge.imports_lazy] == [2]
+    edge = _ImportsGraphEdgeData.from_graph_edge(graph, "B.b2", "C")
+    assert not edge.all_lazy
+    assert [imp.lineno for imp in edge.imports_eager] == [1]
+    assert [imp.lineno for imp in edge.imports_lazy] == [5]
+
+    # strict view hides lazy only edges
+    strict = _get_import_graph_view(graph, visit_lazy=False)
+    assert _get_import_graph_view(graph, visit_lazy=True) is graph
+    assert graph.has_edge("B.b1", "B.b2")
+    assert not strict.has_edge("B.b1", "B.b2")
+    assert strict.has_edge("B.b2", "C")
+    assert set(strict.nodes) == set(graph.nodes)
+
+    # invalidated on modification
+    scope.add_modules_from_package_path(PKG_D)
+    assert scope.get_import_graph() is not graph
+    assert scope.get_import_graph().has_edge("lazy_D", "extern_D")
+
+
+def test_import_graph_closures():
+    import networkx as nx
+
+    eager = {"imports_eager": ["eager"], "imports_lazy": []}
+    lazy = {"imports_eager": [], "imports_lazy": ["lazy"]}
+
+    # a <-> b -> c -> d ~> e (lazy), e -> a, f
+    g = nx.DiGraph()
+    g.add_edge("a", "b", **eager)
+    g.add_edge("b", "a", **eager)
+    g.add_edge("b", "c", **eager)
+    g.add_edge("c", "d", **eager)
+    g.add_edge("d", "e", **lazy)
+    g.add_edge("e", "a", **eager)
+    g.add_node("f")
+
+    # strict, cycle is condensed
+    closures = _ImportGraphClosures(g, visit_lazy=False)
+    assert closures.num_components == 5
+    assert closures.get_module_closure("a") == ["a", "b", "c", "d"]
+    assert closures.get_module_closure("b") == ["a", "b", "c", "d"]
+    assert closures.get_module_closure("d") == ["d"]
+    assert closures.get_module_closure("e") == ["a", "b", "c", "d", "e"]
+    assert closures.get_module_closure("f") == ["f"]
+    assert closures.get_module_closure("missing") == []
+    assert closures.get_closure(["d", "f", "missing"]) == ["d", "f"]
+
+    # lazy, everything except f is a single cycle
+    closures = _ImportGraphClosures(g, visit_lazy=True)
+    assert closures.num_components == 2
+    assert closures.get_module_closure("d") == ["a", "b", "c", "d", "e"]
+    assert closures.get_closure(["c", "f"]) == ["a", "b", "c", "d", "e", "f"]
+
+    # cached on the scope
+    scope = ModulesScope()
+    scope.add_modules_from_package_path(PKG_B)
+    scope.add_modules_from_package_path(PKG_C)
+    closures = scope.get_import_graph_closures(visit_lazy=False)
+    assert scope.get_import_graph_closures(visit_lazy=False) is closures
+    assert scope.get_import_graph_closures(visit_lazy=True) is not closures
+    assert closures.get_module_closure("B.b2") == ["B.b2", "C", "extern_C"]
+    scope.add_modules_from_package_path(PKG_D)
+    assert scope.get_import_graph_closures(visit_lazy=False) is not closures
+
+
 def test_resolve_across_scopes():
     scope_all = ModulesScope()
     scope_all.add_modules_from_package_path(
@@ -779,6 +975,532 @@ def test_resolve_across_scopes():
     }
 
 
+def test_resolve_engines_identical():
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    start_scopes = [
+        None,
+        scope_all.get_restricted_scope(imports=["A"]),
+        scope_all.get_restricted_scope(imports=["B"]),
+        scope_all.get_restricted_scope(imports=["B.b1"]),
+        scope_all.get_restricted_scope(imports=["C"]),
+    ]
+
+    # per-node import bundles
+    index = scope_all.get_import_graph_index()
+    assert scope_all.get_import_graph_index() is index
+    [b2] = index.get_node_ids(["B.b2"])
+    assert index.get_modules([b2]) == ["B.b2"]
+    assert index.get_node_ids(["B.b2", "missing"]) == [b2]
+    assert index.get_modules(index.bfs([b2], visit_lazy=False)) == [
+        "B.b2",
+        "C",
+        "extern_C",
+    ]
+    imports = index.collect_imports([b2], visit_lazy=False, re_add_lazy=False)
+    assert [(imp.target, imp.lineno) for imp in imports] == [("C", 1)]
+    imports = index.collect_imports([b2], visit_lazy=False, re_add_lazy=True)
+    assert sorted((imp.target, imp.lineno) for imp in imports) == [
+        ("C", 1),
+        ("C", 5),
+        ("extern_b2", 6),
+    ]
+
+    # engines produce identical results
+    for start_scope in start_scopes:
+        for visit_lazy, re_add_lazy in [(True, False), (False, False), (False, True)]:
+            kwargs = dict(
+                scope=scope_all,
+                start_scope=start_scope,
+                visit_lazy=visit_lazy,
+                re_add_lazy=re_add_lazy,
+            )
+            bfs = ScopeResolvedImports.from_scope(**kwargs)
+            closures = ScopeResolvedImports.from_scope(
+                **kwargs, engine=ResolveEngineEnum.closures
+            )
+            assert bfs._visited == closures._visited
+            assert sorted(bfs.get_imports(), key=repr) == sorted(
+                closures.get_imports(), key=repr
+            )
+            assert (
+                bfs.get_filtered()._get_targets_sources_counts()
+                == closures.get_filtered()._get_targets_sources_counts()
+            )
+
+    with pytest.raises(ValueError):
+        ScopeResolvedImports.from_scope(scope=scope_all, engine="invalid")
+
+
+def test_resolve_memoized():
+    scope = ModulesScope()
+    scope.add_modules_from_package_path(PKG_B)
+    scope.add_modules_from_package_path(PKG_C)
+    start_b1 = scope.get_restricted_scope(imports=["B.b1"])
+
+    # shared between identical start scopes & flags
+    r = scope.get_resolved_scope_imports(start_b1, visit_lazy=False)
+    assert scope.get_resolved_scope_imports(start_b1, visit_lazy=False) is r
+    assert scope.get_resolved_scope_imports(start_b1, visit_lazy=True) is not r
+    assert scope.get_resolved_scope_imports(None) is scope.get_resolved_scope_imports(
+        scope
+    )
+    assert (
+        scope.get_resolved_scope_imports(
+            start_b1, visit_lazy=False, engine=ResolveEngineEnum.closures
+        )
+        is r
+    )
+    [r0, r1] = ScopeResolvedImports.from_scopes_memoized(
+        scope, [start_b1, start_b1], visit_lazy=False
+    )
+    assert r0 is r1 is r
+
+    # filtered results are still computed per call
+    imports = scope.resolve_imports(start_scope=start_b1, visit_lazy=False)
+    assert imports == scope.resolve_imports(start_scope=start_b1, visit_lazy=False)
+    assert imports is not scope.resolve_imports(start_scope=start_b1, visit_lazy=False)
+
+    # invalidated when the scope is modified
+    scope.add_modules_from_package_path(PKG_D)
+    r2 = scope.get_resolved_scope_imports(start_b1, visit_lazy=False)
+    assert r2 is not r
+
+    # invalidated when the start scope is modified
+    start_b1.add_modules_from_package_path(PKG_D)
+    r3 = scope.get_resolved_scope_imports(start_b1, visit_lazy=False)
+    assert r3 is not r2
+    assert "lazy_D" in r3._visited and "lazy_D" not in r2._visited
+
+
+def test_resolve_streaming():
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    start_scope = scope_all.get_restricted_scope(imports=["B"])
+
+    # lazy iterators, with the list api wrapping them
+    imports = scope_all.iter_resolved_imports(start_scope=start_scope)
+    assert not isinstance(imports, list)
+    assert list(imports) == scope_all.resolve_imports(start_scope=start_scope)
+
+    # resolved imports reference the index bundles instead of copying them
+    resolved = ScopeResolvedImports.from_scope(scope_all, start_scope=start_scope)
+    index = scope_all.get_import_graph_index()
+    [b2] = index.get_node_ids(["B.b2"])
+    assert any(bundle is index._imports_eager[b2] for bundle in resolved._imports)
+    assert list(resolved.iter_imports()) == resolved.get_imports()
+    assert (
+        list(resolved.iter_filtered())
+        == resolved.get_filtered().get_imports()
+        == scope_all.resolve_imports(start_scope=start_scope)
+    )
+
+
+def test_resolve_aggregated():
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+
+    def _agg(imports):
+        r = {}
+        for imp in imports:
+            eager, count = r.get((imp.source_name, imp.target), (False, 0))
+            r[(imp.source_name, imp.target)] = (eager or not imp.is_lazy, count + 1)
+        return r
+
+    # one record per (source, target), with the same laziness and counts
+    for visit_lazy, re_add_lazy in [(True, False), (False, False), (False, True)]:
+        kwargs = dict(scope=scope_all, visit_lazy=visit_lazy, re_add_lazy=re_add_lazy)
+        full = ScopeResolvedImports.from_scope(**kwargs).get_imports()
+        aggs = ScopeResolvedImports.from_scope(**kwargs, aggregate=True).get_imports()
+        assert all(isinstance(agg, AggImportInfo) for agg in aggs)
+        assert len(aggs) == len(_agg(full)) <= len(full)
+        assert _agg(full) == {
+            (agg.source_name, agg.target): (agg.any_eager, agg.count) for agg in aggs
+        }
+        for agg in aggs:
+            assert agg.is_lazy == (not agg.any_eager)
+            assert sorted(agg.iter_imports(), key=repr) == sorted(
+                [
+                    imp
+                    for imp in full
+                    if (imp.source_name, imp.target) == (agg.source_name, agg.target)
+                ],
+                key=repr,
+            )
+
+    # locations are capped & sorted
+    edge = _ImportsGraphEdgeData.from_graph_edge(
+        scope_all.get_import_graph(), "B.b2", "C"
+    )
+    agg = AggImportInfo.from_imports(edge.imports, max_locations=1)
+    assert (agg.num_eager, agg.num_lazy, agg.count) == (1, 1, 2)
+    assert [imp.lineno for imp in agg.locations] == [1]
+    assert [imp.lineno for imp in agg.iter_imports()] == [1, 5]
+    with pytest.raises(ValueError):
+        AggImportInfo.from_imports([])
+
+
+def test_resolve_filter_builtin_submodules():
+    assert is_builtin_module_name("os")
+    assert is_builtin_module_name("os.path")
+    assert is_builtin_module_name("json.not_a_listed_submodule")
+    assert not is_builtin_module_name("osx")
+    assert not is_builtin_module_name("extern_json.json")
+
+    scope = ModulesScope().add_modules_from_package_path(PKG_C)
+    imports = [
+        ManualImportInfo.from_target(target)
+        for target in ["json.not_a_listed_submodule", "json", "C", "extern", "C"]
+    ]
+    resolved = ScopeResolvedImports(scope, scope, imports=[imports], visited=set())
+    for columnar in [False, True]:
+        kwargs = dict(exclude_unvisited=False, columnar=columnar)
+        assert [imp.target for imp in resolved.iter_filtered(**kwargs)] == ["extern"]
+        assert [
+            imp.target
+            for imp in resolved.iter_filtered(**kwargs, exclude_in_search_space=False)
+        ] == ["C", "extern", "C"]
+        assert [
+            imp.target
+            for imp in resolved.iter_filtered(**kwargs, exclude_builtins=False)
+        ] == ["json.not_a_listed_submodule", "json", "extern"]
+
+
+def test_resolve_columnar():
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    start_scope = scope_all.get_restricted_scope(imports=["B"])
+    for visit_lazy in [True, False]:
+        resolved = ScopeResolvedImports.from_scope(
+            scope_all, start_scope=start_scope, visit_lazy=visit_lazy
+        )
+        table = resolved.get_table()
+        assert resolved.get_table() is table
+        assert len(table) == len(resolved.get_imports())
+        assert [table.strings[i] for i in table.target] == [
+            imp.target for imp in resolved.get_imports()
+        ]
+        assert [bool(x) for x in table.is_lazy] == [
+            imp.is_lazy for imp in resolved.get_imports()
+        ]
+        assert [table.get_source_type(i) for i in range(len(table))] == [
+            imp.source_type for imp in resolved.get_imports()
+        ]
+        # masks are identical to the per-import filters
+        for flags in itertools.product([True, False], repeat=3):
+            kwargs = dict(
+                zip(
+                    [
+                        "exclude_unvisited",
+                        "exclude_in_search_space",
+                        "exclude_builtins",
+                    ],
+                    flags,
+                )
+            )
+            mask = resolved.get_filter_mask(**kwargs)
+            assert list(table.iter_masked_rows(mask)) == list(
+                resolved.iter_filtered(**kwargs)
+            )
+        assert list(resolved.iter_filtered(columnar=True)) == list(
+            resolved.iter_filtered()
+        )
+
+    # grouping is identical to the nested dicts
+    mapper = RequirementsMapper(
+        env_matchers={
+            "default": [
+                ReqMatcher(
+                    "extern", ImportMatcherGlobs("extern_C,extern_b1,extern_b2")
+                ),
+            ]
+        }
+    )
+    resolved = ScopeResolvedImports.from_scope(scope_all, start_scope=start_scope)
+    table = resolved.get_table()
+    mask = resolved.get_filter_mask(exclude_in_search_space=False)
+    imports = list(table.iter_masked_rows(mask))
+    expected = mapper.generate_output_requirements(imports, strict=False)
+    result = mapper.generate_mapped_requirements_from_table(table, mask, strict=False)
+    assert result.to_output_requirements() == expected
+    assert [r.requirement for r in expected.requirements] == [
+        "B",
+        "C",
+        "extern",
+        "extern_D",
+        "lazy_D",
+        "lazy_E",
+    ]
+    with pytest.raises(NoConfiguredRequirementMappingError):
+        mapper.generate_mapped_requirements_from_table(table, mask, strict=True)
+    # - extra imports are appended to the groups
+    manual = [ManualImportInfo.from_target("extern_C")]
+    expected = mapper.generate_output_requirements(imports + manual, strict=False)
+    result = mapper.generate_mapped_requirements_from_table(
+        table, mask, imports=manual, strict=False
+    )
+    assert result.to_output_requirements() == expected
+
+    # the config can enable the columnar tables for all resolvers, with the same outputs
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    cfg.resolvers[1].raw = ["asdf", "extern-C", "pre-commit"]
+    loaded_scopes = cfg.load_scopes()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = cfg.generate_all_requirements(loaded_scopes)
+        cfg.columnar = True
+        assert cfg.generate_all_requirements(loaded_scopes) == expected
+
+
+def test_import_chains():
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    scope_b1 = scope_all.get_restricted_scope(imports=["B.b1"])
+
+    def _steps(chain):
+        return [(imp.source_name, imp.target, imp.lineno) for imp in chain]
+
+    # eager chains, shared BFS tree
+    chains = scope_all.get_import_chains(visit_lazy=False)
+    assert scope_all.get_import_chains(visit_lazy=False) is chains
+    assert _steps(chains.get_shortest_chain("extern_D")) == [("lazy_D", "extern_D", 1)]
+    assert chains.get_shortest_chain("lazy_D") == []  # in the start scope
+    assert chains.get_shortest_chain("THIS_DOES_NOT_EXIST") is None
+    assert [_steps(c) for c in chains.get_shortest_chains("extern_a2", k=3)] == [
+        [("A.a2", "extern_a2", 2)],
+        [("A.a1", "A.a2", 1), ("A.a2", "extern_a2", 2)],
+    ]
+
+    # lazy chains from a start scope
+    chains = scope_all.get_import_chains(scope_b1, visit_lazy=True)
+    assert _steps(chains.get_shortest_chain("extern_D")) == [
+        ("B.b1", "B.b2", 2),
+        ("B.b2", "C", 1),
+        ("C", "lazy_D", 5),
+        ("lazy_D", "extern_D", 1),
+    ]
+    chains = scope_all.get_import_chains(scope_b1, visit_lazy=False)
+    assert chains.get_shortest_chain("extern_D") is None
+    assert chains.get_shortest_chain("extern_b1") is None
+    chains = scope_all.get_import_chains(scope_b1, visit_lazy=False, re_add_lazy=True)
+    assert chains.get_shortest_chain("extern_D") is None
+    assert _steps(chains.get_shortest_chain("extern_b1")) == [("B.b1", "extern_b1", 3)]
+    assert chains.get_shortest_chains("extern_b1", k=2) == [
+        chains.get_shortest_chain("extern_b1")
+    ]
+
+    # requirements are matched through the versions of the config
+    report = pydeps_why(
+        config_path=PKGS_ROOT_PYPROJECT, requirements=["asdf"], resolver="B1-all"
+    )
+    assert report == "[why] 'asdf' in resolver 'B1-all': not required"
+    report = pydeps_why(config_path=PKGS_ROOT_PYPROJECT, requirements=["asdf"])
+    assert "  extern_a3i [1/1]:" in report.splitlines()
+    with pytest.raises(ValueError):
+        pydeps_why(
+            config_path=PKGS_ROOT_PYPROJECT, requirements=["asdf"], resolver="N/A"
+        )
+
+
+def test_import_chains_lazy_middle(tmp_path):
+    pkg = tmp_path / "why"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "a.py").write_text("import why.b\n")
+    (pkg / "b.py").write_text(
+        "def f():\n    import why.c\n\ndef g():\n    import extern_last\n"
+    )
+    (pkg / "c.py").write_text("import extern_mid\n")
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.pydependence]\n"
+        "versions = ['mid', {requirement='last', import='extern_last'}]\n"
+        "scopes = [\n"
+        "    {name='why', pkg_paths='why'},\n"
+        "    {name='why-a', parents=['why'], limit='why.a'},\n"
+        "]\n"
+        "resolvers = [\n"
+        "    {output_mode='optional-dependencies', output_name='lazy', scope='why', start_scope='why-a', visit_lazy=true},\n"
+        "]\n"
+    )
+    # the resolver visits `why.c` through the lazy import in the middle, but chains
+    # only end with a lazy import, never pass through one
+    report = pydeps_why(
+        config_path=tmp_path / "pyproject.toml", requirements=["extern_mid", "last"]
+    )
+    assert report.splitlines() == [
+        "[why] 'extern_mid' in resolver 'lazy':",
+        "  extern_mid: only reached through lazy imports",
+        "[why] 'last' in resolver 'lazy':",
+        "  extern_last [1/1]:",
+        f"    why.a → why.b  ({pkg / 'a.py'}:1)",
+        f"    why.b → extern_last [L]  ({pkg / 'b.py'}:5)",
+    ]
+
+
+def test_import_cycles(tmp_path):
+    pkg = tmp_path / "cyc"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "a.py").write_text("import cyc.b\nimport extern_a\n")
+    (pkg / "b.py").write_text("import os\nimport cyc.c\n")
+    (pkg / "c.py").write_text("import cyc.a\n")
+    (pkg / "d.py").write_text("import cyc.d\n")
+    (pkg / "e.py").write_text("import cyc.f\n")
+    (pkg / "f.py").write_text("def fn():\n    import cyc.e\n")
+    scope = ModulesScope().add_modules_from_package_path(pkg, tag="cycles")
+
+    def _summary(cycles):
+        return [
+            (
+                c.size,
+                c.modules,
+                [(i.source_name, i.target, i.lineno) for i in c.imports],
+            )
+            for c in cycles
+        ]
+
+    # eager cycles, including self imports, largest first
+    assert _summary(scope.get_import_cycles()) == [
+        (
+            3,
+            ("cyc.a", "cyc.b", "cyc.c"),
+            [("cyc.a", "cyc.b", 1), ("cyc.b", "cyc.c", 2), ("cyc.c", "cyc.a", 1)],
+        ),
+        (1, ("cyc.d",), [("cyc.d", "cyc.d", 1)]),
+    ]
+    # lazy cycles
+    assert _summary(scope.get_import_cycles(visit_lazy=True))[1] == (
+        2,
+        ("cyc.e", "cyc.f"),
+        [("cyc.e", "cyc.f", 1), ("cyc.f", "cyc.e", 2)],
+    )
+
+    # checks only report new cycles
+    cfg = PydependenceCfg.model_validate(
+        {
+            "scopes": [
+                {"name": "cyc", "pkg_paths": [str(pkg)], "cycles_mode": "error"},
+            ],
+        }
+    )
+    cfg.apply_defaults(config_path=tmp_path / "pyproject.toml")
+    loaded_scopes = cfg.load_scopes()
+    with pytest.raises(ImportCyclesError, match="size 3: cyc.a, cyc.b, cyc.c"):
+        cfg.check_import_cycles(loaded_scopes)
+    # - cycles that shrink are allowed, but not cycles that grow
+    cfg.scopes[0].allowed_cycles = [["cyc.a", "cyc.b"], ["cyc.d"]]
+    with pytest.raises(ImportCyclesError):
+        cfg.check_import_cycles(loaded_scopes)
+    cfg.scopes[0].allowed_cycles = [["cyc.a", "cyc.b", "cyc.c", "cyc.x"], ["cyc.d"]]
+    assert cfg.check_import_cycles(loaded_scopes) == {"cyc": []}
+    # - warnings
+    cfg.scopes[0].allowed_cycles = []
+    cfg.scopes[0].cycles_mode = CyclesModeEnum.warn
+    with pytest.warns(UserWarning, match="2 import cycle"):
+        assert len(cfg.check_import_cycles(loaded_scopes)["cyc"]) == 2
+    cfg.scopes[0].cycles_mode = CyclesModeEnum.ignore
+    assert cfg.check_import_cycles(loaded_scopes) == {}
+
+
+def test_patch_modules(tmp_path):
+    import shutil
+
+    shutil.copytree(PKG_B, tmp_path / "B")
+    shutil.copy(PKG_C, tmp_path / "C.py")
+    shutil.copy(PKG_D, tmp_path / "lazy_D.py")
+
+    def _fresh_scope():
+        return ModulesScope().add_modules_from_search_path(tmp_path, tag="incremental")
+
+    def _counts(imports):
+        return sorted((imp.source_name, imp.target, imp.lineno) for imp in imports)
+
+    scope = _fresh_scope()
+    # closure tables are patched in place
+    closures = {v: scope.get_import_graph_closures(visit_lazy=v) for v in (0, 1)}
+
+    def _check():
+        fresh = _fresh_scope()
+        for visit_lazy, table in closures.items():
+            assert scope.get_import_graph_closures(visit_lazy=visit_lazy) is table
+            fresh_table = fresh.get_import_graph_closures(visit_lazy=visit_lazy)
+            assert sorted(table.get_components()) == sorted(
+                fresh_table.get_components()
+            )
+            assert table.num_components == fresh_table.num_components
+            for node in fresh.get_import_graph().nodes:
+                assert sorted(table.get_module_closure(node)) == sorted(
+                    fresh_table.get_module_closure(node)
+                )
+
+        # resolves of the patched scope match resolves of a fresh scope
+        def _resolve(s, start, visit_lazy):
+            start_scope = None if start is None else s.get_restricted_scope(start)
+            return _counts(
+                s.resolve_imports(start_scope=start_scope, visit_lazy=visit_lazy)
+            )
+
+        for start, visit_lazy in [
+            (None, True),
+            (None, False),
+            (["B.b1"], True),
+            (["C"], True),
+            (["C"], False),
+        ]:
+            if start is None or all(map(scope.has_module, start)):
+                assert _resolve(scope, start, visit_lazy) == _resolve(
+                    fresh, start, visit_lazy
+                )
+
+    _check()
+
+    # modified, C lazily imports D
+    with open(tmp_path / "lazy_D.py", "a") as fp:
+        fp.write("\nimport extern_new\n")
+    graph = scope.get_import_graph()
+    assert scope.patch_modules(modified=["lazy_D"]) == {
+        "lazy_D",
+        "extern_D",
+        "lazy_E",
+        "extern_new",
+    }
+    assert scope.get_import_graph() is graph
+    assert graph.has_edge("lazy_D", "extern_new")
+    _check()
+
+    # added
+    (tmp_path / "B" / "b3.py").write_text("import extern_b3\n")
+    added = ModuleMetadata.from_root_and_subpath(
+        tmp_path, tmp_path / "B" / "b3.py", tag="incremental"
+    )
+    assert scope.patch_modules(added=[added]) == {"B.b3", "extern_b3"}
+    assert scope._module_graph.has_edge("B", "B.b3")
+    _check()
+
+    # modified, creating a lazy cycle: B.b1 -> B.b2 -> C -> lazy_D -> B.b1
+    with open(tmp_path / "lazy_D.py", "a") as fp:
+        fp.write("\nimport B.b1\n")
+    scope.patch_modules(modified=["lazy_D"])
+    assert ["B.b1", "B.b2", "C", "lazy_D"] in closures[1].get_components()
+    _check()
+
+    # removed, imports of C are now external
+    (tmp_path / "C.py").unlink()
+    assert "C" in scope.patch_modules(removed=["C"])
+    assert not scope.has_module("C")
+    _check()
+
+    with pytest.raises(ValueError):
+        scope.patch_modules(removed=["C"])
+    with pytest.raises(DuplicateModuleNamesError):
+        scope.patch_modules(added=[added])
+
+
 # ========================================================================= #
 # TESTS - REQUIREMENT REPLACEMENT                                           #
 # ========================================================================= #
@@ -804,6 +1526,20 @@ def test_import_matchers():
     assert not matcher_scope.match("B")
     for module in scope_b.iter_modules():
         assert not matcher_scope.match(module)
+    # - snapshot of the scope, with a stable description
+    scope_ab = ModulesScope()
+    scope_ab.add_modules_from_scope(scope_a)
+    matcher_scope = ImportMatcherScope(scope=scope_ab)
+    scope_ab.add_modules_from_scope(scope_b)
+    assert scope_ab.has_module("B")
+    assert not matcher_scope.match("B")
+    assert matcher_scope.modules == frozenset(scope_a.iter_modules())
+    assert matcher_scope.scope is scope_ab
+    assert matcher_scope.cfg_str() == ImportMatcherScope(scope=scope_a).cfg_str()
+    assert matcher_scope.cfg_str().startswith(
+        f"scope=<{len(matcher_scope.modules)} modules: "
+    )
+    assert ImportMatcherScope(scope_a, name="A").cfg_str() == "scope='A'"
 
     # GLOB
     matcher_glob = ImportMatcherGlob("A.*")
@@ -848,6 +1584,18 @@ def test_import_matchers():
     with pytest.raises(ValueError):
         ImportMatcherGlob("asdf-fdsa")
 
+    # GLOBS, compiled into a trie, identical to matching each glob
+    globs = ["A.a1.*", "A.a2", "B.*", "C", "C.c1.c2", "D.*", "D.d1.*", "A.a2"]
+    matcher_globs = ImportMatcherGlobs(",".join(globs))
+    assert len(matcher_globs.matchers) == 7
+    for import_ in [
+        *["A", "A.a1", "A.a1.asdf", "A.a2", "A.a2.asdf", "A.a3", "AA", "A.a11"],
+        *["B", "B.b1", "Bb", "C", "C.c1", "C.c1.c2", "C.c1.c2.c3", "D.d1.d2"],
+        *["E", "E.A", "a1", "c1.c2"],
+    ]:
+        expected = any(ImportMatcherGlob(g).match(import_) for g in globs)
+        assert matcher_globs.match(import_) == expected, import_
+
 
 def test_requirement_mapping():
     scope_all = ModulesScope().add_modules_from_search_path(
@@ -938,6 +1686,211 @@ def mapper():
     )
 
 
+def test_requirement_mapping_memo():
+    env_matchers = {
+        "default": [ReqMatcher("glob_a", ImportMatcherGlob("A.*"))],
+        "alt": [ReqMatcher("alt_a1", ImportMatcherGlob("A.a1"))],
+    }
+    mapper = RequirementsMapper(env_matchers=env_matchers)
+    other = RequirementsMapper(env_matchers=env_matchers)
+
+    # memo is owned by each mapper, and only matches are memoized
+    assert mapper.map_import_to_requirement("A.a1") == "glob_a"
+    assert mapper.map_import_to_requirement("A.a1") == "glob_a"
+    assert mapper.map_import_to_requirement("A.a1", requirements_env="alt") == "alt_a1"
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="could not find a matching requirement"):
+            assert mapper.map_import_to_requirement("B.b1") == "B"
+        with pytest.raises(NoConfiguredRequirementMappingError):
+            mapper.map_import_to_requirement("B.b1", strict=True)
+    assert mapper.get_memo_stats() == (4, 3, 3, None)
+    assert other.get_memo_stats() == (0, 0, 0, None)
+    # - matcher hits include memoized results
+    assert [(env, rm.requirement, n) for env, rm, n in mapper.get_matcher_hits()] == [
+        ("default", "glob_a", 2),
+        ("alt", "alt_a1", 1),
+    ]
+    mapper.clear_memo()
+    assert mapper.get_memo_stats() == (0, 0, 0, None)
+
+    # bounded memo, oldest entries are evicted
+    mapper = RequirementsMapper(env_matchers=env_matchers, memo_size=2)
+    for import_ in ["A", "A.a1", "A.a2", "A.a2", "A"]:
+        assert mapper.map_import_to_requirement(import_) == "glob_a"
+    assert mapper.get_memo_stats() == (1, 4, 2, 2)
+
+    # batches of targets are mapped once each
+    results = mapper.map_imports(["A.a1", "A", "A.a1"], "alt")
+    assert {k: v.requirement for k, v in results.items()} == {
+        "A.a1": "alt_a1",
+        "A": "glob_a",
+    }
+    with pytest.raises(NoConfiguredRequirementMappingError) as e:
+        mapper.map_imports(["A.a1", "B.b1", "C", "B.b1"], strict=True)
+    assert e.value.imports == {"B.b1", "C"}
+
+    # generating requirements maps each unique target once, including builtins
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    imports = scope_all.resolve_imports(exclude_builtins=False) * 3
+    targets = {imp.target for imp in imports}
+    assert any(is_builtin_module_name(t) for t in targets)
+    mapper = RequirementsMapper(env_matchers=env_matchers)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        mapped = mapper.generate_mapped_requirements(imports)
+    stats = mapper.get_memo_stats()
+    assert stats.hits == 0
+    assert stats.misses == len({t for t in targets if not is_builtin_module_name(t)})
+    assert sum(
+        len(src.source_module_imports)
+        for req in mapped.requirements.values()
+        for src in req.sources.values()
+    ) == len(imports)
+    assert mapped.requirements["os"].sources["t_ast_parser"].source_module_imports
+    # - strict errors are aggregated across all imports
+    with pytest.raises(NoConfiguredRequirementMappingError) as e:
+        mapper.generate_mapped_requirements(imports, strict=True)
+    assert e.value.imports == {
+        t for t in targets if not (t.startswith("A") or is_builtin_module_name(t))
+    }
+
+
+def test_requirement_mapping_envs():
+    env_matchers = {
+        "default": [ReqMatcher("glob_a", ImportMatcherGlob("A.*"))],
+        "alt": [ReqMatcher("alt_a2", ImportMatcherGlob("A.a2"))],
+        "same": [ReqMatcher("glob_a", ImportMatcherGlob("A.a2"))],
+        "fix": [ReqMatcher("fix_b", ImportMatcherGlob("B.*"))],
+    }
+    scope_all = ModulesScope().add_modules_from_search_path(
+        PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
+    )
+    imports = scope_all.resolve_imports(
+        exclude_in_search_space=False, exclude_builtins=False
+    )
+    envs = ["default", "alt", "same"]
+
+    # single pass over the imports gives the same results as each env separately
+    mapper = RequirementsMapper(env_matchers=env_matchers)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        results = mapper.generate_mapped_requirements_envs(
+            iter(imports), requirements_envs=[None, *envs], resolver_name="r"
+        )
+        expected = {
+            env: mapper.generate_mapped_requirements(
+                imports, requirements_env=env, resolver_name="r"
+            )
+            for env in envs
+        }
+    assert list(results) == envs
+    for env in envs:
+        assert (
+            results[env].to_output_requirements()
+            == expected[env].to_output_requirements()
+        )
+    # - unaffected requirements are shared with the default env
+    assert "alt_a2" in results["alt"].requirements
+    assert results["same"].requirements == results["default"].requirements
+    for req in ["os", "glob_a"]:
+        assert results["same"].requirements[req] is results["default"].requirements[req]
+    assert results["alt"].requirements["os"] is results["default"].requirements["os"]
+    assert (
+        results["alt"].requirements["glob_a"]
+        != results["default"].requirements["glob_a"]
+    )
+
+    # strict errors are only raised for envs that do not override the import
+    with pytest.raises(ValueError, match="has not been defined"):
+        mapper.generate_mapped_requirements_envs(imports, requirements_envs=["nope"])
+    imports = [
+        imp
+        for imp in imports
+        if imp.target.split(".")[0] in ("A", "B") or is_builtin_module_name(imp.target)
+    ]
+    results = mapper.generate_mapped_requirements_envs(
+        imports, requirements_envs=["fix"], strict=True
+    )
+    assert {"glob_a", "fix_b"} <= set(results["fix"].requirements)
+    with pytest.raises(NoConfiguredRequirementMappingError):
+        mapper.generate_mapped_requirements_envs(
+            imports, requirements_envs=["fix", "alt"], strict=True
+        )
+
+
+def test_requirement_mapping_compiled():
+    scope_a = ModulesScope().add_modules_from_package_path(
+        PKG_A, unreachable_mode=UnreachableModeEnum.keep
+    )
+    scope_b = ModulesScope().add_modules_from_package_path(PKG_B)
+
+    class _Custom(ImportMatcherBase):
+        def match(self, import_: str) -> bool:
+            return import_.endswith("_custom")
+
+        def cfg_str(self) -> str:
+            return "custom"
+
+    env_matchers = {
+        "default": [
+            ReqMatcher("glob_b1", ImportMatcherGlobs("B.b1.*")),
+            ReqMatcher("scope_b", ImportMatcherScope(scope_b)),
+            ReqMatcher("custom", _Custom()),
+            ReqMatcher("glob_b", ImportMatcherGlobs("B.*,extern_custom")),
+            ReqMatcher("scope_a", ImportMatcherScope(scope_a)),
+            ReqMatcher("glob_a", ImportMatcherGlob("A.*")),
+            ReqMatcher("glob_a1", ImportMatcherGlobs("A.a1,A.a9")),
+        ],
+        "alt": [
+            ReqMatcher("alt_b", ImportMatcherGlob("B")),
+            ReqMatcher("alt_a2", ImportMatcherGlob("A.a2.*")),
+        ],
+    }
+    mapper = RequirementsMapper(env_matchers=env_matchers)
+
+    # first match wins, identical to checking each matcher in order
+    def _linear(import_, env):
+        for rm in [*env_matchers.get(env, []), *env_matchers["default"]]:
+            if rm.matcher.match(import_):
+                return rm.requirement
+        return import_.split(".")[0]
+
+    imports = [
+        *["A", "A.a1", "A.a2", "A.a2.x", "A.a9", "A.a9.x", "A.x"],
+        *["B", "B.b1", "B.b1.x", "B.b2", "B.x", "extern_custom", "x_custom", "x"],
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for env in ["default", "alt"]:
+            for import_ in imports:
+                result = mapper.map_import_to_requirement(import_, requirements_env=env)
+                assert result == _linear(import_, env), (env, import_)
+
+    # shadowed matchers are reported, but not overrides of the default env
+    conflicts = {
+        (c.requirements_env, c.requirement, c.matcher, c.shadowed_by)
+        for c in mapper.get_matcher_conflicts()
+    }
+    assert conflicts == {
+        ("default", "glob_a1", "import='A.a1'", ("scope_a",)),
+        ("default", "glob_a1", "import='A.a9'", ("glob_a",)),
+    }
+    # - fully shadowed scopes
+    mapper = RequirementsMapper(
+        env_matchers=[
+            ReqMatcher("glob_a", ImportMatcherGlob("A.*")),
+            ReqMatcher("scope_a", ImportMatcherScope(scope_a)),
+        ]
+    )
+    assert mapper.get_matcher_conflicts() == [
+        MatcherConflict(
+            "default", "scope_a", ImportMatcherScope(scope_a).cfg_str(), ("glob_a",)
+        )
+    ]
+
+
 def test_requirements_list_generation(mapper: RequirementsMapper):
     scope_all = ModulesScope().add_modules_from_search_path(
         PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
@@ -1181,6 +2134,303 @@ def test_requirements_txt_gen(mapper: RequirementsMapper):
     )
 
 
+def test_lockfile_pinned_requirements(tmp_path):
+    # pip-compile style
+    (tmp_path / "requirements.lock").write_text(
+        "--index-url https://pypi.org/simple\n"
+        "foo==1.0 \\\n"
+        "    --hash=sha256:bb \\\n"
+        "    --hash=sha256:aa\n"
+        "    # via -r requirements.in\n"
+        "Bar_Baz==2.1 ; python_version >= '3.8'  # pinned\n"
+    )
+    # uv.lock, with two locked versions of `multi`
+    (tmp_path / "uv.lock").write_text(
+        "version = 1\n"
+        "[[package]]\n"
+        'name = "foo"\n'
+        'version = "1.0"\n'
+        'sdist = { url = "https://x/foo-1.0.tar.gz", hash = "sha256:aa" }\n'
+        'wheels = [{ url = "https://x/foo-1.0.whl", hash = "sha256:bb" }]\n'
+        "[[package]]\n"
+        'name = "proj"\n'
+        'source = { editable = "." }\n'
+        "[[package]]\n"
+        'name = "multi"\n'
+        'version = "1.0"\n'
+        'wheels = [{ url = "https://x/multi-1.0.whl", hash = "sha256:m1" }]\n'
+        "[[package]]\n"
+        'name = "multi"\n'
+        'version = "2.0"\n'
+        'wheels = [{ url = "https://x/multi-2.0.whl", hash = "sha256:m2" }]\n'
+    )
+    # poetry.lock, old style with metadata files
+    (tmp_path / "poetry.lock").write_text(
+        "[[package]]\n"
+        'name = "Foo"\n'
+        'version = "1.0"\n'
+        "[metadata.files]\n"
+        'foo = [{file = "foo-1.0.whl", hash = "sha256:aa"}, {file = "foo-1.0.tar.gz", hash = "sha256:bb"}]\n'
+    )
+
+    txt = Lockfile.from_file(tmp_path / "requirements.lock")
+    uv = Lockfile.from_file(tmp_path / "uv.lock")
+    poetry = Lockfile.from_file(tmp_path / "poetry.lock")
+    assert len(txt) == 2 and len(uv) == 2 and len(poetry) == 1
+    assert "bar-baz" in txt and "proj" not in uv
+    for lock in [txt, uv, poetry]:
+        assert lock.get_packages("foo")[0].hashes == ("sha256:aa", "sha256:bb")
+        assert lock.pin("foo[x]>=1; os_name == 'posix'").requirement == (
+            'foo[x]==1.0; os_name == "posix"'
+        )
+
+    # errors
+    with pytest.raises(LockfileError, match="not locked"):
+        uv.pin("missing")
+    with pytest.raises(LockfileError, match="satisfies"):
+        uv.pin("foo>1")
+    with pytest.raises(LockfileError, match="multiple locked versions"):
+        uv.pin("multi")
+    assert uv.pin("multi<2").requirement == "multi==1.0"
+    with pytest.raises(LockfileError, match="no hashes"):
+        txt.pin("bar-baz")
+    assert txt.pin("bar-baz", hashes=False).requirement == "bar-baz==2.1"
+    (tmp_path / "bad.txt").write_text("foo>=1\n")
+    with pytest.raises(LockfileError, match="not pinned"):
+        Lockfile.from_file(tmp_path / "bad.txt")
+    # - url, vcs & path requirements are skipped
+    (tmp_path / "direct.txt").write_text(
+        "foo==1.0\n"
+        "git+https://github.com/org/vcs.git@abc123#egg=vcs\n"
+        "wheel @ https://x/wheel-1.0-py3-none-any.whl\n"
+        "https://x/archive-1.0.tar.gz --hash=sha256:ar\n"
+        "./local/path\n"
+    )
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        direct = Lockfile.from_file(tmp_path / "direct.txt")
+    assert len(direct) == 1 and "foo" in direct
+    assert len([x for x in w if "cannot be pinned" in str(x.message)]) == 4
+    with pytest.raises(LockfileError, match="not locked"):
+        direct.pin("wheel")
+
+    # output
+    mapped = OutMappedRequirements(
+        requirements=[
+            OutMappedRequirement(
+                requirement="foo",
+                sources=[OutMappedRequirementSource("A.a1", True, False)],
+            ),
+        ],
+    )
+    assert mapped.as_requirements_txt(notice=False, lockfile=uv) == (
+        "foo==1.0 \\\n"
+        "    --hash=sha256:aa \\\n"
+        "    --hash=sha256:bb # [L]\n"
+        "    # ← [L] A.a1\n"
+    )
+    assert mapped.as_requirements_txt(
+        notice=False, sources=False, lockfile=uv, hashes=False
+    ) == ("foo==1.0 # [L]\n")
+
+    # missing lock files
+    with pytest.raises(LockfileError, match="could not read"):
+        load_lockfile(tmp_path / "missing.lock")
+
+
+def test_lockfile_pinned_closure(tmp_path):
+    # uv.lock, `app` depends on `lib` & `win` on windows, `lib[fast]` adds `speed`,
+    # `lib` depends on `app` to check cycles, and `multi` is selected by version
+    (tmp_path / "uv.lock").write_text(
+        "version = 1\n"
+        "[[package]]\n"
+        'name = "app"\n'
+        'version = "1.0"\n'
+        'wheels = [{ url = "https://x/app.whl", hash = "sha256:a" }]\n'
+        "dependencies = [\n"
+        '    { name = "lib", extra = ["fast"] },\n'
+        '    { name = "win", marker = "sys_platform == \'win32\'" },\n'
+        '    { name = "multi", version = "2.0" },\n'
+        "]\n"
+        "[[package]]\n"
+        'name = "lib"\n'
+        'version = "2.0"\n'
+        'wheels = [{ url = "https://x/lib.whl", hash = "sha256:l" }]\n'
+        'dependencies = [{ name = "app" }]\n'
+        "[package.optional-dependencies]\n"
+        'fast = [{ name = "speed" }]\n'
+        "[[package]]\n"
+        'name = "speed"\n'
+        'version = "3.0"\n'
+        'wheels = [{ url = "https://x/speed.whl", hash = "sha256:s" }]\n'
+        "[[package]]\n"
+        'name = "win"\n'
+        'version = "4.0"\n'
+        'wheels = [{ url = "https://x/win.whl", hash = "sha256:w" }]\n'
+        'dependencies = [{ name = "speed", marker = "python_version < \'3.10\'" }]\n'
+        "[[package]]\n"
+        'name = "multi"\n'
+        'version = "1.0"\n'
+        'wheels = [{ url = "https://x/multi-1.whl", hash = "sha256:m1" }]\n'
+        "[[package]]\n"
+        'name = "multi"\n'
+        'version = "2.0"\n'
+        'wheels = [{ url = "https://x/multi-2.whl", hash = "sha256:m2" }]\n'
+    )
+    # poetry.lock, with optional dependencies and non PEP 440 constraints
+    (tmp_path / "poetry.lock").write_text(
+        "[[package]]\n"
+        'name = "app"\n'
+        'version = "1.0"\n'
+        'files = [{file = "app.whl", hash = "sha256:a"}]\n'
+        "[package.dependencies]\n"
+        'lib = "^2.0"\n'
+        'win = {version = "*", markers = "sys_platform == \'win32\'"}\n'
+        'speed = {version = ">=3", optional = true}\n'
+        "[package.extras]\n"
+        'fast = ["speed (>=3)"]\n'
+        "[[package]]\n"
+        'name = "lib"\n'
+        'version = "2.0"\n'
+        'files = [{file = "lib.whl", hash = "sha256:l"}]\n'
+        "[[package]]\n"
+        'name = "speed"\n'
+        'version = "3.0"\n'
+        'files = [{file = "speed.whl", hash = "sha256:s"}]\n'
+        "[[package]]\n"
+        'name = "win"\n'
+        'version = "4.0"\n'
+        "files = []\n"
+    )
+    # pip-compile, the whole file is the closure
+    (tmp_path / "requirements.lock").write_text(
+        "app==1.0 --hash=sha256:a\n"
+        "lib==2.0 --hash=sha256:l\n"
+        "win==4.0 ; sys_platform == 'win32' --hash=sha256:w\n"
+    )
+
+    def _pins(lock, reqs, hashes=False):
+        return [(r.requirement, r.via) for r in lock.pin_closure(reqs, hashes=hashes)]
+
+    uv = Lockfile.from_file(tmp_path / "uv.lock")
+    assert _pins(uv, ["app; os_name == 'posix'"], hashes=True) == [
+        ('app==1.0; os_name == "posix"', ("lib",)),
+        ('lib==2.0; os_name == "posix"', ("app",)),
+        ('multi==2.0; os_name == "posix"', ("app",)),
+        ('speed==3.0; os_name == "posix"', ("lib", "win")),
+        ('win==4.0; (os_name == "posix") and (sys_platform == "win32")', ("app",)),
+    ]
+    # an unconditional requirement widens the markers of its dependencies
+    assert _pins(uv, ["lib", "app; os_name == 'posix'"]) == [
+        ("lib==2.0", ("app",)),
+        ("app==1.0", ("lib",)),
+        ("multi==2.0", ("app",)),
+        ("speed==3.0", ("lib", "win")),
+        ('win==4.0; sys_platform == "win32"', ("app",)),
+    ]
+    with pytest.raises(LockfileError, match="no hashes"):
+        Lockfile.from_file(tmp_path / "poetry.lock").pin_closure(["app"])
+
+    poetry = Lockfile.from_file(tmp_path / "poetry.lock")
+    assert _pins(poetry, ["app"]) == [
+        ("app==1.0", ()),
+        ("lib==2.0", ("app",)),
+        ('win==4.0; sys_platform == "win32"', ("app",)),
+    ]
+    assert _pins(poetry, ["app[fast]"])[2] == ("speed==3.0", ("app",))
+
+    txt = Lockfile.from_file(tmp_path / "requirements.lock")
+    assert _pins(txt, ["lib"], hashes=True) == [
+        ("lib==2.0", ()),
+        ("app==1.0", ()),
+        ('win==4.0; sys_platform == "win32"', ()),
+    ]
+
+    # dependencies must select a single locked version
+    (tmp_path / "bad" / "uv.lock").parent.mkdir()
+    (tmp_path / "bad" / "uv.lock").write_text(
+        (tmp_path / "uv.lock")
+        .read_text()
+        .replace('{ name = "multi", version = "2.0" }', '{ name = "multi" }')
+    )
+    with pytest.raises(LockfileError, match="single locked version"):
+        Lockfile.from_file(tmp_path / "bad" / "uv.lock").pin_closure(["app"])
+
+    # output
+    mapped = OutMappedRequirements(
+        requirements=[
+            OutMappedRequirement(
+                requirement="lib",
+                sources=[OutMappedRequirementSource("A.a1", False, False)],
+            ),
+        ],
+    )
+    assert mapped.as_requirements_txt(notice=False, lockfile=uv) == (
+        "lib==2.0 \\\n"
+        "    --hash=sha256:l\n"
+        "    # ← A.a1\n"
+        "# locked transitive dependencies\n"
+        "app==1.0 \\\n"
+        "    --hash=sha256:a\n"
+        "    # via lib\n"
+        "multi==2.0 \\\n"
+        "    --hash=sha256:m2\n"
+        "    # via app\n"
+        "speed==3.0 \\\n"
+        "    --hash=sha256:s\n"
+        "    # via lib, win\n"
+        'win==4.0; sys_platform == "win32" \\\n'
+        "    --hash=sha256:w\n"
+        "    # via app\n"
+    )
+
+
+def test_extract_base_layer():
+    def _reqs(name, *reqs):
+        return OutMappedRequirements(
+            requirements=[
+                OutMappedRequirement(
+                    requirement=r,
+                    sources=[
+                        OutMappedRequirementSource(name, name == "b", name == "c")
+                    ],
+                )
+                for r in reqs
+            ],
+            resolver_name=name,
+        )
+
+    requirements = {
+        "a": _reqs("a", "numpy", "pydantic>=2", "torch"),
+        "b": _reqs("b", "numpy", "pydantic>=2", "pillow"),
+        "c": _reqs("c", "numpy", "pydantic<2", "torch"),
+    }
+
+    # only requirements shared by all, packages with conflicting specifiers are kept
+    layers = extract_base_layer(requirements, base_name="base")
+    assert layers.base._get_debug_struct() == [("numpy", ["a", "b", "c"])]
+    assert layers.base.resolver_name == "base"
+    assert [s.is_lazy for s in layers.base.requirements[0].sources] == [0, 1, 0]
+    assert [s.is_manual for s in layers.base.requirements[0].sources] == [0, 0, 1]
+    assert {
+        k: [r.requirement for r in v.requirements] for k, v in layers.deltas.items()
+    } == {
+        "a": ["pydantic>=2", "torch"],
+        "b": ["pydantic>=2", "pillow"],
+        "c": ["pydantic<2", "torch"],
+    }
+
+    # larger bases
+    layers = extract_base_layer(requirements, min_share=0.5)
+    assert [r.requirement for r in layers.base.requirements] == ["numpy", "torch"]
+    assert [r.requirement for r in layers.deltas["b"].requirements] == [
+        "pydantic>=2",
+        "pillow",
+    ]
+    with pytest.raises(ValueError, match="min_share"):
+        extract_base_layer(requirements, min_share=0)
+
+
 def test_toml_array_gen(mapper: RequirementsMapper):
     scope_all = ModulesScope().add_modules_from_search_path(
         PKGS_ROOT, unreachable_mode=UnreachableModeEnum.keep
@@ -1460,6 +2710,155 @@ def test_pydeps_cli():
 # ========================================================================= #
 
 
+def test_resolve_all_imports_batched(monkeypatch):
+    # the closures engine is opt-in, by default each start scope uses a BFS
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    cfg.resolve_engine = ResolveEngineEnum.closures
+    batched_closures = cfg.resolve_all_imports(cfg.load_scopes())
+
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    assert cfg.resolve_engine == ResolveEngineEnum.bfs
+    loaded_scopes = cfg.load_scopes()
+    with monkeypatch.context() as m:
+        m.setattr(ModulesScope, "get_import_graph_closures", None)
+        batched = cfg.resolve_all_imports(loaded_scopes)
+    assert [sorted(i, key=repr) for i in batched] == [
+        sorted(i, key=repr) for i in batched_closures
+    ]
+
+    # batches share the same results as resolving each resolver independently
+    assert len(batched) == len(cfg.resolvers)
+    resolved = cfg.resolve_all_scopes(loaded_scopes)
+    assert [r is None for r in resolved] == [not o.scope for o in cfg.resolvers]
+    for output, imports in zip(cfg.resolvers, batched):
+        expected = output.get_resolved_imports(loaded_scopes)
+        assert sorted(imports, key=repr) == sorted(expected, key=repr)
+
+    # resolvers are grouped by scope & traversal mode
+    keys = [output.get_batch_key() for output in cfg.resolvers]
+    assert keys[:5] == [
+        ("all", False, False),
+        ("all", True, False),
+        ("all", True, False),
+        ("all", False, False),
+        ("all", False, True),
+    ]
+    assert set(keys[5:]) == {None}
+
+    # resolvers that only differ in their env are mapped together
+    mapper = cfg.make_requirements_mapper(loaded_scopes)
+    alt = cfg.resolvers[1].model_copy(update={"env": "alt", "output_name": "alt"})
+    cfg.resolvers.append(alt)
+    mapped = cfg.map_all_envs(mapper, cfg.resolve_all_scopes(loaded_scopes))
+    assert {1, len(cfg.resolvers) - 1} <= set(mapped)
+    assert 0 not in mapped
+    for i, m in mapped.items():
+        output = cfg.resolvers[i]
+        expected = mapper.generate_output_requirements(
+            output.get_resolved_imports(loaded_scopes) + output.get_manual_imports(),
+            requirements_env=output.env,
+            strict=output.strict_requirements_map,
+            resolver_name=output.get_output_extras_name(),
+        )
+        assert m.to_output_requirements() == expected
+    cfg.resolvers.pop()
+
+    # identical start scopes share results
+    scope_all = loaded_scopes["all"]
+    scope_b1 = loaded_scopes["B1"]
+    r0, r1, r2 = ScopeResolvedImports.from_scopes_memoized(
+        scope=scope_all,
+        start_scopes=[None, scope_b1, scope_all],
+        visit_lazy=True,
+    )
+    assert r0 is r2
+    assert r0 is not r1
+    assert r1._get_targets_sources_counts() == {
+        "B.b2": {"B.b1": 1},
+        "C": {"B.b2": 2},
+        "extern_C": {"C": 1},
+        "extern_b1": {"B.b1": 1},
+        "extern_b2": {"B.b2": 1},
+        "extern_D": {"lazy_D": 1},
+        "lazy_D": {"C": 1},
+        "lazy_E": {"lazy_D": 1},
+    }
+
+
+def test_unused_requirements():
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    loaded_scopes = cfg.load_scopes()
+    cfg.versions.append(CfgVersion(requirement="unused-pkg"))
+    cfg.versions.append(CfgVersion(requirement="unused-alt", env="alt"))
+    cfg.versions.append(CfgVersion(requirement="unused-scope", scope="all"))
+    cfg.resolvers[1].raw = ["asdf", "extern-C", "pre-commit"]
+
+    # versions are checked with the hits of the mapper across all resolvers
+    mapper = cfg.make_requirements_mapper(loaded_scopes)
+    assert [v.requirement for v in cfg.get_unused_versions(mapper)] == [
+        "asdf",
+        "opencv-python-contrib==1",
+        "opencv_python_contrib==2",
+        "unused-pkg",
+        "unused-alt",
+    ]
+
+    # reported after writing outputs
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        cfg.write_all_outputs(loaded_scopes, dry_run=True)
+    msgs = [str(x.message) for x in w if "[unused]" in str(x.message)]
+    assert msgs == [
+        "[unused] version 'unused-pkg' in env 'default' never matched an import of any resolver",
+        "[unused] version 'unused-alt' in env 'alt' never matched an import of any resolver",
+        "[unused] resolver 'all': raw requirement 'asdf' duplicates a generated requirement, imported by: ['A.a1', 'A.a2', 'A.a3.a3i', 'A.a4.a4i', 't_ast_parser']",
+        "[unused] resolver 'all': raw requirement 'extern-C' duplicates a generated requirement, imported by: ['C']",
+    ]
+
+    # strict mode
+    cfg.strict_unused = True
+    with pytest.raises(UnusedRequirementsError, match="unused-pkg"):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cfg.write_all_outputs(loaded_scopes, dry_run=True)
+
+
+def test_resolver_budgets():
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    loaded_scopes = cfg.load_scopes()
+    cfg.check_budgets(loaded_scopes)  # no budgets
+
+    # within budget, eager imports only even if lazy imports are visited
+    cfg.resolvers[0].budget = CfgBudget(max_requirements=5, max_modules=12)
+    cfg.resolvers[1].budget = CfgBudget(deny=["lazy-E", "extern_b1", "buzz"])
+    cfg.resolvers[2].budget = CfgBudget(deny="extern_D", max_requirements=0)
+    cfg.check_budgets(loaded_scopes)
+
+    # denied requirements are explained with chains
+    cfg.resolvers[1].budget = CfgBudget(deny=["extern-D"])
+    with pytest.raises(ResolverBudgetError) as e:
+        cfg.check_budgets(loaded_scopes)
+    assert str(e.value).splitlines() == [
+        "[budget] resolver 'all': eagerly imports denied requirement 'extern-d':",
+        "  extern-d ← extern_D:",
+        f"    lazy_D → extern_D  ({PKG_D}:1)",
+    ]
+
+    # maximums
+    cfg.resolvers[1].budget = None
+    cfg.resolvers[0].budget = CfgBudget(max_requirements=4, max_modules=11)
+    with pytest.raises(ResolverBudgetError) as e:
+        cfg.check_budgets(loaded_scopes)
+    lines = str(e.value).splitlines()
+    assert lines[0] == (
+        "[budget] resolver 'all': 5 eager requirements exceeds max_requirements=4:"
+    )
+    assert "  asdf ← extern_a1:" in lines
+    assert lines[-1] == (
+        "[budget] resolver 'all': 12 eager modules exceeds max_modules=11"
+    )
+
+
 def test_pydeps_cli_main():
     import subprocess
 
@@ -1495,6 +2894,259 @@ def test_pydeps_cli_main():
     assert result.stderr != b""
 
 
+def test_pydeps_cli_layers(tmp_path, monkeypatch):
+    import shutil
+
+    # copied modules share names & tags with the originals
+    monkeypatch.setattr(DEFAULT_MODULE_IMPORTS_LOADER, "_modules_imports", {})
+    root = tmp_path / "pkgs"
+    shutil.copytree(PKGS_ROOT, root)
+    config = root / "pyproject.toml"
+    config.write_text(
+        config.read_text().replace(
+            "# collections of packages and dependencies that will then be resolved.",
+            "layers = [\n"
+            "    {resolvers=['all', 'B1-all'], output_mode='requirements', output_file='req-{name}.txt'},\n"
+            "    {resolvers=['all', 'test'], output_mode='optional-dependencies', output_name='shared', min_share=0.5},\n"
+            "]\n",
+            1,
+        )
+    )
+
+    # report
+    report = pydeps_layers(config_path=config)
+    assert report.startswith(
+        "[layer] 'base' shared by 2 resolvers: all, B1-all\n  base (5):\n    extern_C\n"
+    )
+    assert "\n  B1-all-delta (0):\n" in report
+
+    # outputs
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        pydeps(config_path=config)
+    base = (root / "req-base.txt").read_text().splitlines()
+    delta = (root / "req-all-delta.txt").read_text().splitlines()
+    assert (
+        base[0]
+        == "# [AUTOGEN] by pydependence resolver 'base' **DO NOT EDIT** [AUTOGEN]"
+    )
+    assert [line for line in base if not line.startswith(("#", " "))] == [
+        "extern_C",
+        "extern_D",
+        "extern_b1 # [L]",
+        "extern_b2 # [L]",
+        "lazy_E # [L]",
+    ]
+    assert [line for line in delta if not line.startswith(("#", " "))] == [
+        "asdf",
+        "buzz # [L]",
+        "foo",
+        "package",
+    ]
+    extras = load_toml_document(config)["project"]["optional-dependencies"]
+    assert len(extras["shared"]) == 11
+    assert list(extras["test-delta"]) == []
+    assert list(extras["all-delta"]) == []
+
+    # names must be unique
+    cfg = PydependenceCfg.from_file_automatic(config)
+    cfg.layers[1].output_name = "all"
+    with pytest.raises(ValueError, match="not unique"):
+        cfg.write_all_outputs(cfg.load_scopes(), dry_run=True)
+
+
+def _make_dist(site, name, version, requires=(), files=()):
+    dist_info = site / f"{name.replace('-', '_')}-{version}.dist-info"
+    dist_info.mkdir(parents=True)
+    metadata = [f"Name: {name}", f"Version: {version}"]
+    metadata += [f"Requires-Dist: {r}" for r in requires]
+    (dist_info / "METADATA").write_text("\n".join(metadata) + "\n\n")
+    (site / name).mkdir()
+    record = [f"{dist_info.name}/METADATA,,", f"{dist_info.name}/RECORD,,"]
+    for file, size in files:
+        (site / name / file).write_bytes(b"x" * size)
+        record.append(f"{name}/{file},sha256=x,{size}")
+    (dist_info / "RECORD").write_text("\n".join(record) + "\n")
+
+
+def test_installed_footprint(tmp_path):
+    site = tmp_path / "site"
+    _make_dist(
+        site,
+        "asdf",
+        "1.0",
+        requires=["foo>=1", "extern-C; extra == 'x'", "nope; python_version >= '3'"],
+        files=[("a.py", 100), ("b.py", 20)],
+    )
+    _make_dist(site, "foo", "2.0", requires=["extern_c[y]"], files=[("f.py", 5)])
+    _make_dist(site, "extern_C", "3.0", requires=["bar; extra == 'y'"])
+    dists = InstalledDists([site, tmp_path / "missing"])
+    assert "Extern.C" in dists and "bar" not in dists
+
+    # sizes & files come from the RECORD, or the files on disk if missing
+    dist = dists.get_dist("asdf")
+    metadata_size = (site / "asdf-1.0.dist-info" / "METADATA").stat().st_size
+    record_size = (site / "asdf-1.0.dist-info" / "RECORD").stat().st_size
+    assert (dist.version, dist.files) == ("1.0", 4)
+    assert dist.size == 120 + metadata_size + record_size
+
+    # closures follow requested extras & markers
+    fp = dists.get_footprint("asdf>=1")
+    assert fp.closure == ("asdf", "foo", "extern-c")
+    assert fp.missing == ("nope", "bar")
+    assert fp.closure_size == sum(dists.get_dist(n).size for n in fp.closure)
+    assert fp.closure_files == 4 + 3 + 2
+    assert dists.get_footprint("asdf[x]").closure == fp.closure
+    fp = dists.get_footprint("extern_c")
+    assert (fp.closure, fp.missing, fp.version) == (("extern-c",), (), "3.0")
+    fp = dists.get_footprint("nope")
+    assert (fp.closure, fp.missing, fp.version, fp.size) == ((), ("nope",), None, 0)
+
+    # report of each resolver
+    cfg = PydependenceCfg.from_file_automatic(PKGS_ROOT_PYPROJECT)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        footprints = cfg.get_footprints(cfg.load_scopes(), paths=[str(site)])
+    report = footprints["all"]
+    assert report["closure"] == ["asdf", "extern-c", "foo"]
+    assert report["size"] == sum(dists.get_dist(n).size for n in report["closure"])
+    asdf = next(r for r in report["requirements"] if r["requirement"] == "asdf")
+    assert asdf["closure"] == ("asdf", "foo", "extern-c")
+    assert {"module": "A.a1", "is_lazy": False, "is_manual": False} in asdf["sources"]
+    assert "buzz" in report["missing"]
+    assert footprints["test"]["closure"] == []
+    # manual sources are reported by name, so the report can be dumped as JSON
+    pytest_ = footprints["test"]["requirements"][0]
+    assert pytest_["sources"][0]["module"] == "<manual: pytest>=6>"
+    json.dumps(footprints)
+
+
+def test_pydeps_cli_fingerprints(tmp_path, monkeypatch):
+    import shutil
+
+    from pydependence._cli import _Output
+
+    root = tmp_path / "pkgs"
+    shutil.copytree(PKGS_ROOT, root)
+    config = root / "pyproject.toml"
+    config.write_text(
+        config.read_text().replace(
+            'default_root = "."',
+            'default_root = "."\nfingerprints_file = ".pydependence.json"',
+            1,
+        )
+    )
+
+    # record which resolvers generate outputs
+    ran = []
+    orig_fn = _Output.generate_requirements
+
+    def _fn(self, *args, **kwargs):
+        ran.append(self.get_output_extras_name())
+        return orig_fn(self, *args, **kwargs)
+
+    monkeypatch.setattr(_Output, "generate_requirements", _fn)
+
+    def _run():
+        # copied modules share names & tags with the originals, and are modified
+        monkeypatch.setattr(DEFAULT_MODULE_IMPORTS_LOADER, "_modules_imports", {})
+        ran.clear()
+        pydeps(config_path=config)
+        return sorted(ran)
+
+    # 1. first run resolves everything & stores fingerprints
+    cfg = PydependenceCfg.from_file_automatic(config)
+    all_names = sorted(o.get_output_extras_name() for o in cfg.resolvers)
+    assert _run() == all_names
+    assert (root / ".pydependence.json").exists()
+    expected = config.read_text()
+
+    # 2. nothing changed, everything is skipped
+    assert _run() == []
+    assert config.read_text() == expected
+
+    # 3. only resolvers that visited the modified module are run again
+    with open(root / "lazy_D.py", "a") as fp:
+        fp.write("\n# modified\n")
+    assert _run() == ["B1-all", "all", "all"]
+    assert config.read_text() == expected
+    assert _run() == []
+
+    # 4. modified outputs are always generated again
+    config.write_text(expected.replace("    #     ← C\n", "", 1))
+    assert _run() == all_names
+    assert config.read_text() == expected
+
+    # 5. fingerprints do not depend on the location of the checkout
+    moved = tmp_path / "moved"
+    shutil.copytree(root, moved)
+    config = moved / "pyproject.toml"
+    assert _run() == []
+
+    # 6. upgrading pydependence invalidates all fingerprints
+    monkeypatch.setattr("pydependence._cli.get_tool_version", lambda: "999.0")
+    assert _run() == all_names
+    assert _run() == []
+
+
+def test_pydeps_cli_fingerprints_checks(tmp_path, monkeypatch):
+    from pydependence._cli import _Output
+
+    pkg = tmp_path / "chk"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "a.py").write_text("import chk.b\n")
+    (pkg / "b.py").write_text("import extern_b\n")
+    (pkg / "c.py").write_text("import os\n")
+    config = tmp_path / "pyproject.toml"
+    config.write_text(
+        "[tool.pydependence]\n"
+        "fingerprints_file = '.pydependence.json'\n"
+        "versions = ['extern_b']\n"
+        "scopes = [{name='chk', pkg_paths='chk', cycles_mode='error'}]\n"
+        "resolvers = [\n"
+        "    {output_mode='requirements', output_file='requirements.txt', scope='chk', budget={max_requirements=1}},\n"
+        "]\n"
+    )
+
+    # record which checks run
+    ran = []
+    orig_cycles = ModulesScope.get_import_cycles
+    orig_budget = _Output.check_budget
+
+    def _cycles(self, *args, **kwargs):
+        ran.append("cycles")
+        return orig_cycles(self, *args, **kwargs)
+
+    def _budget(self, *args, **kwargs):
+        ran.append("budget")
+        return orig_budget(self, *args, **kwargs)
+
+    monkeypatch.setattr(ModulesScope, "get_import_cycles", _cycles)
+    monkeypatch.setattr(_Output, "check_budget", _budget)
+
+    def _run():
+        monkeypatch.setattr(DEFAULT_MODULE_IMPORTS_LOADER, "_modules_imports", {})
+        ran.clear()
+        pydeps(config_path=config)
+        return sorted(ran)
+
+    # checks are skipped if the fingerprints of the resolvers & scopes are unchanged
+    assert _run() == ["budget", "cycles"]
+    assert _run() == []
+    # - modules of the scope changed
+    with open(pkg / "c.py", "a") as fp:
+        fp.write("\n# modified\n")
+    assert _run() == ["budget", "cycles"]
+    assert _run() == []
+    # - cycle checks changed
+    config.write_text(
+        config.read_text().replace("cycles_mode='error'", "cycles_mode='warn'")
+    )
+    assert _run() == ["budget", "cycles"]
+    assert _run() == []
+
+
 # ========================================================================= #
 # END                                                                       #
 # ========================================================================= #